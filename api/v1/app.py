@@ -12,6 +12,11 @@ Usage:
 
 Attributes:
     app (Flask): The main Flask application instance.
+    app.json (NegotiatingJSONProvider): Compact JSON encoding of the
+                                        responses, indented when ?pretty=1
+                                        is passed, or MessagePack when the
+                                        Accept header prefers it.
+    app.request_class (APIRequest): Requests decoding MessagePack bodies.
     app_views (Blueprint): Blueprint for organizing API routes.
     cors (CORS): Cross-Origin Resource Sharing configuration for Flask app.
     jwt (JWTManager): JWT token management for authentication.
@@ -19,24 +24,33 @@ Attributes:
     CACHE_TYPE (str): Type of caching mechanism used in the application.
 
 Functions:
-    open_mongodb: Function to reload MongoDB connections before each request.
-    close_mongodb: Function to close MongoDB connections after each request.
+    open_mongodb: Function to make sure the MongoDB client is connected
+                  before each request.
+    close_mongodb: Function to close per-request MongoDB connections after
+                   each request.
     error_handler: Error handler function to manage 404 errors with JSON response.
+    busy_handler: Error handler function answering 503 when too many passwords
+                  are waiting to be hashed.
 
 Example:
     $ python app.py
 """
 
+from api.v1.negotiation import APIRequest, NegotiatingJSONProvider
 from api.v1.views import app_views
 from flask import Flask, jsonify, make_response, send_from_directory
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 from flasgger import Swagger
 from models import storage
+from models.hashing import PoolBusyError
+from os import getenv
+from pymongo.errors import PyMongoError
 from uuid import uuid4
 
 app = Flask(__name__)
-app.config["JSONIFY_PRETTYPRINT_REGULAR"] = True
+app.request_class = APIRequest
+app.json = NegotiatingJSONProvider(app)
 app.config["SECRET_KEY"] = str(uuid4())
 app.config['SWAGGER'] = {
     'title': 'WealthWise Restful API',
@@ -55,13 +69,14 @@ def serve_documentation(filename):
 
 @app.before_request
 def open_mongodb():
-    """Reload MongoDB connections before each request."""
+    """Make sure the MongoDB client is connected before each request."""
     storage.reload()
 
 @app.teardown_appcontext
 def close_mongodb(error):
-    """Close MongoDB connections after each request."""
-    storage.close()
+    """Close MongoDB connections after each request unless pooled."""
+    if not storage.pooled:
+        storage.close()
 
 
 @app.errorhandler(404)
@@ -70,5 +85,19 @@ def error_handler(error):
     return make_response(jsonify({'error': f"{error}"}), 404)
 
 
+@app.errorhandler(PoolBusyError)
+def busy_handler(error):
+    """Ask the client to retry when the password hashing pool is full."""
+    response = make_response(jsonify({'error': f"{error}"}), 503)
+    response.headers["Retry-After"] = "1"
+    return response
+
+
 if __name__ == "__main__":
+    if getenv("MONGO_ENSURE_INDEXES", "1") != "0":
+        try:
+            storage.ensure_indexes()
+        except PyMongoError as error:
+            app.logger.warning("Indexes not created, run python -m "
+                               "models.engine.indexes verify: %s", error)
     app.run(host="0.0.0.0", port=5000, debug=True)
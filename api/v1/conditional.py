@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+conditional.py
+
+This module adds conditional GET to the read endpoints of the WealthWise
+API. Their responses carry a strong ETag built from the version counter
+of the signed-in user, which the storage raises on every change to the
+user or to their transactions. A client sending the ETag back in
+If-None-Match gets a 304 Not Modified, answered after a single version
+lookup and before the view runs.
+
+Other requests do not read the version, so they cost no extra round
+trip. The version is only read for conditional GETs, where it also lets
+the storage drop its cached copies of a user changed by another process.
+
+Attributes:
+    conditional_endpoints (frozenset): The endpoints answering conditional
+                                       GET requests.
+
+Functions:
+    user_version: Reads the version of a user once per request.
+    current_etag: Builds the ETag of the current request.
+    check_etag: Answers 304 when the client already has the response.
+    add_etag: Adds the ETag and Cache-Control headers to a response.
+"""
+
+from api.v1.negotiation import response_type
+from flask import current_app, g, request
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from flask_jwt_extended.exceptions import JWTExtendedException
+from hashlib import sha1
+from jwt.exceptions import PyJWTError
+from models import storage
+
+conditional_endpoints = frozenset((
+    "app_views.get_user",
+    "app_views.get_all_transaction",
+    "app_views.get_transaction",
+    "app_views.txn_summary"
+))
+
+
+def user_version(user_id):
+    """
+    Read the version counter of a user, once per request, so the views
+    reuse the value read to build the ETag.
+
+    Args:
+        user_id (str): The ID of the user.
+
+    Returns:
+        int: The version of the user.
+    """
+    versions = g.setdefault("versions", {})
+    if user_id not in versions:
+        versions[user_id] = storage.version(user_id)
+    return versions[user_id]
+
+
+def current_etag():
+    """
+    Build the ETag of the current request from the version of the user,
+    the URL, the negotiated media type and the body.
+
+    Returns:
+        str: The ETag without quotes, or None if the request is not a
+             conditional GET of a signed-in user.
+    """
+    if request.method != "GET" or \
+            request.endpoint not in conditional_endpoints:
+        return None
+    try:
+        verify_jwt_in_request(optional=True)
+    except (JWTExtendedException, PyJWTError):
+        return None
+    user_id = get_jwt_identity()
+    if not user_id:
+        return None
+    version = user_version(user_id)
+    digest = sha1()
+    for part in (user_id, str(version), request.full_path, response_type()):
+        digest.update(part.encode())
+        digest.update(b"\0")
+    digest.update(request.get_data())
+    return f"{version}-{digest.hexdigest()}"
+
+
+def check_etag():
+    """
+    Answer 304 Not Modified when the If-None-Match header of the request
+    holds its current ETag. The ETag is kept in g for add_etag(), which
+    also adds the headers to the 304.
+
+    Returns:
+        Response: The 304 response, or None to let the view run.
+    """
+    g.etag = current_etag()
+    if g.etag is None or not request.if_none_match.contains(g.etag):
+        return None
+    return current_app.response_class(status=304)
+
+
+def add_etag(response):
+    """
+    Add the ETag and Cache-Control headers to a successful or 304
+    response of a conditional endpoint. no-cache lets clients keep the
+    response but makes them revalidate it before each use.
+
+    Args:
+        response (Response): The response of the view.
+
+    Returns:
+        Response: The same response.
+    """
+    etag = g.get("etag")
+    if etag is not None and response.status_code in (200, 304):
+        response.set_etag(etag)
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+        response.vary.add("Accept")
+        response.vary.add("Authorization")
+    return response
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+json_provider.py
+
+This module defines the JSON provider of the WealthWise API. Responses are
+compact unless the client asks for indented output with ?pretty=1, and are
+encoded with orjson when it is installed, falling back to the standard json
+module otherwise.
+
+Dates are written in the format used by BaseModel.to_dict, UUIDs as strings
+and Decimals as numbers, whichever encoder is used.
+
+Attributes:
+    orjson (module): The orjson module, or None if it is not installed.
+    pretty_values (tuple): The values of the pretty query parameter that
+                           turn on indentation.
+
+Classes:
+    FastJSONProvider: JSON provider with a compact, fast encoder.
+"""
+
+from datetime import date, datetime
+from decimal import Decimal
+from flask import has_request_context, request
+from flask.json.provider import JSONProvider
+import json
+from models.base_model import format_time
+from uuid import UUID
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+pretty_values = ("1", "true", "yes")
+
+
+def default(value):
+    """
+    Encode the values the JSON encoders do not support natively.
+
+    Args:
+        value: The value to encode.
+
+    Returns:
+        A value the encoder supports.
+
+    Raises:
+        TypeError: If the value cannot be encoded.
+    """
+    if isinstance(value, datetime):
+        return format_time(value)
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not "
+                    "JSON serializable")
+
+
+def wants_pretty():
+    """
+    Check whether the client asked for indented output.
+
+    Returns:
+        bool: True if the request has a pretty query parameter set to
+              1, true or yes.
+    """
+    return has_request_context() and \
+        request.args.get("pretty", "").lower() in pretty_values
+
+
+class FastJSONProvider(JSONProvider):
+    """
+    FastJSONProvider Class
+
+    Encodes responses without whitespace and with sorted keys, so the
+    same data always gives the same bytes.
+
+    Attributes:
+        sort_keys (bool): Sort the keys of objects.
+    """
+
+    sort_keys = True
+
+    def dumps(self, obj, **kwargs):
+        """
+        Serialize data as JSON.
+
+        Args:
+            obj: The data to serialize.
+            **kwargs: Arguments of json.dumps, which skip orjson.
+
+        Returns:
+            str: The JSON document.
+        """
+        if orjson is not None and not kwargs:
+            return self.encode(obj).decode("utf-8")
+        kwargs.setdefault("default", default)
+        kwargs.setdefault("sort_keys", self.sort_keys)
+        kwargs.setdefault("separators", (",", ":"))
+        return json.dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        """
+        Deserialize data as JSON.
+
+        Args:
+            s (str or bytes): The JSON document.
+            **kwargs: Arguments of json.loads, which skip orjson.
+
+        Returns:
+            The data.
+        """
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def encode(self, obj, pretty=False):
+        """
+        Serialize data as JSON bytes.
+
+        Args:
+            obj: The data to serialize.
+            pretty (bool): Indent the output.
+
+        Returns:
+            bytes: The JSON document.
+        """
+        if orjson is not None:
+            option = orjson.OPT_PASSTHROUGH_DATETIME | \
+                orjson.OPT_NON_STR_KEYS
+            if self.sort_keys:
+                option |= orjson.OPT_SORT_KEYS
+            if pretty:
+                option |= orjson.OPT_INDENT_2
+            return orjson.dumps(obj, default=default, option=option)
+        if pretty:
+            text = json.dumps(obj, default=default, sort_keys=self.sort_keys,
+                              ensure_ascii=False, indent=2)
+        else:
+            text = json.dumps(obj, default=default, sort_keys=self.sort_keys,
+                              ensure_ascii=False, separators=(",", ":"))
+        return text.encode("utf-8")
+
+    def response(self, *args, **kwargs):
+        """
+        Serialize the arguments as JSON and wrap them in a response with
+        the application/json mimetype, like flask.jsonify.
+
+        Args:
+            *args: A single value, or several values sent as a list.
+            **kwargs: Values sent as an object.
+
+        Returns:
+            Response: The response.
+        """
+        obj = self._prepare_response_obj(args, kwargs)
+        body = self.encode(obj, wants_pretty()) + b"\n"
+        return self._app.response_class(body, mimetype="application/json")
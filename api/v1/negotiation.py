@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+negotiation.py
+
+This module lets clients exchange MessagePack instead of JSON with the
+WealthWise API. A request sent with Content-Type: application/msgpack is
+decoded by request.get_json() like a JSON body, and a response is encoded
+as MessagePack when the Accept header prefers it. JSON stays the default,
+and MessagePack is only offered when the msgpack package is installed.
+
+Attributes:
+    msgpack (module): The msgpack module, or None if it is not installed.
+    msgpack_types (tuple): The MessagePack media types.
+
+Classes:
+    APIRequest: Request class decoding MessagePack bodies.
+    NegotiatingJSONProvider: JSON provider answering in MessagePack when
+                             the client asks for it.
+"""
+
+from api.v1.json_provider import FastJSONProvider, default
+from flask import Request, has_request_context, request
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+msgpack_types = ("application/msgpack", "application/x-msgpack")
+
+
+def response_type():
+    """
+    Find the media type of the response from the Accept header.
+
+    Returns:
+        str: A MessagePack media type if the client prefers it and msgpack
+             is installed, application/json otherwise.
+    """
+    if msgpack is None or not has_request_context():
+        return "application/json"
+    return request.accept_mimetypes.best_match(
+        ("application/json",) + msgpack_types, "application/json")
+
+
+class APIRequest(Request):
+    """
+    APIRequest Class
+
+    Request whose get_json() also decodes MessagePack bodies, so the
+    views read both formats the same way.
+    """
+
+    def get_json(self, force=False, silent=False, cache=True):
+        """
+        Parse the body as MessagePack when its Content-Type says so, or
+        as JSON otherwise.
+
+        Args:
+            force (bool): Parse the body as JSON whatever its type.
+            silent (bool): Return None instead of failing on bad data.
+            cache (bool): Keep the parsed body for the next calls.
+
+        Returns:
+            The parsed data, or None if silent and the body is not valid.
+        """
+        if msgpack is None or self.mimetype not in msgpack_types:
+            return super().get_json(force, silent, cache)
+        cached = self.__dict__.get("_msgpack_body")
+        if cached is not None:
+            return cached
+        try:
+            data = msgpack.unpackb(self.get_data(cache=cache),
+                                   strict_map_key=False)
+        except (ValueError, msgpack.UnpackException) as error:
+            if silent:
+                return None
+            return self.on_json_loading_failed(error)
+        if cache:
+            self.__dict__["_msgpack_body"] = data
+        return data
+
+
+class NegotiatingJSONProvider(FastJSONProvider):
+    """
+    NegotiatingJSONProvider Class
+
+    Encodes the responses of jsonify as MessagePack when the Accept header
+    prefers it. Every response carries Vary: Accept so shared caches keep
+    both formats apart.
+    """
+
+    def response(self, *args, **kwargs):
+        """
+        Serialize the arguments in the format asked by the client.
+
+        Args:
+            *args: A single value, or several values sent as a list.
+            **kwargs: Values sent as an object.
+
+        Returns:
+            Response: The response.
+        """
+        mimetype = response_type()
+        if mimetype in msgpack_types:
+            obj = self._prepare_response_obj(args, kwargs)
+            response = self._app.response_class(
+                msgpack.packb(obj, default=default), mimetype=mimetype)
+        else:
+            response = super().response(*args, **kwargs)
+        response.vary.add("Accept")
+        return response
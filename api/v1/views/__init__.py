@@ -5,4 +5,9 @@ from flask import Blueprint
 app_views = Blueprint("app_views", __name__, url_prefix="/api/v1")
 
 from api.v1.views.user import *
-from api.v1.views.transaction import *
\ No newline at end of file
+from api.v1.views.transaction import *
+from api.v1.views.import_job import *
+from api.v1.conditional import add_etag, check_etag
+
+app_views.before_request(check_etag)
+app_views.after_request(add_etag)
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+import_job.py
+
+This module defines API endpoints to import bank statements (CSV or OFX)
+in the background and follow their progress for the WealthWise application.
+
+Attributes:
+    app_views (Blueprint): Blueprint for organizing API routes.
+    request (Request): Object for handling HTTP requests in Flask.
+    jsonify (Function): Function for converting Python dictionaries to JSON responses.
+    jwt_required (Decorator): Validates JWT tokens for protected routes.
+    get_jwt_identity (Function): Retrieves the identity (user ID) from a JWT token.
+    storage (DBStorage): Database storage for the models.
+    User (Class): Model for User data.
+    ImportJob (Class): Model for the progress of an import.
+    not_found (dict): Dictionary with a "Not Found" message for error responses.
+
+Functions:
+    add_import: Endpoint to upload a statement and start its import.
+    get_import: Endpoint to retrieve the progress of an import.
+
+Example:
+    localhost:5000/api/v1/imports
+"""
+
+from api.v1.views import app_views
+from flask import request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from flasgger import swag_from
+from models import storage
+from models.import_job import ImportJob
+from models.imports import start_import, statement_format
+from models.user import User
+from models.utility import not_found
+
+
+@app_views.route("/imports", methods=["POST"], strict_slashes=False)
+@jwt_required()
+@swag_from('documentation/import_job/add_import.yml')
+def add_import():
+    """
+    Endpoint to upload a bank statement and import it in the background.
+
+    The statement is sent as the "file" field of a multipart form, or as the
+    raw request body. It is copied to a temporary file without being read in
+    memory, and a worker imports it while the request returns.
+
+    Returns:
+        JSON: JSON response with the pending import job, status 202.
+              Returns error messages if user is not found, no statement is
+              sent or its format is not supported.
+    """
+    user_id = get_jwt_identity()
+    user = storage.get(User, user_id, [])
+    if not user:
+        return jsonify(not_found), 404
+    upload = request.files.get("file")
+    if upload:
+        stream, filename, mimetype = upload.stream, upload.filename, \
+            upload.mimetype
+    else:
+        stream, filename, mimetype = request.stream, "", request.mimetype
+    statement_type = statement_format(filename, mimetype,
+                                      request.args.get("format"))
+    if not statement_type:
+        return jsonify({"error": "Unsupported format"}), 400
+    if not upload and (request.mimetype == "multipart/form-data" or
+                       request.content_length == 0):
+        return jsonify({"error": "No statement sent"}), 400
+    job = start_import(user, stream, statement_type, filename)
+    response = jsonify(job.to_dict())
+    response.headers["Location"] = f"/api/v1/imports/{job._id}"
+    return response, 202
+
+@app_views.route("/imports/<id>", methods=["GET"], strict_slashes=False)
+@jwt_required()
+@swag_from('documentation/import_job/get_import.yml')
+def get_import(id=None):
+    """
+    Endpoint to retrieve the progress of an import.
+
+    Returns:
+        JSON: JSON response with the status and the counters of the import.
+              Returns "Not Found" message if the import is not found or
+              belongs to another user.
+    """
+    user_id = get_jwt_identity()
+    job = storage.get_owned(ImportJob, id, user_id)
+    if not job:
+        return jsonify(not_found), 404
+    return jsonify(job.to_dict())
@@ -15,10 +15,14 @@ Attributes:
     User (Class): SQLAlchemy model for User data.
     Transaction (Class): SQLAlchemy model for Transaction data.
     not_found (dict): Dictionary with a "Not Found" message for error responses.
+    summary_cache (LRUCache): Results of txn_summary, keyed on the user's
+                              version so changes never serve old results.
 
 Functions:
     add_transaction: Endpoint to add a new transaction for a user.
+    bulk_add_transaction: Endpoint to add many transactions for a user at once.
     get_all_transaction: Endpoint to retrieve all transactions for a user with pagination.
+    export_transaction: Endpoint to download all transactions of a user as CSV or NDJSON.
     get_transaction: Endpoint to retrieve a specific transaction by ID for a user.
     update_transaction: Endpoint to update a specific transaction by ID for a user.
     txn_summary: Endpoint to retrieve transaction summaries based on year and month for a user.
@@ -27,14 +31,47 @@ Example:
     localhost:5000/api/v1/transactions
 """
 
+from api.v1.conditional import user_version
 from api.v1.views import app_views
-from flask import request, jsonify
+from flask import request, jsonify, Response, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from flasgger import swag_from
+import json
 from models import storage
+from models.engine.cache import LRUCache
+from models.export import export_types, formatters
+from models.ingest import client_values, ingest_transactions, new_transaction
 from models.user import User
 from models.transaction import Transaction
-from models.utility import not_found
+from models.utility import is_transaction_valid, not_found
+from os import getenv
+
+summary_cache = LRUCache(int(getenv('SUMMARY_CACHE_SIZE', 1024)),
+                         float(getenv('SUMMARY_CACHE_TTL', 300)))
+
+ndjson_types = ("application/x-ndjson", "application/ndjson",
+                "application/jsonlines")
+
+
+def ndjson_items(stream):
+    """
+    Parse an NDJSON stream one line at a time.
+
+    Args:
+        stream: The binary request stream.
+
+    Yields:
+        dict: The object of each non-empty line, None if it is not valid JSON.
+    """
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield None
+
 
 @app_views.route("/transactions", methods=["POST"], strict_slashes=False)
 @jwt_required()
@@ -43,28 +80,61 @@ def add_transaction():
     """
     Endpoint to add a new transaction for a user.
 
-    Validates user existence, incoming JSON data, creates a new Transaction object,
-    saves it to the database, and updates the user's transaction list.
+    Validates user existence, incoming JSON data, creates a new Transaction object
+    owned by the user like the bulk endpoint does, so the client cannot choose
+    its _id or owner, and saves it to the database, which also adds it to
+    the user's transaction list when transaction ids are embedded.
 
     Returns:
         JSON: JSON response with the newly created transaction details.
               Returns error messages for validation failures or missing data.
     """
     user_id = get_jwt_identity()
-    user = storage.get(User, user_id)
+    user = storage.get(User, user_id, [])
     if not user:
         return jsonify(not_found), 404
     txn_data = request.get_json()
     if not txn_data:
         return jsonify(not_found), 404
-    transaction = Transaction(**txn_data)
-    if not transaction:
-        return jsonify(not_found), 404
+    error = is_transaction_valid(txn_data)
+    if error:
+        return jsonify(error), 400
+    transaction = new_transaction(user, txn_data)
     transaction.save()
-    user.transactions.append(transaction._id)
-    user.update()
     return jsonify(transaction.to_dict())
 
+@app_views.route("/transactions/bulk", methods=["POST"], strict_slashes=False)
+@jwt_required()
+@swag_from('documentation/transaction/bulk_add_transaction.yml')
+def bulk_add_transaction():
+    """
+    Endpoint to add many transactions for a user in one request.
+
+    Accepts a JSON array of transactions, or an NDJSON stream (one transaction
+    per line) which is read line by line. Items are validated and written in
+    chunks with one insert per chunk, and the user is updated once at the end.
+
+    Returns:
+        JSON: JSON response with the number of created and failed transactions
+              and the result of each item, in order.
+              Returns error messages if user is not found or the body is not valid.
+    """
+    user_id = get_jwt_identity()
+    user = storage.get(User, user_id, [])
+    if not user:
+        return jsonify(not_found), 404
+    if request.mimetype in ndjson_types:
+        items = ndjson_items(request.stream)
+    else:
+        items = request.get_json(silent=True)
+        if not isinstance(items, list):
+            return jsonify({"error": "Expected an array of transactions"}), 400
+    results = []
+    created, failed = ingest_transactions(user, items,
+                                          on_chunk=results.extend)
+    return jsonify({"created": created, "failed": failed,
+                    "results": results})
+
 @app_views.route("/transactions", methods=["GET"], strict_slashes=False)
 @jwt_required()
 @swag_from('documentation/transaction/get_all_transaction.yml')
@@ -74,20 +144,57 @@ def get_all_transaction():
 
     Retrieves user identity, validates user existence, and retrieves all transactions
     associated with the user, paginated based on provided query parameters.
+    Pages are numbered with page/page_size, or read with keyset pagination
+    when a cursor parameter is passed (empty for the first page).
 
     Returns:
         JSON: JSON response with paginated transaction data.
-              Returns error messages if user is not found or if data retrieval fails.
+              Returns error messages if user is not found or if data retrieval fails,
+              and 400 if the cursor is not valid.
     """
     user_id = get_jwt_identity()
-    user = storage.get(User, user_id)
+    user = storage.get(User, user_id, [])
     if not user:
         return jsonify(not_found), 404
     page = int(request.args.get('page', 1))
     page_size = int(request.args.get('page_size', 10))
-    all_txn = storage.filter_all(user, page, page_size)
+    cursor = request.args.get('cursor')
+    try:
+        all_txn = storage.filter_all(user, page, page_size, cursor)
+    except ValueError:
+        return jsonify({"error": "Invalid cursor"}), 400
     return jsonify(all_txn)
 
+@app_views.route("/transactions/export", methods=["GET"],
+                 strict_slashes=False)
+@jwt_required()
+@swag_from('documentation/transaction/export_transaction.yml')
+def export_transaction():
+    """
+    Endpoint to download all transactions of a user as CSV or NDJSON.
+
+    The transactions are read from a database cursor and written to the
+    response as they arrive, so memory use does not grow with the history.
+
+    Returns:
+        Response: Streamed file with one transaction per line.
+                  Returns error messages if user is not found or the format
+                  is not supported.
+    """
+    user_id = get_jwt_identity()
+    user = storage.get(User, user_id, [])
+    if not user:
+        return jsonify(not_found), 404
+    export_format = request.args.get('format', 'csv')
+    if export_format not in formatters:
+        return jsonify({"error": "Unsupported format"}), 400
+    lines = formatters[export_format](storage.iter_transactions(user))
+    filename = f"transactions.{export_format}"
+    return Response(stream_with_context(lines),
+                    mimetype=export_types[export_format],
+                    headers={"Content-Disposition":
+                             f"attachment; filename={filename}"})
+
 @app_views.route("/transactions/<id>", methods=["GET"], strict_slashes=False)
 @jwt_required()
 @swag_from('documentation/transaction/get_transaction.yml')
@@ -95,26 +202,21 @@ def get_transaction(id=None):
     """
     Endpoint to retrieve a specific transaction by ID for a user.
 
-    Retrieves user identity, validates user existence, retrieves the transaction by ID,
-    and verifies if the transaction belongs to the user.
+    Retrieves user identity, validates user existence, and retrieves the transaction
+    by ID and owner in one query, so transactions of other users are not found.
 
     Returns:
         JSON: JSON response with transaction details if found.
               Returns "Not Found" message if transaction or user is not found.
     """
     user_id = get_jwt_identity()
-    user = storage.get(User, user_id)
+    user = storage.get(User, user_id, [])
     if not user:
         return jsonify(not_found), 404
-    if not id:
-        return jsonify(not_found), 404
-    transaction = storage.get(Transaction, id)
+    transaction = storage.get_owned(Transaction, id, user._id)
     if not transaction:
         return jsonify(not_found), 404
-    if transaction._id in user.transactions:
-        return jsonify(transaction.to_dict())
-    else:
-        return jsonify(not_found), 404
+    return jsonify(transaction.to_dict())
 
 @app_views.route("/transactions/<id>", methods=["PUT"], strict_slashes=False)
 @jwt_required()
@@ -123,26 +225,29 @@ def update_transaction(id=None):
     """
     Endpoint to update a specific transaction by ID for a user.
 
-    Retrieves user identity, validates user existence, retrieves the transaction by ID,
-    updates the transaction with incoming JSON data, and saves changes to the database.
+    Retrieves user identity, validates user existence, retrieves the transaction by ID
+    and owner, updates the transaction with incoming JSON data, and saves changes to
+    the database.
 
     Returns:
         JSON: JSON response with updated transaction details.
-              Returns "Not Found" message if transaction or user is not found.
+              Returns "Not Found" message if transaction or user is not found,
+              and 400 if the updated transaction is not valid.
     """
     user_id = get_jwt_identity()
-    user = storage.get(User, user_id)
+    user = storage.get(User, user_id, [])
     if not user:
         return jsonify(not_found), 404
-    if not id:
-        return jsonify(not_found), 404
-    transaction = storage.get(Transaction, id)
-    if not transaction and transaction._id in user.transactions:
+    transaction = storage.get_owned(Transaction, id, user._id)
+    if not transaction:
         return jsonify(not_found), 404
     txn_data = request.get_json()
     if not txn_data:
         return jsonify(not_found), 404
-    for key, value in txn_data.items():
+    error = is_transaction_valid(txn_data, transaction.to_dict())
+    if error:
+        return jsonify(error), 400
+    for key, value in client_values(txn_data).items():
         setattr(transaction, key, value)
     transaction.update()
     return jsonify(transaction.to_dict())
@@ -156,21 +261,41 @@ def txn_summary():
 
     Retrieves user identity, validates user existence, retrieves query parameters for year and month,
     performs database query to retrieve transaction summaries for the specified period.
+    year and month are also read from a JSON body, as older clients send
+    them. Results are kept in summary_cache under the user's version, so
+    repeated loads are answered from memory until a transaction changes.
 
     Returns:
         JSON: JSON response with transaction summaries based on year and month.
-              Returns "Not Found" message if user is not found or if data retrieval fails.
+              Returns "Not Found" message if user is not found, and 400 if the
+              year or month is not valid.
     """
     user_id = get_jwt_identity()
-    user = storage.get(User, user_id)
+    user = storage.get(User, user_id, [])
     if not user:
         return jsonify(not_found), 404
-    get_data = request.get_json()
-    if not get_data:
-        return jsonify(not_found), 404
+    get_data = request.get_json(silent=True)
+    if not isinstance(get_data, dict):
+        get_data = {}
+    period = {}
+    for name, low, high in (("year", 1, 9998), ("month", 1, 12)):
+        value = request.args.get(name, get_data.get(name))
+        try:
+            period[name] = None if value in (None, "") else int(value)
+        except (TypeError, ValueError):
+            period[name] = 0
+        if period[name] is not None and not low <= period[name] <= high:
+            return jsonify({"error": "Invalid year or month"}), 400
+    year, month = period["year"], period["month"]
     page = int(request.args.get('page', 1))
     page_size = int(request.args.get('page_size', 10))
-    result = storage.search(user, get_data.get("year"),
-                            get_data.get("month"), page,
-                            page_size)
+    version = user_version(user_id)
+    key = (user_id, year, month, page, page_size, version)
+    result = summary_cache.get(key)
+    if result is None:
+        if summary_cache.get(("version", user_id)) != version:
+            summary_cache.invalidate(user_id)
+            summary_cache.set(("version", user_id), version, tag=user_id)
+        result = storage.search(user, year, month, page, page_size)
+        summary_cache.set(key, result, tag=user_id)
     return jsonify(result)
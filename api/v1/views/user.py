@@ -17,7 +17,7 @@ Attributes:
     get_jwt_identity (Function): Retrieves the identity (user ID) from a JWT token.
     storage (SQLAlchemy): Database storage for ORM operations.
     User (Class): SQLAlchemy model for User data.
-    taken_value (Function): Checks if a value is already taken in the database.
+    DuplicateValueError (Class): Raised when a username or email is already taken.
     encrypt (Function): Encrypts passwords for secure storage.
     decrypt (Function): Decrypts passwords for authentication.
     not_found (dict): Dictionary with a "Not Found" message for error responses.
@@ -40,8 +40,13 @@ from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identi
 from flasgger import swag_from
 from models import storage
 from models.user import User
-from models.utility import taken_value, encrypt, decrypt, not_found
+from models.engine.errors import DuplicateValueError
+from models.utility import encrypt, decrypt, not_found
 from models.utility import is_user_valid
+from models.hashing import PoolBusyError, needs_rehash
+
+profile_fields = ["first_name", "last_name", "email", "username",
+                  "transactions", "created_date", "updated_date"]
 
 @app_views.route("/register", methods=["POST"], strict_slashes=False)
 @swag_from("documentation/user/register.yml")
@@ -49,21 +54,30 @@ def user_register():
     """
     Endpoint for user registration.
 
-    Validates user data, checks for existing usernames,
-    encrypts the password, creates a new User object, and saves it to the database.
+    Validates user data, encrypts the password, creates a new User object,
+    and saves it to the database. Taken usernames and emails are looked up
+    before the password is hashed, so a duplicate sign-up costs no bcrypt
+    round. The unique indexes still reject the values at insert, so
+    concurrent sign-ups cannot both take the same name.
 
     Returns:
         JSON: JSON response with user data including the newly created user ID.
               If validation fails or username is taken, returns an error message.
     """
     user_data = request.get_json()
-    if is_user_valid(user_data):
-        return jsonify(is_user_valid(user_data)), 400
-    if taken_value(User, **user_data):
-        return jsonify(taken_value(User, **user_data)), 409
+    error = is_user_valid(user_data)
+    if error:
+        return jsonify(error), 400
+    field = storage.taken(User, email=user_data["email"],
+                          username=user_data["username"])
+    if field:
+        return jsonify(f"{DuplicateValueError(field)}"), 409
     user_data["password"] = encrypt(user_data["password"])
     user = User(**user_data)
-    user.save()
+    try:
+        user.save()
+    except DuplicateValueError as error:
+        return jsonify(f"{error}"), 409
     return jsonify(user.to_dict())
 
 
@@ -74,6 +88,7 @@ def login():
     Endpoint for user login authentication.
 
     Retrieves login data, validates username, checks password, and generates a JWT token if successful.
+    Passwords hashed with another cost factor than BCRYPT_ROUNDS are hashed again.
 
     Returns:
         JSON: JSON response with a JWT token if login is successful.
@@ -81,9 +96,16 @@ def login():
     """
     login_data = request.get_json()
     if login_data:
-        user = storage.filter(User, "username", login_data["username"])
+        user = storage.filter(User, "username", login_data["username"],
+                              ["password"])
         if user:
             if decrypt(login_data["password"], user.password):
+                if needs_rehash(user.password):
+                    try:
+                        user.password = encrypt(login_data["password"])
+                        user.update()
+                    except PoolBusyError:
+                        pass
                 token = create_access_token(identity=str(user._id))
                 return jsonify({"token": token})
             else:
@@ -108,7 +130,7 @@ def get_user():
               Returns a "Not Found" message if user does not exist.
     """
     user_id = get_jwt_identity()
-    user = storage.get(User, user_id)
+    user = storage.get(User, user_id, profile_fields)
     if not user:
         return jsonify(not_found), 404
     user._id = str(user._id)
@@ -123,22 +145,34 @@ def update_user():
     Endpoint to update user profile information.
 
     Requires a valid JWT token for authentication.
-    Validates user data, updates user information, and saves changes to the database.
+    Validates user data, checks that the username and email are not taken
+    by another user, hashes the new password, updates user information,
+    and saves changes to the database.
 
     Returns:
         JSON: JSON response with updated user profile information.
-              Returns validation errors if user data is invalid.
+              Returns validation errors if user data is invalid, or a 409
+              if the new username or email belongs to another user.
     """
     user_id = get_jwt_identity()
-    user = storage.get(User, user_id)
+    user = storage.get(User, user_id, profile_fields)
     if not user:
         return jsonify(not_found), 404
     user_data = request.get_json()
-    if is_user_valid(user_data):
-        return jsonify(is_user_valid(user_data)), 400
+    error = is_user_valid(user_data)
+    if error:
+        return jsonify(error), 400
+    field = storage.taken(User, user._id, email=user_data["email"],
+                          username=user_data["username"])
+    if field:
+        return jsonify(f"{DuplicateValueError(field)}"), 409
+    user_data["password"] = encrypt(user_data["password"])
     for key, value in user_data.items():
         setattr(user, key, value)
-    user.update()
+    try:
+        user.update()
+    except DuplicateValueError as error:
+        return jsonify(f"{error}"), 409
     return jsonify(user.to_dict())
 
 
@@ -157,9 +191,9 @@ def delete_user():
               Returns an error if user does not exist.
     """
     user_id = get_jwt_identity()
-    user = storage.get(User, user_id)
-    user_name = f"{user.first_name} {user.last_name}"
+    user = storage.get(User, user_id, ["first_name", "last_name"])
     if not user:
         return jsonify(not_found), 400
+    user_name = f"{user.first_name} {user.last_name}"
     user.delete()
     return jsonify(user_name)
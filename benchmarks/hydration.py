@@ -0,0 +1,147 @@
+#!/usr/bin/python3
+
+"""
+hydration.py
+
+Microbenchmark of the conversion of stored transactions to API output,
+Transaction objects built from documents and written back with to_dict().
+The legacy path reproduces the per-field strptime, __setattr__ and
+strftime loops BaseModel used before from_documents().
+
+Usage:
+    python -m benchmarks.hydration
+    python -m benchmarks.hydration --rows 100000 --repeat 5
+"""
+
+import argparse
+from datetime import datetime, timedelta
+from models.base_model import time
+from models.transaction import Transaction
+import sys
+from timeit import repeat
+from uuid import uuid4
+
+
+def make_documents(rows, string_dates=False):
+    """
+    Builds documents shaped like the transactions read from MongoDB.
+    Half of the amounts are integers, the way JSON amounts like 5 are
+    stored, and half are floats.
+
+    Args:
+        rows (int): The number of documents.
+        string_dates (bool): Store the dates as strings instead of the
+                             datetime objects returned by pymongo.
+
+    Returns:
+        list: The documents.
+    """
+    start = datetime(2024, 1, 1)
+    documents = []
+    for index in range(rows):
+        created_date = start + timedelta(minutes=index)
+        if string_dates:
+            created_date = created_date.strftime(time)
+        documents.append({
+            "_id": str(uuid4()),
+            "created_date": created_date,
+            "updated_date": created_date,
+            "amount": index % 500 if index % 2 else index % 500 + 0.25,
+            "type": "expense" if index % 3 else "income",
+            "category": "food",
+            "description": "Benchmark transaction"
+        })
+    return documents
+
+
+def legacy_output(documents):
+    """
+    Converts documents to output the way BaseModel did before.
+
+    Args:
+        documents (list): The stored documents.
+
+    Returns:
+        list: The dictionaries of the transactions.
+    """
+    output = []
+    for values in documents:
+        txn = Transaction.__new__(Transaction)
+        object.__setattr__(txn, "_BaseModel__changed", None)
+        object.__setattr__(txn, "_BaseModel__removed", set())
+        for key, value in values.items():
+            if ("created_date" == key or "updated_date" == key) and \
+                    isinstance(value, str):
+                value = datetime.strptime(value, time)
+            setattr(txn, key, value)
+        txn.mark_clean()
+        to_dict = {}
+        for key, value in txn.__dict__.items():
+            if key != "password" and not key.startswith("_BaseModel__"):
+                to_dict[key] = value
+        to_dict["__class__"] = txn.__class__.__name__
+        for key in ("created_date", "updated_date"):
+            if key in to_dict and not isinstance(to_dict[key], str):
+                to_dict[key] = to_dict[key].strftime(time)
+        output.append(to_dict)
+    return output
+
+
+def current_output(documents):
+    """
+    Converts documents to output with the bulk hydration path.
+
+    Args:
+        documents (list): The stored documents.
+
+    Returns:
+        list: The dictionaries of the transactions.
+    """
+    return [txn.to_dict() for txn in Transaction.from_documents(documents)]
+
+
+def measure(function, documents, times):
+    """
+    Measures the best throughput of a conversion.
+
+    Args:
+        function (callable): The conversion to measure.
+        documents (list): The stored documents.
+        times (int): The number of runs.
+
+    Returns:
+        float: The number of rows converted per second.
+    """
+    best = min(repeat(lambda: function(documents), number=1, repeat=times))
+    return len(documents) / best
+
+
+def main(argv=None):
+    """
+    Command line entry point.
+
+    Args:
+        argv (list): The command line arguments.
+
+    Returns:
+        int: The exit status, 1 if both paths disagree.
+    """
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.hydration",
+                                     description="Measure model hydration")
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+    for label, string_dates in (("datetime", False), ("string", True)):
+        documents = make_documents(args.rows, string_dates)
+        if legacy_output(documents) != current_output(documents):
+            print(f"{label} dates: outputs differ")
+            return 1
+        before = measure(legacy_output, documents, args.repeat)
+        after = measure(current_output, documents, args.repeat)
+        print(f"{label} dates: before {before:,.0f} rows/s, "
+              f"after {after:,.0f} rows/s ({after / before:.1f}x)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+#!/usr/bin/python3
+
+"""
+json_encoding.py
+
+Compares the encoding of transaction pages by Flask's default JSON
+provider, pretty (as in debug mode) and compact, with FastJSONProvider.
+
+Usage:
+    python -m benchmarks.json_encoding
+    python -m benchmarks.json_encoding --page-size 100 --number 200
+"""
+
+import argparse
+from api.v1.json_provider import FastJSONProvider, orjson
+from benchmarks.hydration import current_output, make_documents
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+import sys
+from timeit import timeit
+
+
+def make_page(page_size):
+    """
+    Builds a page shaped like the response of filter_all.
+
+    Args:
+        page_size (int): The number of transactions of the page.
+
+    Returns:
+        dict: The page.
+    """
+    return {
+        "page": 1,
+        "page_size": page_size,
+        "total_pages": 10,
+        "total_documents": page_size * 10,
+        "summery": {"expense": 1234.5, "income": 5678.25},
+        "transactions": current_output(make_documents(page_size))
+    }
+
+
+def main(argv=None):
+    """
+    Command line entry point.
+
+    Args:
+        argv (list): The command line arguments.
+
+    Returns:
+        int: The exit status.
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.json_encoding",
+        description="Measure JSON encoding of transaction pages")
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--number", type=int, default=200)
+    args = parser.parse_args(argv)
+    app = Flask(__name__)
+    page = make_page(args.page_size)
+    flask_json = DefaultJSONProvider(app)
+    fast_json = FastJSONProvider(app)
+    encoders = (
+        ("flask pretty", lambda: flask_json.dumps(page, indent=2)),
+        ("flask compact", lambda: flask_json.dumps(page)),
+        ("fast compact", lambda: fast_json.encode(page))
+    )
+    print(f"encoder: {'orjson' if orjson else 'json'}")
+    with app.app_context():
+        for label, encode in encoders:
+            size = len(encode())
+            seconds = timeit(encode, number=args.number) / args.number
+            print(f"{label}: {seconds * 1e6:,.0f} us per page, "
+                  f"{size:,} bytes")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+#!/usr/bin/python3
+
+"""
+memory.py
+
+Measures the memory held by transactions loaded from the database, as a
+list of Transaction objects and as a TransactionBatch. The documents mix
+integer and float amounts, like the stored transactions.
+
+Usage:
+    python -m benchmarks.memory
+    python -m benchmarks.memory --rows 100000
+"""
+
+import argparse
+from benchmarks.hydration import make_documents
+from models.transaction import Transaction
+from models.transaction_batch import TransactionBatch
+import sys
+import tracemalloc
+
+
+def measure(build, rows):
+    """
+    Measures the memory kept by a container of transactions. The
+    documents are generated one at a time, so only what the container
+    keeps is counted.
+
+    Args:
+        build (callable): Builds the container from an iterable of
+                          documents.
+        rows (int): The number of transactions.
+
+    Returns:
+        int: The number of bytes held by the container.
+    """
+    documents = (document for chunk in range(0, rows, 1000)
+                 for document in make_documents(min(1000, rows - chunk)))
+    tracemalloc.start()
+    container = build(documents)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del container
+    return size
+
+
+def main(argv=None):
+    """
+    Command line entry point.
+
+    Args:
+        argv (list): The command line arguments.
+
+    Returns:
+        int: The exit status.
+    """
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.memory",
+                                     description="Measure transaction memory")
+    parser.add_argument("--rows", type=int, default=100000)
+    args = parser.parse_args(argv)
+    objects = measure(Transaction.from_documents, args.rows)
+    batch = measure(TransactionBatch.from_documents, args.rows)
+    for label, size in (("Transaction list", objects),
+                        ("TransactionBatch", batch)):
+        print(f"{label}: {size / 2 ** 20:.1f} MiB, "
+              f"{size / args.rows:.0f} bytes per transaction")
+    print(f"TransactionBatch uses {batch / objects:.0%} of the memory")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
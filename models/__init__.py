@@ -1,3 +1,14 @@
-from .engine.db_storage import DBStorage
-storage = DBStorage()
-storage.reload()
\ No newline at end of file
+import atexit
+from os import getenv
+
+if getenv("WEALTHWISE_STORAGE", "mongo") == "memory":
+    from .engine.memory_storage import MemoryStorage
+    storage = MemoryStorage()
+elif getenv("WEALTHWISE_STORAGE") == "sqlite":
+    from .engine.sqlite_storage import SQLiteStorage
+    storage = SQLiteStorage()
+else:
+    from .engine.db_storage import DBStorage
+    storage = DBStorage()
+storage.reload()
+atexit.register(storage.shutdown)
@@ -13,6 +13,49 @@ import models
 from uuid import uuid4
 
 time = "%Y-%m-%dT%H:%M:%S.%f"
+date_fields = ("created_date", "updated_date")
+hidden_fields = frozenset(("password", "version", "_BaseModel__changed",
+                           "_BaseModel__removed"))
+
+
+def parse_time(value):
+    """
+    Parse a date written in the time format. fromisoformat reads this
+    format far faster than strptime, which is only used as a fallback for
+    fractions fromisoformat does not accept on older Python versions.
+    Dates with an offset are converted to naive UTC, the way MongoDB
+    stores and compares them.
+
+    Args:
+        value (str): The date to parse.
+
+    Returns:
+        datetime: The parsed date, without time zone.
+
+    Raises:
+        ValueError: If the value is not a date in the time format.
+    """
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return datetime.strptime(value, time)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def format_time(value):
+    """
+    Write a date in the time format, without its time zone, like
+    value.strftime(time) but faster.
+
+    Args:
+        value (datetime): The date to write.
+
+    Returns:
+        str: The formatted date.
+    """
+    return value.isoformat(timespec="microseconds")[:26]
 
 
 class BaseModel:
@@ -20,10 +63,17 @@ class BaseModel:
     This class is the base for all other classes containing methods for
     saving and converting to dictionary format.
 
+    Objects loaded from the database keep track of the attributes changed
+    since they were loaded, so only those are written back by update().
+
     Attributes:
         _id (str): Identifies each object uniquely.
         created_date (datetime): Stores the created date of the object.
         updated_date (datetime): Stores the updated date of the object.
+        __changed (set): Names of the attributes set since the object was
+                         loaded, None for an object never stored.
+        __removed (set): Names of the attributes deleted since the object
+                         was loaded.
     """
 
     def __init__(self, *args, **kwargs):
@@ -34,22 +84,131 @@ class BaseModel:
             *args: Variable length argument list.
             **kwargs: Arbitrary keyword arguments.
         """
+        object.__setattr__(self, "_BaseModel__changed", None)
+        object.__setattr__(self, "_BaseModel__removed", set())
         if "_id" not in kwargs.keys() and "updated_date" not in \
                 kwargs.keys() and "__class__" not in kwargs.keys():
             self._id = str(uuid4())
             self.created_date = datetime.now(timezone.utc)
             self.updated_date = self.created_date
             for key, value in kwargs.items():
-                if "created_date" == key or "updated_date" == key:
-                    value = datetime.strptime(value, time)
+                if key in date_fields and isinstance(value, str):
+                    value = parse_time(value)
                 setattr(self, key, value)
         elif kwargs:
-            if kwargs.get("__class__"):
-                del kwargs["__class__"]
-            for key, value in kwargs.items():
-                if "created_date" == key or "updated_date" == key:
-                    value = datetime.strptime(value, time)
-                setattr(self, key, value)
+            self.__load(kwargs)
+
+    @classmethod
+    def from_document(cls, document):
+        """
+        Build an object loaded from the database. The attributes are
+        copied in one step instead of going through __setattr__.
+
+        Args:
+            document (dict): The stored document.
+
+        Returns:
+            BaseModel: The object, with no changes to write.
+        """
+        obj = cls.__new__(cls)
+        obj.__load(document)
+        return obj
+
+    @classmethod
+    def from_documents(cls, documents):
+        """
+        Build the objects of a batch of documents read from the database.
+
+        Args:
+            documents: Iterable of stored documents.
+
+        Returns:
+            list: The objects, in the same order.
+        """
+        from_document = cls.from_document
+        return [from_document(document) for document in documents]
+
+    def __load(self, document):
+        """
+        Set the attributes of an object loaded from the database and mark
+        it clean. Dates stored as strings are parsed.
+
+        Args:
+            document (dict): The stored document.
+        """
+        values = self.__dict__
+        values.update(document)
+        values.pop("__class__", None)
+        for key in date_fields:
+            value = values.get(key)
+            if isinstance(value, str):
+                values[key] = parse_time(value)
+        values["_BaseModel__changed"] = set()
+        values["_BaseModel__removed"] = set()
+
+    def __setattr__(self, key, value):
+        """
+        Set an attribute and remember that it changed.
+
+        Args:
+            key (str): The name of the attribute.
+            value: The new value.
+        """
+        changed = self.__dict__.get("_BaseModel__changed")
+        if changed is not None and (key not in self.__dict__ or
+                                    self.__dict__[key] != value):
+            changed.add(key)
+            self.__removed.discard(key)
+        object.__setattr__(self, key, value)
+
+    def __delattr__(self, key):
+        """
+        Delete an attribute and remember that it was removed.
+
+        Args:
+            key (str): The name of the attribute.
+        """
+        object.__delattr__(self, key)
+        if self.__changed is not None:
+            self.__changed.discard(key)
+            self.__removed.add(key)
+
+    def changes(self):
+        """
+        Return the attributes changed since the object was loaded.
+
+        Returns:
+            tuple: The names of the set and of the deleted attributes, or
+                   None if the object was never stored.
+        """
+        if self.__changed is None:
+            return None
+        return set(self.__changed), set(self.__removed)
+
+    def is_changed(self):
+        """
+        Check whether the object has changes to write.
+
+        Returns:
+            bool: True if an attribute changed or the object was never
+                  stored.
+        """
+        return self.__changed is None or bool(self.__changed) or \
+            bool(self.__removed)
+
+    def mark_clean(self, *keys):
+        """
+        Forget the changes once they are stored.
+
+        Args:
+            *keys: The attributes to forget, all of them when not given.
+        """
+        if keys and self.__changed is not None:
+            self.__changed.difference_update(keys)
+            self.__removed.difference_update(keys)
+        elif not keys:
+            object.__setattr__(self, "_BaseModel__changed", set())
+            object.__setattr__(self, "_BaseModel__removed", set())
 
     def save(self):
         """
@@ -60,10 +219,14 @@ class BaseModel:
 
     def update(self):
         """
-        Update the object in the database.
+        Update the object in the database. Nothing is written when no
+        attribute changed since the object was loaded.
         """
+        if not self.is_changed():
+            return
         self.updated_date = datetime.now(timezone.utc)
         models.storage.update(self)
+        models.storage.invalidate(self)
 
     def to_dict(self):
         """
@@ -72,19 +235,13 @@ class BaseModel:
         Returns:
             dict: A dictionary representation of the instance.
         """
-        to_dict = {}
-        for key, value in self.__dict__.items():
-            if key != "password":
-                to_dict[key] = value
+        to_dict = {key: value for key, value in self.__dict__.items()
+                   if key not in hidden_fields}
         to_dict["__class__"] = self.__class__.__name__
-        if "created_date" in to_dict and not\
-                isinstance(to_dict["created_date"], str):
-            to_dict["created_date"] = \
-                    to_dict["created_date"].strftime("%Y-%m-%dT%H:%M:%S.%f")
-        if "updated_date" in\
-                to_dict and not isinstance(to_dict["updated_date"], str):
-            to_dict["updated_date"] =\
-                to_dict["updated_date"].strftime("%Y-%m-%dT%H:%M:%S.%f")
+        for key in date_fields:
+            value = to_dict.get(key)
+            if isinstance(value, datetime):
+                to_dict[key] = format_time(value)
         return to_dict
 
     def __str__(self):
@@ -101,3 +258,4 @@ class BaseModel:
         Delete the object from the database.
         """
         models.storage.delete(self)
+        models.storage.invalidate(self)
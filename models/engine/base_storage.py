@@ -0,0 +1,372 @@
+#!/usr/bin/python3
+
+"""
+base_storage.py
+
+This module defines the BaseStorage class, the interface every storage
+engine of the WealthWise application implements. The models and the API
+only call the methods declared here, so the engine can be chosen with the
+WEALTHWISE_STORAGE environment variable.
+
+Classes:
+    BaseStorage: Interface of the storage engines.
+
+Functions:
+    apply_array: Applies an array update operator to a list.
+    owned_ids: Groups the ids of transactions by owner.
+"""
+
+from abc import ABC, abstractmethod
+from datetime import datetime
+from models.base_model import date_fields
+
+
+def apply_array(current, operator, values):
+    """
+    Applies an array update operator to a list the way MongoDB does.
+
+    Args:
+        current (list): The current values, None for a missing field.
+        operator (str): One of $push, $pull and $addToSet.
+        values (tuple): The values of the operation.
+
+    Returns:
+        list: A new list with the change applied.
+    """
+    current = list(current or [])
+    if operator == "$push":
+        current.extend(values)
+    elif operator == "$pull":
+        current = [value for value in current if value not in values]
+    else:
+        current.extend(value for value in dict.fromkeys(values)
+                       if value not in current)
+    return current
+
+
+def owned_ids(documents):
+    """
+    Groups the ids of transactions by owner, in insertion order.
+
+    Args:
+        documents (list): The transactions.
+
+    Returns:
+        dict: The list of transaction ids of each user_id, transactions
+              without an owner are left out.
+    """
+    owners = {}
+    for document in documents:
+        if document.get("user_id"):
+            owners.setdefault(document["user_id"], []).append(
+                document["_id"])
+    return owners
+
+
+class BaseStorage(ABC):
+    """
+    BaseStorage Class
+
+    Declares the operations a storage engine provides for User,
+    Transaction and ImportJob objects, and implements the ones that do not
+    depend on the engine.
+
+    Attributes:
+        pooled (bool): True when the engine outlives requests, so it is not
+                       closed after each one.
+        embed_transaction_ids (bool): True when the ids of a user's
+                                      transactions are also kept in the
+                                      user document.
+    """
+
+    pooled = True
+    embed_transaction_ids = True
+
+    def to_document(self, obj):
+        """
+        Converts an object to the document stored by the engine. Dates are
+        kept as datetime objects.
+
+        Args:
+            obj (BaseModel): The object to convert.
+
+        Returns:
+            dict: The document to store.
+        """
+        data = obj.to_dict()
+        if data.get("__class__"):
+            del data["__class__"]
+        for key in date_fields:
+            value = getattr(obj, key, None)
+            if isinstance(value, datetime):
+                data[key] = value
+        if obj.__class__.__name__ == "User":
+            data["password"] = obj.password
+        return data
+
+    @abstractmethod
+    def new(self, obj):
+        """
+        Stores a new object. A new transaction is added to the ids kept
+        in its owner when embed_transaction_ids is set.
+
+        Args:
+            obj (BaseModel): The object to store.
+
+        Raises:
+            DuplicateValueError: If a value that must be unique, like the
+                                 username, is already stored.
+        """
+
+    @abstractmethod
+    def new_many(self, objs):
+        """
+        Stores objects of the same class in one operation. Stored
+        transactions are added to the ids kept in their owners when
+        embed_transaction_ids is set.
+
+        Args:
+            objs (list): The objects to store.
+
+        Returns:
+            list: For each object, None if it was stored or the error
+            message.
+        """
+
+    @abstractmethod
+    def update(self, obj):
+        """
+        Writes the attributes of an object changed since it was loaded.
+
+        Args:
+            obj (BaseModel): The object to write.
+
+        Raises:
+            DuplicateValueError: If a value that must be unique, like the
+                                 username, is already stored.
+        """
+
+    @abstractmethod
+    def delete(self, obj=None):
+        """
+        Deletes an object.
+
+        Args:
+            obj (BaseModel, optional): The object to delete.
+        """
+
+    @abstractmethod
+    def get(self, cls, id, fields=None):
+        """
+        Retrieves an object by class and ID.
+
+        Args:
+            cls (BaseModel): The class of the object to retrieve.
+            id (str): The ID of the object to retrieve.
+            fields (list, optional): The only fields to load, the object
+                                     is then partial. _id is always
+                                     loaded. Defaults to every field.
+
+        Returns:
+            BaseModel: The retrieved object, or None if not found.
+        """
+
+    @abstractmethod
+    def get_owned(self, cls, id, owner, fields=None):
+        """
+        Retrieves an object by ID only if it belongs to the given user.
+
+        Args:
+            cls (BaseModel): The class of the object to retrieve.
+            id (str): The ID of the object to retrieve.
+            owner (str): The ID of the user who must own the object.
+            fields (list, optional): The only fields to load.
+
+        Returns:
+            BaseModel: The retrieved object, or None if it is not found
+            or belongs to another user.
+        """
+
+    @abstractmethod
+    def filter(self, cls, column_name, value, fields=None):
+        """
+        Retrieves an object by class and a specified column value.
+
+        Args:
+            cls (BaseModel): The class of the object to retrieve.
+            column_name (str): The column name to filter by.
+            value (str): The value to filter by.
+            fields (list, optional): The only fields to load.
+
+        Returns:
+            BaseModel: The retrieved object, or None if not found.
+        """
+
+    @abstractmethod
+    def taken(self, cls, exclude=None, **values):
+        """
+        Finds which of the given values are already stored.
+
+        Args:
+            cls (BaseModel): The class of the objects to look in.
+            exclude (str, optional): The id of an object to ignore.
+            **values: The values to look for, by field.
+
+        Returns:
+            str: The first field, in argument order, whose value is
+                 already stored, or None if none is.
+        """
+
+    @abstractmethod
+    def search(self, obj, year, month, page, page_size):
+        """
+        Searches for a user's transactions based on year and month, with
+        pagination and a summary of the amounts by type.
+
+        Args:
+            obj (User): The user object to retrieve transactions for.
+            year (int): The year to filter transactions by.
+            month (int): The month to filter transactions by.
+            page (int): The page number for pagination.
+            page_size (int): The number of transactions per page.
+
+        Returns:
+            dict: A dictionary containing pagination details, summary,
+            and transactions, or an empty one if there is none.
+        """
+
+    @abstractmethod
+    def filter_all(self, obj, page, page_size, cursor=None):
+        """
+        Retrieves all transactions for a user with pagination, by page
+        number or after a cursor.
+
+        Args:
+            obj (User): The user object to retrieve transactions for.
+            page (int): The page number for pagination.
+            page_size (int): The number of transactions per page.
+            cursor (str, optional): The next_cursor of the previous page.
+
+        Returns:
+            dict: A dictionary containing pagination details and
+            transactions.
+
+        Raises:
+            ValueError: If the cursor is not valid.
+        """
+
+    @abstractmethod
+    def iter_transactions(self, obj, batch_size=500):
+        """
+        Reads all transactions of a user lazily, newest first.
+
+        Args:
+            obj (User): The user object to retrieve transactions for.
+            batch_size (int): The number of transactions read at once.
+
+        Yields:
+            dict: The dictionary representation of each transaction.
+        """
+
+    @abstractmethod
+    def load_transactions(self, obj, batch_size=500):
+        """
+        Loads all transactions of a user into a TransactionBatch.
+
+        Args:
+            obj (User): The user object to retrieve transactions for.
+            batch_size (int): The number of transactions read at once.
+
+        Returns:
+            TransactionBatch: The transactions, newest first.
+        """
+
+    @abstractmethod
+    def update_array(self, obj, operator, field, values):
+        """
+        Runs an array update operator on one field of a stored object and
+        applies the same change to the object in memory.
+
+        Args:
+            obj (BaseModel): The object to update.
+            operator (str): One of $push, $pull and $addToSet.
+            field (str): The name of the array field.
+            values (tuple): The values of the operation.
+        """
+
+    @abstractmethod
+    def version(self, user_id):
+        """
+        Reads the version counter of a user, raised by every change to the
+        user or to their transactions.
+
+        Args:
+            user_id (str): The ID of the user.
+
+        Returns:
+            int: The version of the user, 0 if the user is not found.
+        """
+
+    def push(self, obj, field, *values):
+        """
+        Appends values to an array field of a stored object, without
+        rewriting the rest of the object.
+
+        Args:
+            obj (BaseModel): The object to update.
+            field (str): The name of the array field.
+            *values: The values to append.
+        """
+        self.update_array(obj, "$push", field, values)
+
+    def pull(self, obj, field, *values):
+        """
+        Removes every occurrence of values from an array field of a
+        stored object.
+
+        Args:
+            obj (BaseModel): The object to update.
+            field (str): The name of the array field.
+            *values: The values to remove.
+        """
+        self.update_array(obj, "$pull", field, values)
+
+    def add_to_set(self, obj, field, *values):
+        """
+        Appends the values missing from an array field of a stored object.
+
+        Args:
+            obj (BaseModel): The object to update.
+            field (str): The name of the array field.
+            *values: The values to add.
+        """
+        self.update_array(obj, "$addToSet", field, values)
+
+    def invalidate(self, obj):
+        """
+        Drops the cached copies of an object after it changed. Engines
+        without a cache have nothing to do.
+
+        Args:
+            obj (BaseModel): The object that changed.
+        """
+
+    def ensure_indexes(self):
+        """
+        Creates the indexes the engine needs, if it has any.
+        """
+
+    def reload(self):
+        """
+        Makes sure the engine is ready before a request.
+        """
+
+    def close(self):
+        """
+        Releases the resources held for a request.
+        """
+
+    def shutdown(self):
+        """
+        Releases every resource when the process exits.
+        """
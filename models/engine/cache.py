@@ -0,0 +1,182 @@
+#!/usr/bin/python3
+
+"""
+cache.py
+
+This module defines the LRUCache class, a thread-safe in-process cache
+with a bounded size and a time to live, used by DBStorage to avoid
+repeated database round trips.
+
+Classes:
+    LRUCache: Least recently used cache with expiry and tag invalidation.
+"""
+
+from collections import OrderedDict
+import threading
+from time import monotonic
+
+
+class LRUCache:
+    """
+    LRUCache Class
+
+    Keeps at most maxsize entries, evicting the least recently used one
+    when full. Entries expire ttl seconds after they were stored. Every
+    entry can carry a tag, so all the entries of one user can be dropped
+    at once when the user's data changes.
+
+    A value read from the database before its tag was invalidated must
+    not be stored after it: take generation() before the read and pass
+    it to set(), which then skips the stale value.
+
+    Attributes:
+        maxsize (int): The maximum number of entries, 0 disables the cache.
+        ttl (float): The number of seconds an entry stays valid.
+        hits (int): The number of lookups answered from the cache.
+        misses (int): The number of lookups not found or expired.
+        evictions (int): The number of entries dropped to make room.
+    """
+
+    def __init__(self, maxsize=1024, ttl=30):
+        """
+        Initializes an empty cache.
+
+        Args:
+            maxsize (int): The maximum number of entries.
+            ttl (float): The number of seconds an entry stays valid.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.__entries = OrderedDict()
+        self.__tags = {}
+        self.__generation = 0
+        self.__invalidated = OrderedDict()
+        self.__floor = 0
+        self.__lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """
+        Looks up an entry and marks it as recently used.
+
+        Args:
+            key: The key of the entry.
+            default: The value returned when the entry is missing.
+
+        Returns:
+            The cached value, or default if missing or expired.
+        """
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is None or entry[1] <= monotonic():
+                if entry is not None:
+                    self.__remove(key)
+                self.misses += 1
+                return default
+            self.__entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def generation(self):
+        """
+        Returns the current generation, to take before reading a value
+        that will be passed to set().
+
+        Returns:
+            int: The number of invalidations so far.
+        """
+        with self.__lock:
+            return self.__generation
+
+    def set(self, key, value, tag=None, generation=None):
+        """
+        Stores an entry, evicting the least recently used ones if full.
+
+        Args:
+            key: The key of the entry.
+            value: The value to store.
+            tag (optional): The tag used to invalidate the entry.
+            generation (int, optional): The generation() taken before the
+                                        value was read. The value is not
+                                        stored if its tag was invalidated
+                                        since.
+        """
+        if self.maxsize <= 0:
+            return
+        with self.__lock:
+            if generation is not None and tag is not None and \
+                    self.__invalidated.get(tag, self.__floor) > generation:
+                return
+            if key in self.__entries:
+                self.__remove(key)
+            self.__entries[key] = (value, monotonic() + self.ttl, tag)
+            if tag is not None:
+                self.__tags.setdefault(tag, set()).add(key)
+            while len(self.__entries) > self.maxsize:
+                self.__remove(next(iter(self.__entries)))
+                self.evictions += 1
+
+    def invalidate(self, tag):
+        """
+        Drops every entry stored with a tag. The last invalidations are
+        remembered for set(); for older ones set() assumes the worst.
+
+        Args:
+            tag: The tag of the entries to drop.
+        """
+        with self.__lock:
+            for key in self.__tags.pop(tag, ()):
+                self.__entries.pop(key, None)
+            self.__generation += 1
+            self.__invalidated[tag] = self.__generation
+            self.__invalidated.move_to_end(tag)
+            while len(self.__invalidated) > max(self.maxsize, 1):
+                self.__floor = self.__invalidated.popitem(last=False)[1]
+
+    def clear(self):
+        """
+        Drops every entry.
+        """
+        with self.__lock:
+            self.__entries.clear()
+            self.__tags.clear()
+
+    def stats(self):
+        """
+        Returns the counters of the cache.
+
+        Returns:
+            dict: The hits, misses, evictions, size and limits.
+        """
+        with self.__lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self.__entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl
+            }
+
+    def __len__(self):
+        """
+        Returns the number of entries, expired ones included.
+        """
+        return len(self.__entries)
+
+    def __remove(self, key):
+        """
+        Drops one entry and its tag reference. The lock must be held.
+
+        Args:
+            key: The key of the entry.
+        """
+        value, expires, tag = self.__entries.pop(key)
+        if tag is not None:
+            keys = self.__tags.get(tag)
+            if keys:
+                keys.discard(key)
+                if not keys:
+                    del self.__tags[tag]
@@ -20,51 +20,254 @@ Attributes:
 from datetime import datetime
 import math
 from models.base_model import BaseModel
+from models.engine.base_storage import BaseStorage, apply_array, owned_ids
+from models.import_job import ImportJob
+from models.engine import indexes, rollups
+from models.engine.cache import LRUCache
+from models.engine.errors import DuplicateValueError, duplicate_field
+from models.engine.pagination import after_cursor, encode_cursor
 from models.user import User
 from models.transaction import Transaction
-from pymongo import MongoClient
-from os import getenv
+from models.transaction_batch import TransactionBatch
+from pymongo import MongoClient, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from os import getenv, getpid, register_at_fork
+import threading
 
 classes = {
     "User": User,
-    "transaction": Transaction
+    "transaction": Transaction,
+    "ImportJob": ImportJob
 }
 
+transaction_projection = {
+    "_id": 1,
+    "created_date": 1,
+    "updated_date": 1,
+    "amount": 1,
+    "type": 1,
+    "category": 1,
+    "description": 1
+}
+
+rollup_projection = {
+    "user_id": 1,
+    "created_date": 1,
+    "amount": 1,
+    "type": 1,
+    "category": 1
+}
+
+transaction_order = {"created_date": -1, "_id": -1}
+
+date_string_format = "%Y-%m-%dT%H:%M:%S.%L000"
+
+pool_settings = {
+    "maxPoolSize": "MONGO_MAX_POOL_SIZE",
+    "minPoolSize": "MONGO_MIN_POOL_SIZE",
+    "maxIdleTimeMS": "MONGO_MAX_IDLE_TIME_MS",
+    "waitQueueTimeoutMS": "MONGO_WAIT_QUEUE_TIMEOUT_MS",
+    "connectTimeoutMS": "MONGO_CONNECT_TIMEOUT_MS",
+    "socketTimeoutMS": "MONGO_SOCKET_TIMEOUT_MS",
+    "serverSelectionTimeoutMS": "MONGO_SERVER_SELECTION_TIMEOUT_MS"
+}
+
+
+def pool_options():
+    """
+    Builds the MongoClient pool options from environment variables.
+
+    Only the options that are set in the environment are returned, so
+    unset values fall back to the pymongo defaults.
 
-class DBStorage:
+    Returns:
+        dict: Keyword arguments to pass to MongoClient.
+    """
+    options = {}
+    for option, env_name in pool_settings.items():
+        value = getenv(env_name)
+        if value:
+            options[option] = int(value)
+    return options
+
+
+def projection(fields=None):
+    """
+    Builds the projection loading only some fields of a document.
+
+    Args:
+        fields (list, optional): The names of the fields to load.
+
+    Returns:
+        dict: The projection, or None to load every field.
+    """
+    if fields is None:
+        return None
+    fields = {field: 1 for field in fields}
+    fields["_id"] = 1
+    return fields
+
+
+def date_string(field):
+    """
+    Builds the aggregation expression writing a stored date the way
+    BaseModel.to_dict does. BSON dates have millisecond precision, so the
+    microseconds always end with 000. Dates still stored as strings are
+    returned unchanged and missing dates stay missing.
+
+    Args:
+        field (str): The name of the date field.
+
+    Returns:
+        dict: The aggregation expression.
+    """
+    return {"$cond": [
+        {"$eq": [{"$type": "$" + field}, "date"]},
+        {"$dateToString": {"format": date_string_format, "date": "$" + field}},
+        "$" + field
+    ]}
+
+
+def lean_pipeline(match, skip=0, limit=0):
+    """
+    Builds the pipeline of a read-only transaction page. The server
+    returns the documents exactly as Transaction.to_dict() would write
+    them, so they are sent to the client without building models.
+
+    Args:
+        match (dict): The query selecting the transactions.
+        skip (int, optional): The number of transactions to skip.
+        limit (int, optional): The maximum number of transactions.
+
+    Returns:
+        list: The aggregation pipeline.
+    """
+    pipeline = [{"$match": match}, {"$sort": transaction_order}]
+    if skip:
+        pipeline.append({"$skip": skip})
+    if limit:
+        pipeline.append({"$limit": limit})
+    pipeline.append({"$project": lean_projection})
+    return pipeline
+
+
+def copy_document(data):
+    """
+    Copies a cached document so the objects built from it can change
+    their lists without changing the cache.
+
+    Args:
+        data (dict): The cached document.
+
+    Returns:
+        dict: The copy.
+    """
+    return {key: list(value) if isinstance(value, list) else value
+            for key, value in data.items()}
+
+
+def month_range(year, month=None):
+    """
+    Builds a range predicate matching the dates of a year or of one
+    month of a year.
+
+    Args:
+        year (int): The year to match.
+        month (int, optional): The month to match, the whole year when
+                               not given.
+
+    Returns:
+        dict: A $gte/$lt predicate on datetime bounds.
+    """
+    year = int(year)
+    if month:
+        month = int(month)
+        start = datetime(year, month, 1)
+        if month == 12:
+            end = datetime(year + 1, 1, 1)
+        else:
+            end = datetime(year, month + 1, 1)
+    else:
+        start = datetime(year, 1, 1)
+        end = datetime(year + 1, 1, 1)
+    return {"$gte": start, "$lt": end}
+
+
+lean_projection = dict(transaction_projection,
+                       created_date=date_string("created_date"),
+                       updated_date=date_string("updated_date"),
+                       __class__={"$literal": Transaction.__name__})
+
+
+class DBStorage(BaseStorage):
     """
     DBStorage Class
 
     This class provides methods to connect to the MongoDB database and
     perform CRUD operations on User and Transaction data.
 
+    The MongoClient is shared by every DBStorage instance of the process
+    and keeps its own connection pool, so the client is created once and
+    reused by all request threads. Setting MONGO_CONNECTION_MODE to
+    "request" restores the old behaviour of closing the client after each
+    request: every reload() is then matched by a close(), and only the
+    last close() of the requests and imports using the client closes it.
+
     Attributes:
-        __client (MongoClient): MongoDB client instance.
+        __client (MongoClient): MongoDB client instance shared by the
+                                process.
         __db (Database): MongoDB database instance.
+        __pid (int): ID of the process that created the client.
+        __lock (Lock): Guards the creation of the shared client.
+        __holders (int): Number of reload() calls not yet closed, in
+                         request mode.
+        pooled (bool): True when the shared client outlives requests.
+        embed_transaction_ids (bool): True when the ids of a user's
+                                      transactions are also kept in the
+                                      user document.
+        user_cache (LRUCache): Read-through cache of the users loaded by
+                               get().
     """
 
     __client = None
     __db = None
+    __pid = None
+    __lock = threading.Lock()
+    __holders = 0
 
     def __init__(self):
         """
         Initializes the DBStorage instance by establishing a connection
         to the MongoDB database.
         """
+        self.pooled = getenv('MONGO_CONNECTION_MODE', 'pooled') != 'request'
+        self.embed_transaction_ids = \
+            getenv('EMBED_TRANSACTION_IDS', '1') != '0'
+        self.user_cache = LRUCache(int(getenv('USER_CACHE_SIZE', 1024)),
+                                   float(getenv('USER_CACHE_TTL', 30)))
         self.connect()
 
     def connect(self):
         """
         Establishes a connection to the MongoDB database using environment
-        variables for configuration. If a connection already exists,
-        it does nothing.
+        variables for configuration. If a connection already exists for
+        the current process, it does nothing.
+
+        A client inherited through fork() is never reused, the child
+        process creates its own pool instead.
         """
-        if not self.__client:
+        if DBStorage.__client and DBStorage.__pid == getpid():
+            return
+        with DBStorage.__lock:
+            if DBStorage.__client and DBStorage.__pid == getpid():
+                return
             MONGO_HOST = getenv('MONGO_HOST', 'localhost')
             MONGO_PORT = int(getenv('MONGO_PORT', 27017))
             MONGO_DB = getenv('MONGO_DB', 'wealthwise')
-            self.__client = MongoClient(MONGO_HOST, MONGO_PORT)
-            self.__db = self.__client[MONGO_DB]
+            client = MongoClient(MONGO_HOST, MONGO_PORT, **pool_options())
+            DBStorage.__db = client[MONGO_DB]
+            DBStorage.__pid = getpid()
+            DBStorage.__client = client
 
     def get_collection(self, collection_name):
         """
@@ -76,41 +279,305 @@ class DBStorage:
         Returns:
             Collection: The MongoDB collection object.
         """
-        return self.__db[collection_name]
+        if DBStorage.__pid != getpid():
+            self.connect()
+        return DBStorage.__db[collection_name]
+
+    def ensure_indexes(self):
+        """
+        Creates the indexes declared in models.engine.indexes that are
+        missing from the database.
+        """
+        indexes.ensure_indexes(self)
 
     def new(self, obj):
         """
         Inserts a new object into the corresponding MongoDB collection.
+        A new transaction is added to the ids kept in its owner.
 
         Args:
             obj (BaseModel): The object to be inserted into the database.
+
+        Raises:
+            DuplicateValueError: If a value held by a unique index, like
+                                 the username, is already stored.
         """
         collection = self.get_collection(obj.__class__.__name__.lower() +
                                          "s")
-        data = obj.to_dict()
-        if obj.__class__.__name__ == "User":
-            data["password"] = obj.password
+        data = self.to_document(obj)
+        if obj.__class__.__name__ == "User" and self.embed_transaction_ids:
             data["transactions"] = []
-        if data.get("__class__"):
-            del data["__class__"]
-        collection.insert_one(data)
+        try:
+            collection.insert_one(data)
+        except DuplicateKeyError as error:
+            raise self.duplicate(obj, data, error) from error
+        obj.mark_clean()
+        if isinstance(obj, Transaction):
+            rollups.record(self, after=data)
+            self.__add_to_owners([data])
+
+    def new_many(self, objs):
+        """
+        Inserts objects of the same class with one unordered insert_many
+        and updates the monthly rollups of the inserted transactions in a
+        single bulk write. Inserted transactions are added to the ids kept
+        in their owners.
+
+        Args:
+            objs (list): The objects to insert.
+
+        Returns:
+            list: For each object, None if it was inserted or the error
+            message of the database.
+        """
+        if not objs:
+            return []
+        collection = self.get_collection(objs[0].__class__.__name__.lower() +
+                                         "s")
+        documents = [self.to_document(obj) for obj in objs]
+        errors = {}
+        try:
+            collection.insert_many(documents, ordered=False)
+        except BulkWriteError as error:
+            for write_error in error.details.get("writeErrors", []):
+                errors[write_error["index"]] = write_error["errmsg"]
+        inserted = []
+        for index, obj in enumerate(objs):
+            if index not in errors:
+                obj.mark_clean()
+                inserted.append(documents[index])
+        if isinstance(objs[0], Transaction):
+            rollups.record_many(self, inserted)
+            self.__add_to_owners(inserted)
+        return [errors.get(index) for index in range(len(objs))]
 
     def update(self, obj):
         """
         Updates an existing object in the corresponding MongoDB collection.
 
+        Only the attributes changed since the object was loaded are sent,
+        with $set and $unset. Nothing is sent when no attribute changed.
+
         Args:
             obj (BaseModel): The object with updated data to be saved in the
             database.
+
+        Raises:
+            DuplicateValueError: If a value held by a unique index, like
+                                 the username, is already stored.
+        """
+        try:
+            self.__update(obj)
+        except DuplicateKeyError as error:
+            raise self.duplicate(obj, self.to_document(obj), error) \
+                from error
+
+    def __update(self, obj):
+        """
+        Sends the changes of an object to the database, see update().
+
+        Args:
+            obj (BaseModel): The object with updated data.
+        """
+        collection = self.get_collection(obj.__class__.__name__.lower() +
+                                         "s")
+        data = self.to_document(obj)
+        data.pop("_id", None)
+        changes = obj.changes()
+        removed = set()
+        if changes is not None:
+            changed, removed = changes
+            if not changed and not removed:
+                return
+            data = {key: data[key] for key in changed if key in data}
+        update = {}
+        if isinstance(obj, User):
+            data.pop("version", None)
+            removed = set(removed) - {"version"}
+            update["$inc"] = {"version": 1}
+        if data:
+            update["$set"] = data
+        if removed:
+            update["$unset"] = {key: "" for key in removed}
+        before = None
+        if isinstance(obj, Transaction) and \
+                not rollup_projection.keys().isdisjoint(
+                    set(data) | removed):
+            before = collection.find_one_and_update(
+                {"_id": obj._id}, update,
+                projection=rollup_projection,
+                return_document=ReturnDocument.BEFORE)
+            if before:
+                after = {key: value for key, value in before.items()
+                         if key not in removed}
+                rollups.record(self, before, {**after, **data})
+        else:
+            collection.update_one({"_id": obj._id}, update)
+        if isinstance(obj, Transaction):
+            self.bump_version(obj.__dict__.get("user_id") or
+                              (before or {}).get("user_id"))
+        obj.mark_clean()
+
+    def taken(self, cls, exclude=None, **values):
+        """
+        Finds which of the given values are already stored, with a single
+        $or query.
+
+        Args:
+            cls (BaseModel): The class of the objects to look in.
+            exclude (str, optional): The id of an object to ignore, like
+                                     the one being updated.
+            **values: The values to look for, by field.
+
+        Returns:
+            str: The first field, in argument order, whose value is
+                 already stored, or None if none is.
+        """
+        if not values:
+            return None
+        query = {"$or": [{key: value} for key, value in values.items()]}
+        if exclude is not None:
+            query["_id"] = {"$ne": exclude}
+        collection = self.get_collection(cls.__name__.lower() + "s")
+        data = collection.find_one(query, projection(list(values)))
+        if data is None:
+            return None
+        for key, value in values.items():
+            if data.get(key) == value:
+                return key
+        return None
+
+    def duplicate(self, obj, data, error):
+        """
+        Converts a DuplicateKeyError of the driver to a DuplicateValueError
+        naming the duplicated field.
+
+        When the server does not say which index was violated, the unique
+        fields are looked up again, which only happens on this error path.
+
+        Args:
+            obj (BaseModel): The object that was written.
+            data (dict): The document that was written.
+            error (DuplicateKeyError): The error raised by the driver.
+
+        Returns:
+            DuplicateValueError: The error to raise.
+        """
+        name = obj.__class__.__name__.lower() + "s"
+        fields = indexes.unique_fields(name)
+        field = duplicate_field(error, fields)
+        if field is None:
+            field = self.taken(obj.__class__, obj._id,
+                               **{key: data[key] for key in
+                                  fields.values() if key in data})
+        return DuplicateValueError(field)
+
+    def invalidate(self, obj):
+        """
+        Drops the cached copies of an object after it changed.
+
+        Args:
+            obj (BaseModel): The object that changed.
+        """
+        if isinstance(obj, User):
+            self.user_cache.invalidate(obj._id)
+
+    def version(self, user_id):
+        """
+        Reads the version counter of a user, raised by every change to the
+        user or to their transactions. The read always goes to the
+        database, and the cached copies of the user are dropped when the
+        counter moved since they were loaded, so changes made by other
+        processes are seen.
+
+        Args:
+            user_id (str): The ID of the user.
+
+        Returns:
+            int: The version of the user, 0 if the user is not found.
+        """
+        if not user_id:
+            return 0
+        data = self.get_collection("users").find_one({"_id": user_id},
+                                                     {"version": 1})
+        version = (data or {}).get("version", 0)
+        key = ("version", user_id)
+        if self.user_cache.get(key) != version:
+            self.user_cache.invalidate(user_id)
+            self.user_cache.set(key, version, tag=user_id)
+        return version
+
+    def bump_version(self, *user_ids):
+        """
+        Raises the version counter of users with a single update.
+
+        Args:
+            *user_ids: The IDs of the users, None values are ignored.
+        """
+        user_ids = [user_id for user_id in dict.fromkeys(user_ids)
+                    if user_id is not None]
+        if not user_ids:
+            return
+        collection = self.get_collection("users")
+        if len(user_ids) == 1:
+            collection.update_one({"_id": user_ids[0]},
+                                  {"$inc": {"version": 1}})
+        else:
+            collection.update_many({"_id": {"$in": user_ids}},
+                                   {"$inc": {"version": 1}})
+        for user_id in user_ids:
+            self.user_cache.invalidate(user_id)
+
+    def __add_to_owners(self, documents):
+        """
+        Raises the version of the owners of inserted transactions. When
+        the ids are embedded, they are pushed onto each owner by the same
+        update, so an owner costs a single write.
+
+        Args:
+            documents (list): The inserted transactions.
         """
+        owners = owned_ids(documents)
+        if not self.embed_transaction_ids:
+            self.bump_version(*owners)
+            return
+        if not owners:
+            return
+        self.get_collection("users").bulk_write([
+            UpdateOne({"_id": user_id},
+                      {"$push": {"transactions": {"$each": ids}},
+                       "$inc": {"version": 1}})
+            for user_id, ids in owners.items()], ordered=False)
+        for user_id in owners:
+            self.user_cache.invalidate(user_id)
+
+    def update_array(self, obj, operator, field, values):
+        """
+        Runs an array update operator on one field of a stored object and
+        applies the same change to the object in memory.
+
+        Args:
+            obj (BaseModel): The object to update.
+            operator (str): One of $push, $pull and $addToSet.
+            field (str): The name of the array field.
+            values (tuple): The values of the operation.
+        """
+        if not values:
+            return
         collection = self.get_collection(obj.__class__.__name__.lower() +
                                          "s")
-        data = obj.to_dict()
-        if obj.__class__.__name__ == "User":
-            data["password"] = obj.password
-        if data.get("__class__"):
-            del data["__class__"]
-        collection.update_one({"_id": obj._id}, {"$set": data})
+        if operator == "$pull":
+            change = {"$in": list(values)}
+        else:
+            change = {"$each": list(values)}
+        update = {operator: {field: change}}
+        if isinstance(obj, User):
+            update["$inc"] = {"version": 1}
+        collection.update_one({"_id": obj._id}, update)
+        self.invalidate(obj)
+        setattr(obj, field,
+                apply_array(getattr(obj, field, None), operator, values))
+        obj.mark_clean(field)
 
     def delete(self, obj=None):
         """
@@ -124,41 +591,136 @@ class DBStorage:
         if obj is not None:
             collection = self.get_collection(obj.__class__.__name__.lower()
                                              + "s")
+            if isinstance(obj, Transaction):
+                before = collection.find_one_and_delete(
+                    {"_id": obj._id}, projection=rollup_projection)
+                if before:
+                    rollups.record(self, before=before)
+                if before and before.get("user_id") and \
+                        self.embed_transaction_ids:
+                    self.get_collection("users").update_one(
+                        {"_id": before["user_id"]},
+                        {"$pull": {"transactions": obj._id},
+                         "$inc": {"version": 1}})
+                    self.user_cache.invalidate(before["user_id"])
+                elif before:
+                    self.bump_version(before.get("user_id"))
+                return
             collection.delete_one({"_id": obj._id})
 
     def reload(self):
         """
-        Re-establishes the connection to the MongoDB database.
+        Re-establishes the connection to the MongoDB database. In request
+        mode, the client is held until the matching close().
         """
+        if not self.pooled:
+            with DBStorage.__lock:
+                DBStorage.__holders += 1
         self.connect()
 
     def close(self):
         """
-        Closes the connection to the MongoDB database.
+        Closes the connection to the MongoDB database. In request mode,
+        the client stays open while other requests or imports hold it.
         """
-        self.__client.close()
-        self.__client = None
+        with DBStorage.__lock:
+            if not self.pooled and DBStorage.__holders > 1:
+                DBStorage.__holders -= 1
+                return
+            self.__close_client()
 
-    def get(self, cls, id):
+    def shutdown(self):
+        """
+        Closes the shared client and its pool when the process exits.
+        """
+        if DBStorage.__client and DBStorage.__pid == getpid():
+            with DBStorage.__lock:
+                self.__close_client()
+
+    @staticmethod
+    def __close_client():
+        """
+        Closes the shared client, with DBStorage.__lock held.
+        """
+        if DBStorage.__client:
+            DBStorage.__client.close()
+        DBStorage.__client = None
+        DBStorage.__db = None
+        DBStorage.__pid = None
+        DBStorage.__holders = 0
+
+    @staticmethod
+    def after_fork():
+        """
+        Drops the client inherited from the parent process without
+        closing it, the parent still owns its sockets.
+        """
+        DBStorage.__lock = threading.Lock()
+        DBStorage.__client = None
+        DBStorage.__db = None
+        DBStorage.__pid = None
+        DBStorage.__holders = 0
+
+    def get(self, cls, id, fields=None):
         """
         Retrieves an object by class and ID from the MongoDB database.
 
         Args:
             cls (BaseModel): The class of the object to retrieve.
             id (str): The ID of the object to retrieve.
+            fields (list, optional): The only fields to load, the object
+                                     is then partial. _id is always
+                                     loaded. Defaults to every field.
 
         Returns:
             BaseModel: The retrieved object, or None if not found.
         """
         if cls not in classes.values():
             return None
+        if cls is User:
+            key = (id, None if fields is None else tuple(sorted(fields)))
+            data = self.user_cache.get(key)
+            if data is not None:
+                return cls.from_document(copy_document(data))
+            generation = self.user_cache.generation()
         collection = self.get_collection(cls.__name__.lower() + "s")
-        data = collection.find_one({"_id": id})
+        data = collection.find_one({"_id": id}, projection(fields))
         if data:
-            return cls(**data)
+            if cls is User:
+                self.user_cache.set(key, data, tag=id,
+                                    generation=generation)
+                data = copy_document(data)
+            return cls.from_document(data)
         return None
 
-    def filter(self, cls, column_name, value):
+    def get_owned(self, cls, id, owner, fields=None):
+        """
+        Retrieves an object by ID only if it belongs to the given user.
+        The owner is part of the query, so the check costs one lookup on
+        the _id index whatever the number of objects of the user.
+
+        Args:
+            cls (BaseModel): The class of the object to retrieve.
+            id (str): The ID of the object to retrieve.
+            owner (str): The ID of the user who must own the object.
+            fields (list, optional): The only fields to load, the object
+                                     is then partial. _id is always
+                                     loaded. Defaults to every field.
+
+        Returns:
+            BaseModel: The retrieved object, or None if it is not found
+            or belongs to another user.
+        """
+        if cls not in classes.values() or not id or not owner:
+            return None
+        collection = self.get_collection(cls.__name__.lower() + "s")
+        data = collection.find_one({"_id": id, "user_id": owner},
+                                   projection(fields))
+        if data:
+            return cls.from_document(data)
+        return None
+
+    def filter(self, cls, column_name, value, fields=None):
         """
         Retrieves an object by class and a specified column value from the
         MongoDB database.
@@ -167,20 +729,24 @@ class DBStorage:
             cls (BaseModel): The class of the object to retrieve.
             column_name (str): The column name to filter by.
             value (str): The value to filter by.
+            fields (list, optional): The only fields to load, the object
+                                     is then partial. _id is always
+                                     loaded. Defaults to every field.
 
         Returns:
             BaseModel: The retrieved object, or None if not found.
         """
         collection = self.get_collection(cls.__name__.lower() + "s")
-        data = collection.find_one({column_name: value})
+        data = collection.find_one({column_name: value}, projection(fields))
         if data:
-            return cls(**data)
+            return cls.from_document(data)
         return None
 
     def search(self, obj, year, month, page, page_size):
         """
         Searches for transactions based on year and month, with
-        pagination.
+        pagination. The summary and the number of transactions are read
+        from the monthly_rollups collection.
 
         Args:
             obj (User): The user object to retrieve transactions for.
@@ -194,57 +760,29 @@ class DBStorage:
             and transactions.
         """
         transaction = self.get_collection(Transaction.__name__.lower() + "s")
-        transaction_ids = obj.transactions
         skip = (page - 1) * page_size
-        if not transaction_ids:
+        match = {"user_id": obj._id}
+        query = {"user_id": obj._id}
+        if year:
+            match["created_date"] = month_range(year, month)
+            query["year"] = int(year)
+            if month:
+                query["month"] = int(month)
+
+        summery = {}
+        total_documents = 0
+        for rollup in self.get_collection("monthly_rollups").find(
+                query, {"type": 1, "total_amount": 1, "count": 1}):
+            if rollup["count"] <= 0:
+                continue
+            summery[rollup["type"]] = summery.get(rollup["type"], 0) + \
+                rollup["total_amount"]
+            total_documents += rollup["count"]
+        if not total_documents:
             return {}
-        if year and month:
-            string = f"{year}-{str(month).zfill(2)}"
-        elif year:
-            string = f"{year}"
-
-        pipeline = [
-            {"$match": {"_id": {"$in": transaction_ids}}},
-            {"$match": {"created_date": {"$regex": string}}},
-            {
-                "$facet": {
-                    "summery": [
-                        {"$group": {
-                            "_id": "$type",
-                            "total_amount": {"$sum": "$amount"}
-                        }}
-                    ],
-                    "transactions": [
-                        {"$skip": skip},
-                        {"$limit": page_size},
-                        {"$project": {
-                            "_id": 1,
-                            "created_date": 1,
-                            "updated_date": 1,
-                            "amount": 1,
-                            "type": 1,
-                            "catagory": 1,
-                            "description": 1
-                        }}
-                    ],
-                    "total_count": [
-                        {"$count": "total_documents"}
-                    ]
-                }
-            },
-        ]
-
-        results = list(transaction.aggregate(pipeline))
-
-        total_documents = results[0]["total_count"][0]["total_documents"]
         total_pages = math.ceil(total_documents / page_size)
-        summery = {}
-        transactions = []
-        for values in results[0]["transactions"]:
-            txn = Transaction(**values)
-            transactions.append(txn.to_dict())
-        for value in results[0]["summery"]:
-            summery[value["_id"]] = value["total_amount"]
+        transactions = list(transaction.aggregate(
+            lean_pipeline(match, skip, page_size)))
         return {
             "page": page,
             "page_size": page_size,
@@ -254,60 +792,40 @@ class DBStorage:
             "transactions": transactions
         }
 
-    def filter_all(self, obj, page, page_size):
+    def filter_all(self, obj, page, page_size, cursor=None):
         """
-        Retrieves all transactions for a user with pagination.
+        Retrieves all transactions for a user with pagination. The page
+        is read with $match, $sort, $skip and $limit stages that use the
+        (user_id, created_date, _id) index, and the total with
+        count_documents.
+
+        When a cursor is given, even an empty one, the page is read with
+        keyset pagination instead of page numbers: transactions are
+        ordered by (created_date, _id) descending and the page starts
+        after the cursor.
 
         Args:
             obj (User): The user object to retrieve transactions for.
             page (int): The page number for pagination.
             page_size (int): The number of transactions per page.
+            cursor (str, optional): The next_cursor of the previous page.
 
         Returns:
             dict: A dictionary containing pagination details and transactions.
+
+        Raises:
+            ValueError: If the cursor is not valid.
         """
         transaction = self.get_collection(Transaction.__name__.lower() + "s")
-        transaction_ids = obj.transactions
-        if not transaction_ids:
+        if cursor is not None:
+            return self.filter_after(transaction, obj, cursor, page_size)
+        match = {"user_id": obj._id}
+        total_documents = transaction.count_documents(match)
+        if not total_documents:
             return {}
-        skip = (page - 1) * page_size
-        pipeline = [
-            {"$match": {"_id": {"$in": transaction_ids}}},
-            {
-                "$facet": {
-                    "summery": [
-                        {"$group": {
-                            "_id": "$type",
-                            "total_amount": {"$sum": "$amount"}
-                        }}
-                    ],
-                    "transactions": [
-                        {"$skip": skip},
-                        {"$limit": page_size},
-                        {"$project": {
-                            "_id": 1,
-                            "created_date": 1,
-                            "updated_date": 1,
-                            "amount": 1,
-                            "type": 1,
-                            "catagory": 1,
-                            "description": 1
-                        }}
-                    ],
-                    "total_count": [
-                        {"$count": "total_documents"}
-                    ]
-                }
-            },
-        ]
-
-        results = list(transaction.aggregate(pipeline))
-        total_documents = results[0]["total_count"][0]["total_documents"]
         total_pages = math.ceil(total_documents / page_size)
-        transactions = []
-        for values in results[0]["transactions"]:
-            txn = Transaction(**values)
-            transactions.append(txn.to_dict())
+        transactions = list(transaction.aggregate(
+            lean_pipeline(match, (page - 1) * page_size, page_size)))
         return {
             "page": page,
             "page_size": page_size,
@@ -315,3 +833,87 @@ class DBStorage:
             "total_documents": total_documents,
             "transactions": transactions
         }
+
+    def filter_after(self, collection, obj, cursor, page_size):
+        """
+        Reads one page of a user's transactions with keyset pagination.
+
+        Args:
+            collection (Collection): The transactions collection.
+            obj (User): The user object to retrieve transactions for.
+            cursor (str): The next_cursor of the previous page, empty for
+                          the first page.
+            page_size (int): The number of transactions per page.
+
+        Returns:
+            dict: A dictionary containing the page size, the cursor of
+            the next page and transactions.
+        """
+        match = {"user_id": obj._id}
+        if cursor:
+            match.update(after_cursor(cursor))
+        transactions = list(collection.aggregate(
+            lean_pipeline(match, limit=page_size + 1)))
+        next_cursor = None
+        if len(transactions) > page_size:
+            transactions = transactions[:page_size]
+            next_cursor = encode_cursor(transactions[-1]["created_date"],
+                                        transactions[-1]["_id"])
+        return {
+            "page_size": page_size,
+            "next_cursor": next_cursor,
+            "transactions": transactions
+        }
+
+    def transaction_documents(self, obj, batch_size=500):
+        """
+        Opens a server-side cursor over all transactions of a user,
+        newest first.
+
+        Args:
+            obj (User): The user object to retrieve transactions for.
+            batch_size (int): The number of documents fetched per round trip.
+
+        Returns:
+            Cursor: The cursor, to use as a context manager.
+        """
+        collection = self.get_collection(Transaction.__name__.lower() + "s")
+        documents = collection.find({"user_id": obj._id},
+                                    transaction_projection)
+        documents = documents.sort(list(transaction_order.items()))
+        return documents.batch_size(batch_size)
+
+    def iter_transactions(self, obj, batch_size=500):
+        """
+        Reads all transactions of a user lazily, newest first, from a
+        server-side cursor so only one batch is held in memory.
+
+        Args:
+            obj (User): The user object to retrieve transactions for.
+            batch_size (int): The number of documents fetched per round trip.
+
+        Yields:
+            dict: The dictionary representation of each transaction.
+        """
+        collection = self.get_collection(Transaction.__name__.lower() + "s")
+        pipeline = lean_pipeline({"user_id": obj._id})
+        with collection.aggregate(pipeline, batchSize=batch_size) as cursor:
+            yield from cursor
+
+    def load_transactions(self, obj, batch_size=500):
+        """
+        Loads all transactions of a user into a compact TransactionBatch,
+        for jobs that need the whole history in memory.
+
+        Args:
+            obj (User): The user object to retrieve transactions for.
+            batch_size (int): The number of documents fetched per round trip.
+
+        Returns:
+            TransactionBatch: The transactions, newest first.
+        """
+        with self.transaction_documents(obj, batch_size) as cursor:
+            return TransactionBatch.from_documents(cursor)
+
+
+register_at_fork(after_in_child=DBStorage.after_fork)
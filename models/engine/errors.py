@@ -0,0 +1,65 @@
+#!/usr/bin/python3
+
+"""
+errors.py
+
+This module defines the errors raised by the storage engines, so callers
+do not depend on the exceptions of the database driver.
+
+Classes:
+    DuplicateValueError: Raised when a value must be unique and is already
+                         stored.
+"""
+
+import re
+
+index_name = re.compile(r"index: (\S+)")
+
+
+class DuplicateValueError(ValueError):
+    """
+    DuplicateValueError Class
+
+    Raised when an insert or an update would store a value that a unique
+    index already holds.
+
+    Attributes:
+        field (str): The field whose value is taken, or None if unknown.
+    """
+
+    def __init__(self, field=None):
+        """
+        Initializes the error with the name of the duplicated field.
+
+        Args:
+            field (str, optional): The field whose value is taken.
+        """
+        self.field = field
+        if field:
+            super().__init__(f"{field} already present, change your {field}")
+        else:
+            super().__init__("value already present")
+
+
+def duplicate_field(error, unique_fields):
+    """
+    Finds the field reported by a pymongo DuplicateKeyError.
+
+    The server gives the duplicated key in the error details, older
+    servers only name the index in the message.
+
+    Args:
+        error (DuplicateKeyError): The error raised by the driver.
+        unique_fields (dict): The field of each unique index, by name.
+
+    Returns:
+        str: The duplicated field, or None if the error does not say.
+    """
+    details = error.details or {}
+    for key in ("keyValue", "keyPattern"):
+        if details.get(key):
+            return next(iter(details[key]))
+    match = index_name.search(str(details.get("errmsg") or error))
+    if match:
+        return unique_fields.get(match.group(1))
+    return None
@@ -0,0 +1,208 @@
+#!/usr/bin/python3
+
+"""
+indexes.py
+
+This module declares the MongoDB indexes used by DBStorage and provides
+helpers to create, verify and drop them.
+
+Usage:
+    python -m models.engine.indexes sync [--prune]
+    python -m models.engine.indexes verify
+    python -m models.engine.indexes drop
+
+Attributes:
+    INDEXES (dict): Dictionary mapping collection names to the indexes
+                    declared for them.
+"""
+
+import argparse
+from pymongo import ASCENDING, DESCENDING, IndexModel
+import sys
+
+INDEXES = {
+    "users": [
+        {"name": "username_unique", "keys": [("username", ASCENDING)],
+         "unique": True},
+        {"name": "email_unique", "keys": [("email", ASCENDING)],
+         "unique": True}
+    ],
+    "transactions": [
+        {"name": "user_created_date_id",
+         "keys": [("user_id", ASCENDING), ("created_date", DESCENDING),
+                  ("_id", DESCENDING)]}
+    ],
+    "monthly_rollups": [
+        {"name": "user_month_bucket_unique",
+         "keys": [("user_id", ASCENDING), ("year", ASCENDING),
+                  ("month", ASCENDING), ("type", ASCENDING),
+                  ("category", ASCENDING)],
+         "unique": True}
+    ]
+}
+
+
+def index_model(index):
+    """
+    Converts an index declaration to a pymongo IndexModel.
+
+    Args:
+        index (dict): The index declaration.
+
+    Returns:
+        IndexModel: The index model to pass to create_indexes.
+    """
+    return IndexModel(index["keys"], name=index["name"],
+                      unique=index.get("unique", False))
+
+
+def is_same(index, info):
+    """
+    Checks whether an existing index matches its declaration.
+
+    Args:
+        index (dict): The index declaration.
+        info (dict): The index description returned by index_information.
+
+    Returns:
+        bool: True if the keys and the unique flag are the same.
+    """
+    keys = [(key, int(direction)) for key, direction in info["key"]]
+    return keys == index["keys"] and \
+        bool(info.get("unique")) == index.get("unique", False)
+
+
+def unique_fields(collection):
+    """
+    Lists the fields of the declared single field unique indexes of a
+    collection.
+
+    Args:
+        collection (str): The name of the collection.
+
+    Returns:
+        dict: The field of each unique index, by index name.
+    """
+    return {index["name"]: index["keys"][0][0]
+            for index in INDEXES.get(collection, [])
+            if index.get("unique") and len(index["keys"]) == 1}
+
+
+def verify_indexes(storage):
+    """
+    Compares the declared indexes with the ones present in the database.
+
+    Args:
+        storage (DBStorage): The storage to inspect.
+
+    Returns:
+        dict: For each collection the names of the missing, changed and
+              undeclared indexes.
+    """
+    report = {}
+    for name, indexes in INDEXES.items():
+        existing = storage.get_collection(name).index_information()
+        existing.pop("_id_", None)
+        declared = {index["name"]: index for index in indexes}
+        report[name] = {
+            "missing": [key for key in declared if key not in existing],
+            "changed": [key for key in declared if key in existing and
+                        not is_same(declared[key], existing[key])],
+            "undeclared": [key for key in existing if key not in declared]
+        }
+    return report
+
+
+def ensure_indexes(storage):
+    """
+    Creates the declared indexes that are missing. Creating an index that
+    already exists is a no-op, so this is safe to run at every startup.
+
+    Args:
+        storage (DBStorage): The storage to create the indexes in.
+    """
+    for name, indexes in INDEXES.items():
+        storage.get_collection(name).create_indexes(
+            [index_model(index) for index in indexes])
+
+
+def sync_indexes(storage, prune=False):
+    """
+    Makes the database indexes match the declarations: changed indexes
+    are dropped and missing ones are created. Undeclared indexes, like
+    ones added by hand, are only dropped when prune is True.
+
+    Args:
+        storage (DBStorage): The storage to synchronize.
+        prune (bool, optional): Also drop the undeclared indexes.
+
+    Returns:
+        dict: The verification report taken before the changes.
+    """
+    report = verify_indexes(storage)
+    for name, drift in report.items():
+        collection = storage.get_collection(name)
+        dropped = drift["changed"] + (drift["undeclared"] if prune else [])
+        for index in dropped:
+            collection.drop_index(index)
+    ensure_indexes(storage)
+    return report
+
+
+def drop_indexes(storage):
+    """
+    Drops the declared indexes that are present in the database.
+
+    Args:
+        storage (DBStorage): The storage to drop the indexes from.
+    """
+    for name, indexes in INDEXES.items():
+        collection = storage.get_collection(name)
+        existing = collection.index_information()
+        for index in indexes:
+            if index["name"] in existing:
+                collection.drop_index(index["name"])
+
+
+def main(argv=None):
+    """
+    Command line entry point.
+
+    Args:
+        argv (list): The command line arguments.
+
+    Returns:
+        int: The exit status, 1 when verify finds a difference.
+    """
+    from models import storage
+
+    parser = argparse.ArgumentParser(prog="python -m models.engine.indexes",
+                                     description="Manage MongoDB indexes")
+    parser.add_argument("command", choices=["sync", "verify", "drop"])
+    parser.add_argument("--prune", action="store_true",
+                        help="with sync, also drop undeclared indexes")
+    args = parser.parse_args(argv)
+    if args.command == "drop":
+        drop_indexes(storage)
+        print("Dropped declared indexes")
+        return 0
+    if args.command == "sync":
+        report = sync_indexes(storage, args.prune)
+    else:
+        report = verify_indexes(storage)
+    status = 0
+    for name, drift in report.items():
+        for kind, indexes in drift.items():
+            for index in indexes:
+                print(f"{name}: {kind} index {index}")
+                status = 1
+    if args.command == "sync":
+        print("Indexes are in sync")
+        return 0
+    if not status:
+        print("Indexes are in sync")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
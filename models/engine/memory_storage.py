@@ -0,0 +1,741 @@
+#!/usr/bin/python3
+
+"""
+memory_storage.py
+
+This module defines the MemoryStorage class, a storage engine keeping the
+WealthWise data in the memory of the process. It is selected with
+WEALTHWISE_STORAGE=memory and lets the tests, local runs and benchmarks
+work without a MongoDB server. Nothing is persisted.
+
+Classes:
+    MemoryStorage: Handles storage operations in memory.
+"""
+
+from bisect import bisect_left, insort
+from datetime import datetime, timezone
+import math
+from models.base_model import date_fields, format_time, parse_time
+from models.engine.base_storage import BaseStorage, apply_array, owned_ids
+from models.engine.db_storage import classes, copy_document, month_range
+from models.engine.db_storage import transaction_projection
+from models.engine.errors import DuplicateValueError
+from models.engine.indexes import unique_fields
+from models.engine.pagination import decode_cursor, encode_cursor
+from models.engine.rollups import amount_of, rollup_key
+from models.transaction import Transaction
+from models.transaction_batch import TransactionBatch
+from os import getenv
+import threading
+
+transactions = Transaction.__name__.lower() + "s"
+
+
+def collection_name(cls):
+    """
+    Builds the name of the collection holding the objects of a class,
+    the same as in MongoDB.
+
+    Args:
+        cls (BaseModel): The class of the objects.
+
+    Returns:
+        str: The name of the collection.
+    """
+    return cls.__name__.lower() + "s"
+
+
+def naive_utc(value):
+    """
+    Converts an aware date to a naive UTC date, the way pymongo returns
+    stored dates.
+
+    Args:
+        value: The value to convert, other values are returned unchanged.
+
+    Returns:
+        The converted value.
+    """
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def date_key(document):
+    """
+    Builds the key ordering a transaction in the date index of its owner.
+    Transactions without a valid date sort before every date, so they come
+    last in newest first order, like in MongoDB.
+
+    Args:
+        document (dict): The stored transaction.
+
+    Returns:
+        tuple: The created date and the ID of the transaction.
+    """
+    created_date = document.get("created_date")
+    if isinstance(created_date, str):
+        try:
+            created_date = naive_utc(parse_time(created_date))
+        except ValueError:
+            created_date = None
+    if not isinstance(created_date, datetime):
+        created_date = datetime.min
+    return created_date, document["_id"]
+
+
+def select(document, fields=None):
+    """
+    Copies a stored document, optionally keeping only some fields.
+
+    Args:
+        document (dict): The stored document.
+        fields (iterable, optional): The names of the fields to keep, _id
+                                     is always kept. Defaults to every
+                                     field.
+
+    Returns:
+        dict: The copy.
+    """
+    if fields is None:
+        return copy_document(document)
+    fields = set(fields) | {"_id"}
+    return copy_document({key: value for key, value in document.items()
+                          if key in fields})
+
+
+def lean(document):
+    """
+    Writes a stored transaction the way Transaction.to_dict() does,
+    without building the model.
+
+    Args:
+        document (dict): The stored transaction.
+
+    Returns:
+        dict: The dictionary representation of the transaction.
+    """
+    output = {key: document[key] for key in transaction_projection
+              if key in document}
+    for key in date_fields:
+        if isinstance(output.get(key), datetime):
+            output[key] = format_time(output[key])
+    output["__class__"] = Transaction.__name__
+    return output
+
+
+class MemoryStorage(BaseStorage):
+    """
+    MemoryStorage Class
+
+    Keeps the documents of each collection in a dictionary by _id, with a
+    hash index per unique field declared in models.engine.indexes, like
+    the username and the email, and for each user a sorted list of the
+    (created_date, _id) keys of their transactions. Lookups by id or
+    unique field are O(1), and pages and month ranges of a user's
+    transactions are found by bisection.
+
+    Documents are copied in and out, so objects never share state with
+    the store, and every operation holds a lock so request threads and
+    import workers can share one instance.
+
+    Attributes:
+        __documents (dict): The documents of each collection, by _id.
+        __unique (dict): For each collection and unique field, the _id of
+                         the document holding each value.
+        __dates (dict): For each user, the sorted date index of their
+                        transactions.
+        __versions (dict): The version counter of each user.
+        __lock (RLock): Guards the documents and the indexes.
+        embed_transaction_ids (bool): True when the ids of a user's
+                                      transactions are also kept in the
+                                      user document.
+    """
+
+    def __init__(self):
+        """
+        Initializes an empty store.
+        """
+        self.embed_transaction_ids = \
+            getenv('EMBED_TRANSACTION_IDS', '1') != '0'
+        self.__documents = {}
+        self.__unique = {}
+        self.__dates = {}
+        self.__versions = {}
+        self.__lock = threading.RLock()
+
+    def new(self, obj):
+        """
+        Stores a new object. A new transaction is added to the ids kept
+        in its owner.
+
+        Args:
+            obj (BaseModel): The object to store.
+
+        Raises:
+            DuplicateValueError: If the _id or a value of a unique field,
+                                 like the username, is already stored.
+        """
+        data = self.to_document(obj)
+        if obj.__class__.__name__ == "User" and self.embed_transaction_ids:
+            data["transactions"] = []
+        with self.__lock:
+            self.__insert(collection_name(obj.__class__), data)
+            if isinstance(obj, Transaction):
+                self.__add_to_owners([data])
+        obj.mark_clean()
+
+    def new_many(self, objs):
+        """
+        Stores objects of the same class. An object that cannot be stored
+        does not stop the others. Stored transactions are added to the ids
+        kept in their owners.
+
+        Args:
+            objs (list): The objects to store.
+
+        Returns:
+            list: For each object, None if it was stored or the error
+            message.
+        """
+        errors = []
+        inserted = []
+        with self.__lock:
+            for obj in objs:
+                data = self.to_document(obj)
+                try:
+                    self.__insert(collection_name(obj.__class__), data)
+                except DuplicateValueError as error:
+                    errors.append(str(error))
+                else:
+                    obj.mark_clean()
+                    errors.append(None)
+                    if isinstance(obj, Transaction):
+                        inserted.append(data)
+            self.__add_to_owners(inserted)
+        return errors
+
+    def update(self, obj):
+        """
+        Writes the attributes of an object changed since it was loaded.
+        Nothing is written when no attribute changed.
+
+        Args:
+            obj (BaseModel): The object to write.
+
+        Raises:
+            DuplicateValueError: If a value of a unique field, like the
+                                 username, is already stored.
+        """
+        data = self.to_document(obj)
+        data.pop("_id", None)
+        changes = obj.changes()
+        removed = set()
+        if changes is not None:
+            changed, removed = changes
+            if not changed and not removed:
+                return
+            data = {key: data[key] for key in changed if key in data}
+        name = collection_name(obj.__class__)
+        with self.__lock:
+            before = self.__collection(name).get(obj._id)
+            if before is not None:
+                after = {key: value for key, value in before.items()
+                         if key not in removed}
+                after.update(data)
+                self.__replace(name, before, after)
+        obj.mark_clean()
+
+    def update_array(self, obj, operator, field, values):
+        """
+        Runs an array update operator on one field of a stored object and
+        applies the same change to the object in memory.
+
+        Args:
+            obj (BaseModel): The object to update.
+            operator (str): One of $push, $pull and $addToSet.
+            field (str): The name of the array field.
+            values (tuple): The values of the operation.
+        """
+        if not values:
+            return
+        with self.__lock:
+            document = self.__collection(
+                collection_name(obj.__class__)).get(obj._id)
+            if document is not None:
+                document[field] = apply_array(document.get(field), operator,
+                                              values)
+                self.__touch(collection_name(obj.__class__), document)
+        setattr(obj, field,
+                apply_array(getattr(obj, field, None), operator, values))
+        obj.mark_clean(field)
+
+    def delete(self, obj=None):
+        """
+        Deletes an object. A deleted transaction is also removed from the
+        ids kept in its owner.
+
+        Args:
+            obj (BaseModel, optional): The object to delete.
+        """
+        if obj is None:
+            return
+        name = collection_name(obj.__class__)
+        with self.__lock:
+            document = self.__collection(name).pop(obj._id, None)
+            if document is None:
+                return
+            self.__unindex(name, document)
+            owner = document.get("user_id")
+            if name == transactions and owner and self.embed_transaction_ids:
+                user = self.__collection("users").get(owner)
+                if user is not None and "transactions" in user:
+                    user["transactions"] = apply_array(
+                        user["transactions"], "$pull", (obj._id,))
+
+    def version(self, user_id):
+        """
+        Reads the version counter of a user, raised by every change to the
+        user or to their transactions.
+
+        Args:
+            user_id (str): The ID of the user.
+
+        Returns:
+            int: The version of the user, 0 if the user is not found.
+        """
+        with self.__lock:
+            return self.__versions.get(user_id, 0)
+
+    def get(self, cls, id, fields=None):
+        """
+        Retrieves an object by class and ID.
+
+        Args:
+            cls (BaseModel): The class of the object to retrieve.
+            id (str): The ID of the object to retrieve.
+            fields (list, optional): The only fields to load, the object
+                                     is then partial. _id is always
+                                     loaded. Defaults to every field.
+
+        Returns:
+            BaseModel: The retrieved object, or None if not found.
+        """
+        if cls not in classes.values():
+            return None
+        with self.__lock:
+            document = self.__collection(collection_name(cls)).get(id)
+            if document is None:
+                return None
+            document = select(document, fields)
+        return cls.from_document(document)
+
+    def get_owned(self, cls, id, owner, fields=None):
+        """
+        Retrieves an object by ID only if it belongs to the given user.
+
+        Args:
+            cls (BaseModel): The class of the object to retrieve.
+            id (str): The ID of the object to retrieve.
+            owner (str): The ID of the user who must own the object.
+            fields (list, optional): The only fields to load.
+
+        Returns:
+            BaseModel: The retrieved object, or None if it is not found
+            or belongs to another user.
+        """
+        if cls not in classes.values() or not id or not owner:
+            return None
+        with self.__lock:
+            document = self.__collection(collection_name(cls)).get(id)
+            if document is None or document.get("user_id") != owner:
+                return None
+            document = select(document, fields)
+        return cls.from_document(document)
+
+    def filter(self, cls, column_name, value, fields=None):
+        """
+        Retrieves an object by class and a specified column value. Unique
+        fields are read from their index, other fields are scanned.
+
+        Args:
+            cls (BaseModel): The class of the object to retrieve.
+            column_name (str): The column name to filter by.
+            value (str): The value to filter by.
+            fields (list, optional): The only fields to load.
+
+        Returns:
+            BaseModel: The retrieved object, or None if not found.
+        """
+        name = collection_name(cls)
+        with self.__lock:
+            document = self.__find(name, column_name, value)
+            if document is None:
+                return None
+            document = select(document, fields)
+        return cls.from_document(document)
+
+    def taken(self, cls, exclude=None, **values):
+        """
+        Finds which of the given values are already stored.
+
+        Args:
+            cls (BaseModel): The class of the objects to look in.
+            exclude (str, optional): The id of an object to ignore, like
+                                     the one being updated.
+            **values: The values to look for, by field.
+
+        Returns:
+            str: The first field, in argument order, whose value is
+                 already stored, or None if none is.
+        """
+        name = collection_name(cls)
+        with self.__lock:
+            for key, value in values.items():
+                document = self.__find(name, key, value, exclude)
+                if document is not None:
+                    return key
+        return None
+
+    def search(self, obj, year, month, page, page_size):
+        """
+        Searches for a user's transactions based on year and month, with
+        pagination. The summary counts the transactions the way the
+        monthly rollups of MongoDB do.
+
+        Args:
+            obj (User): The user object to retrieve transactions for.
+            year (int): The year to filter transactions by.
+            month (int): The month to filter transactions by.
+            page (int): The page number for pagination.
+            page_size (int): The number of transactions per page.
+
+        Returns:
+            dict: A dictionary containing pagination details, summary,
+            and transactions.
+        """
+        skip = (page - 1) * page_size
+        with self.__lock:
+            keys = self.__dates.get(obj._id, [])
+            if year:
+                dates = month_range(year, month)
+                keys = keys[bisect_left(keys, (dates["$gte"], "")):
+                            bisect_left(keys, (dates["$lt"], ""))]
+            documents = self.__collection(transactions)
+            summery = {}
+            total_documents = 0
+            for _, id in keys:
+                document = documents[id]
+                if rollup_key(document) is None:
+                    continue
+                summery[document.get("type")] = \
+                    summery.get(document.get("type"), 0) + \
+                    amount_of(document)
+                total_documents += 1
+            if not total_documents:
+                return {}
+            page_keys = keys[::-1][skip:skip + page_size]
+            page_documents = [lean(documents[id]) for _, id in page_keys]
+        return {
+            "page": page,
+            "page_size": page_size,
+            "total_pages": math.ceil(total_documents / page_size),
+            "total_documents": total_documents,
+            "summery": summery,
+            "transactions": page_documents
+        }
+
+    def filter_all(self, obj, page, page_size, cursor=None):
+        """
+        Retrieves all transactions for a user with pagination.
+
+        When a cursor is given, even an empty one, the page is read with
+        keyset pagination instead of page numbers: transactions are
+        ordered by (created_date, _id) descending and the page starts
+        after the cursor.
+
+        Args:
+            obj (User): The user object to retrieve transactions for.
+            page (int): The page number for pagination.
+            page_size (int): The number of transactions per page.
+            cursor (str, optional): The next_cursor of the previous page.
+
+        Returns:
+            dict: A dictionary containing pagination details and
+            transactions.
+
+        Raises:
+            ValueError: If the cursor is not valid.
+        """
+        if cursor is not None:
+            return self.filter_after(obj, cursor, page_size)
+        skip = (page - 1) * page_size
+        with self.__lock:
+            keys = self.__dates.get(obj._id, [])
+            if not keys:
+                return {}
+            total_documents = len(keys)
+            end = total_documents - skip
+            page_keys = keys[max(end - page_size, 0):max(end, 0)][::-1]
+            documents = self.__collection(transactions)
+            page_documents = [lean(documents[id]) for _, id in page_keys]
+        return {
+            "page": page,
+            "page_size": page_size,
+            "total_pages": math.ceil(total_documents / page_size),
+            "total_documents": total_documents,
+            "transactions": page_documents
+        }
+
+    def filter_after(self, obj, cursor, page_size):
+        """
+        Reads one page of a user's transactions with keyset pagination.
+
+        Args:
+            obj (User): The user object to retrieve transactions for.
+            cursor (str): The next_cursor of the previous page, empty for
+                          the first page.
+            page_size (int): The number of transactions per page.
+
+        Returns:
+            dict: A dictionary containing the page size, the cursor of
+            the next page and transactions.
+
+        Raises:
+            ValueError: If the cursor is not valid.
+        """
+        with self.__lock:
+            keys = self.__dates.get(obj._id, [])
+            end = len(keys)
+            if cursor:
+                created_date, id = decode_cursor(cursor)
+                end = bisect_left(keys, (naive_utc(created_date), id))
+            page_keys = keys[max(end - page_size - 1, 0):end][::-1]
+            documents = self.__collection(transactions)
+            page_documents = [lean(documents[id]) for _, id in page_keys]
+        next_cursor = None
+        if len(page_documents) > page_size:
+            page_documents = page_documents[:page_size]
+            next_cursor = encode_cursor(page_documents[-1]["created_date"],
+                                        page_documents[-1]["_id"])
+        return {
+            "page_size": page_size,
+            "next_cursor": next_cursor,
+            "transactions": page_documents
+        }
+
+    def iter_transactions(self, obj, batch_size=500):
+        """
+        Reads all transactions of a user lazily, newest first. The lock is
+        only held while a batch is copied, so writes are not blocked for
+        the whole read.
+
+        Args:
+            obj (User): The user object to retrieve transactions for.
+            batch_size (int): The number of transactions copied at once.
+
+        Yields:
+            dict: The dictionary representation of each transaction.
+        """
+        with self.__lock:
+            keys = self.__dates.get(obj._id, [])[::-1]
+        for start in range(0, len(keys), batch_size):
+            with self.__lock:
+                documents = self.__collection(transactions)
+                batch = [lean(documents[id]) for _, id in
+                         keys[start:start + batch_size] if id in documents]
+            yield from batch
+
+    def load_transactions(self, obj, batch_size=500):
+        """
+        Loads all transactions of a user into a compact TransactionBatch.
+
+        Args:
+            obj (User): The user object to retrieve transactions for.
+            batch_size (int): Unused, every transaction is already in
+                              memory.
+
+        Returns:
+            TransactionBatch: The transactions, newest first.
+        """
+        with self.__lock:
+            documents = self.__collection(transactions)
+            return TransactionBatch.from_documents(
+                select(documents[id], transaction_projection)
+                for _, id in reversed(self.__dates.get(obj._id, [])))
+
+    def __collection(self, name):
+        """
+        Returns the documents of a collection, by _id.
+
+        Args:
+            name (str): The name of the collection.
+
+        Returns:
+            dict: The documents.
+        """
+        return self.__documents.setdefault(name, {})
+
+    def __find(self, name, column_name, value, exclude=None):
+        """
+        Finds the first document of a collection with a value, from the
+        unique index of the field when there is one.
+
+        Args:
+            name (str): The name of the collection.
+            column_name (str): The field to look in.
+            value: The value to look for.
+            exclude (str, optional): The id of a document to ignore.
+
+        Returns:
+            dict: The stored document, or None if not found.
+        """
+        documents = self.__collection(name)
+        if column_name == "_id":
+            id = value
+        elif column_name in unique_fields(name).values():
+            id = self.__unique.get(name, {}).get(column_name, {}).get(value)
+        else:
+            for document in documents.values():
+                if document.get(column_name) == value and \
+                        document["_id"] != exclude:
+                    return document
+            return None
+        if id is None or id == exclude:
+            return None
+        return documents.get(id)
+
+    def __insert(self, name, data):
+        """
+        Stores a new document and indexes it.
+
+        Args:
+            name (str): The name of the collection.
+            data (dict): The document.
+
+        Raises:
+            DuplicateValueError: If the _id or a unique value is taken.
+        """
+        documents = self.__collection(name)
+        if data["_id"] in documents:
+            raise DuplicateValueError("_id")
+        document = {key: naive_utc(value) for key, value in
+                    copy_document(data).items()}
+        self.__check_unique(name, document)
+        documents[document["_id"]] = document
+        self.__index(name, document)
+
+    def __add_to_owners(self, documents):
+        """
+        Adds inserted transactions to the ids kept in their owners, with
+        self.__lock held.
+
+        Args:
+            documents (list): The inserted transactions.
+        """
+        if not self.embed_transaction_ids:
+            return
+        users = self.__collection("users")
+        for owner, ids in owned_ids(documents).items():
+            user = users.get(owner)
+            if user is not None and "transactions" in user:
+                user["transactions"] = apply_array(
+                    user["transactions"], "$push", ids)
+
+    def __replace(self, name, before, after):
+        """
+        Replaces a stored document and moves its index entries.
+
+        Args:
+            name (str): The name of the collection.
+            before (dict): The stored document.
+            after (dict): The new document, with the same _id.
+
+        Raises:
+            DuplicateValueError: If a unique value is taken by another
+                                 document.
+        """
+        after = {key: naive_utc(value) for key, value in
+                 copy_document(after).items()}
+        self.__check_unique(name, after)
+        self.__unindex(name, before)
+        self.__collection(name)[after["_id"]] = after
+        self.__index(name, after)
+
+    def __check_unique(self, name, document):
+        """
+        Checks that the unique values of a document are not held by
+        another document.
+
+        Args:
+            name (str): The name of the collection.
+            document (dict): The document to store.
+
+        Raises:
+            DuplicateValueError: If a unique value is taken.
+        """
+        unique = self.__unique.get(name, {})
+        for field in unique_fields(name).values():
+            if field not in document:
+                continue
+            id = unique.get(field, {}).get(document[field])
+            if id is not None and id != document["_id"]:
+                raise DuplicateValueError(field)
+
+    def __index(self, name, document):
+        """
+        Adds a stored document to the indexes of its collection.
+
+        Args:
+            name (str): The name of the collection.
+            document (dict): The stored document.
+        """
+        unique = self.__unique.setdefault(name, {})
+        for field in unique_fields(name).values():
+            if field in document:
+                unique.setdefault(field, {})[document[field]] = \
+                    document["_id"]
+        owner = document.get("user_id")
+        if name == transactions and owner:
+            insort(self.__dates.setdefault(owner, []), date_key(document))
+        self.__touch(name, document)
+
+    def __unindex(self, name, document):
+        """
+        Removes a stored document from the indexes of its collection.
+
+        Args:
+            name (str): The name of the collection.
+            document (dict): The stored document.
+        """
+        unique = self.__unique.get(name, {})
+        for field in unique_fields(name).values():
+            values = unique.get(field, {})
+            if field in document and \
+                    values.get(document[field]) == document["_id"]:
+                del values[document[field]]
+        owner = document.get("user_id")
+        if name == transactions and owner:
+            keys = self.__dates.get(owner, [])
+            key = date_key(document)
+            index = bisect_left(keys, key)
+            if index < len(keys) and keys[index] == key:
+                del keys[index]
+        self.__touch(name, document)
+
+    def __touch(self, name, document):
+        """
+        Raises the version of the user a changed document belongs to.
+
+        Args:
+            name (str): The name of the collection.
+            document (dict): The changed document.
+        """
+        if name == "users":
+            user_id = document["_id"]
+        elif name == transactions:
+            user_id = document.get("user_id")
+        else:
+            return
+        if user_id:
+            self.__versions[user_id] = self.__versions.get(user_id, 0) + 1
@@ -0,0 +1,167 @@
+#!/usr/bin/python3
+
+"""
+migrations.py
+
+This module contains the online data migrations of the WealthWise
+database. Every migration works in batches and only reads the documents
+it has not migrated yet, so it can be interrupted and run again, and a
+run after a deploy catches the documents written by older instances.
+The result of the last run is recorded in the migrations collection.
+
+Usage:
+    python -m models.engine.migrations backfill_owner
+    python -m models.engine.migrations convert_dates
+
+Attributes:
+    MIGRATIONS (dict): Dictionary mapping migration names to the
+                       functions running them.
+"""
+
+import argparse
+from datetime import datetime, timezone
+from models.base_model import parse_time
+from pymongo import UpdateOne
+import sys
+
+
+def save_progress(storage, name, **progress):
+    """
+    Records the result of the last run of a migration.
+
+    Args:
+        storage (DBStorage): The storage to migrate.
+        name (str): The name of the migration.
+        **progress: The values to save.
+    """
+    progress["updated_date"] = datetime.now(timezone.utc)
+    storage.get_collection("migrations").update_one(
+        {"_id": name}, {"$set": progress}, upsert=True)
+
+
+def backfill_owner(storage, batch_size=1000):
+    """
+    Sets the user_id owner field of the transactions created before it
+    was filled in, using the ids embedded in each user document.
+
+    Only the transactions that still have no owner are read, so the
+    migration can be stopped and run again at any time. A run after the
+    deploy also catches the transactions inserted meanwhile by instances
+    still running older code. Transactions no user lists are left as
+    they are.
+
+    Args:
+        storage (DBStorage): The storage to migrate.
+        batch_size (int): The number of transactions read per query.
+
+    Returns:
+        int: The number of transactions updated by this run.
+    """
+    users = storage.get_collection("users")
+    transactions = storage.get_collection("transactions")
+    updated = 0
+    last_id = None
+    while True:
+        query = {"user_id": {"$in": [None, ""]}}
+        if last_id is not None:
+            query["_id"] = {"$gt": last_id}
+        ids = [document["_id"] for document in transactions.find(
+            query, {"_id": 1}).sort("_id", 1).limit(batch_size)]
+        if not ids:
+            break
+        for user in users.find({"transactions": {"$in": ids}},
+                               {"transactions": 1}):
+            listed = set(user["transactions"])
+            result = transactions.update_many(
+                {"_id": {"$in": [id for id in ids if id in listed]},
+                 "user_id": {"$in": [None, ""]}},
+                {"$set": {"user_id": user["_id"]}})
+            updated += result.modified_count
+        last_id = ids[-1]
+    save_progress(storage, "backfill_owner", updated=updated)
+    return updated
+
+
+def convert_dates(storage, batch_size=1000):
+    """
+    Converts the created_date and updated_date strings written by older
+    versions to native BSON dates.
+
+    Only the documents that still hold a date string are read, so the
+    migration can be stopped and run again at any time. A run after the
+    deploy also catches the documents written meanwhile by instances
+    still running older code. Values that cannot be parsed are left as
+    they are.
+
+    Args:
+        storage (DBStorage): The storage to migrate.
+        batch_size (int): The number of documents converted per batch.
+
+    Returns:
+        int: The number of documents updated by this run.
+    """
+    updated = 0
+    for collection_name in ("users", "transactions"):
+        collection = storage.get_collection(collection_name)
+        last_id = None
+        while True:
+            query = {"$or": [{"created_date": {"$type": "string"}},
+                             {"updated_date": {"$type": "string"}}]}
+            if last_id is not None:
+                query["_id"] = {"$gt": last_id}
+            batch = list(collection.find(
+                query, {"created_date": 1, "updated_date": 1}
+            ).sort("_id", 1).limit(batch_size))
+            if not batch:
+                break
+            requests = []
+            for document in batch:
+                dates = {}
+                for key in ("created_date", "updated_date"):
+                    if isinstance(document.get(key), str):
+                        try:
+                            dates[key] = parse_time(document[key])
+                        except ValueError:
+                            continue
+                if dates:
+                    requests.append(UpdateOne({"_id": document["_id"]},
+                                              {"$set": dates}))
+            if requests:
+                updated += collection.bulk_write(
+                    requests, ordered=False).modified_count
+            last_id = batch[-1]["_id"]
+    save_progress(storage, "convert_dates", updated=updated)
+    return updated
+
+
+MIGRATIONS = {
+    "backfill_owner": backfill_owner,
+    "convert_dates": convert_dates
+}
+
+
+def main(argv=None):
+    """
+    Command line entry point.
+
+    Args:
+        argv (list): The command line arguments.
+
+    Returns:
+        int: The exit status.
+    """
+    from models import storage
+
+    parser = argparse.ArgumentParser(
+        prog="python -m models.engine.migrations",
+        description="Run online data migrations")
+    parser.add_argument("migration", choices=list(MIGRATIONS))
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args(argv)
+    updated = MIGRATIONS[args.migration](storage, args.batch_size)
+    print(f"{args.migration}: {updated} documents updated")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+#!/usr/bin/python3
+
+"""
+pagination.py
+
+This module encodes and decodes the opaque cursors used for keyset
+pagination of transactions. A cursor holds the created_date and _id of
+the last transaction of a page, the next page starts right after it in
+(created_date, _id) descending order.
+"""
+
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+import binascii
+import json
+
+
+def encode_cursor(created_date, id):
+    """
+    Builds the cursor pointing after a transaction.
+
+    Args:
+        created_date (datetime or str): The created date of the
+                                       transaction.
+        id (str): The ID of the transaction.
+
+    Returns:
+        str: The opaque cursor.
+    """
+    if isinstance(created_date, datetime):
+        created_date = created_date.replace(tzinfo=None).isoformat()
+    data = json.dumps([created_date, id], separators=(",", ":"))
+    return urlsafe_b64encode(data.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor):
+    """
+    Reads a cursor built by encode_cursor.
+
+    Args:
+        cursor (str): The opaque cursor.
+
+    Returns:
+        tuple: The created date and the ID stored in the cursor.
+
+    Raises:
+        ValueError: If the cursor is not valid.
+    """
+    try:
+        created_date, id = json.loads(urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(created_date), str(id)
+    except (binascii.Error, TypeError, UnicodeError, ValueError) as error:
+        raise ValueError("Invalid cursor") from error
+
+
+def after_cursor(cursor):
+    """
+    Builds the query matching the transactions after a cursor in
+    (created_date, _id) descending order.
+
+    Args:
+        cursor (str): The opaque cursor.
+
+    Returns:
+        dict: The query to add to the owner match.
+    """
+    created_date, id = decode_cursor(cursor)
+    return {"$or": [{"created_date": {"$lt": created_date}},
+                    {"created_date": created_date, "_id": {"$lt": id}}]}
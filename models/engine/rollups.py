@@ -0,0 +1,227 @@
+#!/usr/bin/python3
+
+"""
+rollups.py
+
+This module maintains the monthly_rollups collection, which holds the
+total amount and the number of transactions of every
+(user, year, month, type, category) bucket. DBStorage updates it with
+$inc whenever a transaction is added, changed or deleted, so monthly
+summaries read a few pre-aggregated documents instead of scanning the
+transactions.
+
+Usage:
+    python -m models.engine.rollups rebuild
+    python -m models.engine.rollups rebuild --user <user_id>
+"""
+
+import argparse
+from models.base_model import parse_time
+from pymongo import UpdateOne
+import sys
+
+key_fields = ("user_id", "year", "month", "type", "category")
+
+
+def rollup_key(document):
+    """
+    Builds the key of the bucket a transaction belongs to.
+
+    Args:
+        document (dict): The stored transaction.
+
+    Returns:
+        dict: The bucket key, or None if the transaction has no owner or
+              no date.
+    """
+    created_date = document.get("created_date")
+    if isinstance(created_date, str):
+        try:
+            created_date = parse_time(created_date)
+        except ValueError:
+            return None
+    if not document.get("user_id") or not created_date:
+        return None
+    return {
+        "user_id": document["user_id"],
+        "year": created_date.year,
+        "month": created_date.month,
+        "type": document.get("type"),
+        "category": document.get("category")
+    }
+
+
+def amount_of(document):
+    """
+    Reads the amount of a transaction the way $sum does: values that are
+    not numbers count as 0.
+
+    Args:
+        document (dict): The stored transaction.
+
+    Returns:
+        float: The amount to add to the bucket.
+    """
+    amount = document.get("amount")
+    if isinstance(amount, bool) or not isinstance(amount, (int, float)):
+        return 0
+    return amount
+
+
+def increments(before=None, after=None):
+    """
+    Builds the bucket increments moving a transaction from one state to
+    another. Either state may be None for an insert or a delete.
+
+    Args:
+        before (dict, optional): The transaction before the change.
+        after (dict, optional): The transaction after the change.
+
+    Returns:
+        list: The (key, increment) pairs of the buckets to change, where
+              increment holds the total_amount and count to add.
+    """
+    pairs = []
+    for document, sign in ((before, -1), (after, 1)):
+        key = rollup_key(document) if document else None
+        if key:
+            pairs.append((key, {
+                "total_amount": sign * amount_of(document),
+                "count": sign
+            }))
+    if len(pairs) == 2 and pairs[0][0] == pairs[1][0] and \
+            amount_of(before) == amount_of(after):
+        return []
+    return pairs
+
+
+def changes(before=None, after=None):
+    """
+    Builds the $inc updates moving a transaction from one state to
+    another. Either state may be None for an insert or a delete.
+
+    Args:
+        before (dict, optional): The transaction before the change.
+        after (dict, optional): The transaction after the change.
+
+    Returns:
+        list: The UpdateOne operations to run on monthly_rollups.
+    """
+    return [UpdateOne(key, {"$inc": increment}, upsert=True)
+            for key, increment in increments(before, after)]
+
+
+def record(storage, before=None, after=None):
+    """
+    Applies the change of a transaction to monthly_rollups.
+
+    Args:
+        storage (DBStorage): The storage holding the rollups.
+        before (dict, optional): The transaction before the change.
+        after (dict, optional): The transaction after the change.
+    """
+    operations = changes(before, after)
+    if operations:
+        storage.get_collection("monthly_rollups").bulk_write(operations)
+
+
+def record_many(storage, documents):
+    """
+    Adds inserted transactions to monthly_rollups, with one $inc per
+    bucket instead of one per transaction.
+
+    Args:
+        storage (DBStorage): The storage holding the rollups.
+        documents (list): The inserted transactions.
+    """
+    buckets = {}
+    for document in documents:
+        key = rollup_key(document)
+        if key:
+            bucket = buckets.setdefault(tuple(key.items()), [0, 0])
+            bucket[0] += amount_of(document)
+            bucket[1] += 1
+    operations = [UpdateOne(dict(key), {"$inc": {
+        "total_amount": total_amount,
+        "count": count
+    }}, upsert=True) for key, (total_amount, count) in buckets.items()]
+    if operations:
+        storage.get_collection("monthly_rollups").bulk_write(
+            operations, ordered=False)
+
+
+def rebuild(storage, user_id=None):
+    """
+    Recomputes monthly_rollups from the transactions, for one user or for
+    everyone. Buckets that no longer have transactions are removed.
+
+    Args:
+        storage (DBStorage): The storage holding the rollups.
+        user_id (str, optional): Only rebuild the rollups of this user.
+
+    Returns:
+        int: The number of buckets written.
+    """
+    match = {"user_id": {"$type": "string"},
+             "created_date": {"$type": "date"}}
+    if user_id:
+        match["user_id"] = user_id
+    pipeline = [
+        {"$match": match},
+        {"$group": {
+            "_id": {
+                "user_id": "$user_id",
+                "year": {"$year": "$created_date"},
+                "month": {"$month": "$created_date"},
+                "type": "$type",
+                "category": "$category"
+            },
+            "total_amount": {"$sum": "$amount"},
+            "count": {"$sum": 1}
+        }}
+    ]
+    transactions = storage.get_collection("transactions")
+    rollups = storage.get_collection("monthly_rollups")
+    operations = []
+    buckets = set()
+    for bucket in transactions.aggregate(pipeline):
+        key = {field: bucket["_id"].get(field) for field in key_fields}
+        buckets.add(tuple(key.values()))
+        operations.append(UpdateOne(key, {"$set": {
+            "total_amount": bucket["total_amount"],
+            "count": bucket["count"]
+        }}, upsert=True))
+    if operations:
+        rollups.bulk_write(operations, ordered=False)
+    query = {"user_id": user_id} if user_id else {}
+    for rollup in rollups.find(query, {field: 1 for field in key_fields}):
+        key = tuple(rollup.get(field) for field in key_fields)
+        if key not in buckets:
+            rollups.delete_one({"_id": rollup["_id"]})
+    return len(operations)
+
+
+def main(argv=None):
+    """
+    Command line entry point.
+
+    Args:
+        argv (list): The command line arguments.
+
+    Returns:
+        int: The exit status.
+    """
+    from models import storage
+
+    parser = argparse.ArgumentParser(prog="python -m models.engine.rollups",
+                                     description="Manage monthly rollups")
+    parser.add_argument("command", choices=["rebuild"])
+    parser.add_argument("--user", help="only rebuild this user's rollups")
+    args = parser.parse_args(argv)
+    count = rebuild(storage, args.user)
+    print(f"rebuild: {count} monthly rollups written")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,961 @@
+#!/usr/bin/python3
+
+"""
+sqlite_storage.py
+
+This module defines the SQLiteStorage class, a storage engine keeping the
+WealthWise data in a single SQLite file. It is selected with
+WEALTHWISE_STORAGE=sqlite and suits single node installs and offline
+benchmarks, with no database server to run.
+
+The fields that are queried have their own column, the other fields of a
+document are kept as JSON in the data column. Dates are stored as text in
+the format of BaseModel.to_dict, which sorts like the dates themselves.
+
+Classes:
+    SQLiteStorage: Handles storage operations in a SQLite database.
+
+Attributes:
+    schema (str): The tables and indexes, created when missing.
+    columns (dict): The columns of each table, other than data.
+"""
+
+from contextlib import contextmanager
+from datetime import datetime
+import json
+import math
+from models.base_model import date_fields, format_time, parse_time
+from models.engine.base_storage import BaseStorage, apply_array, owned_ids
+from models.engine.db_storage import classes, month_range
+from models.engine.db_storage import transaction_projection
+from models.engine.errors import DuplicateValueError
+from models.engine.memory_storage import collection_name, naive_utc
+from models.engine.pagination import decode_cursor, encode_cursor
+from models.transaction import Transaction
+from models.transaction_batch import TransactionBatch
+from os import getenv, getpid
+import re
+import sqlite3
+import threading
+
+schema = """
+CREATE TABLE IF NOT EXISTS users (
+    _id TEXT PRIMARY KEY,
+    username TEXT UNIQUE,
+    email TEXT UNIQUE,
+    created_date TEXT,
+    updated_date TEXT,
+    data TEXT NOT NULL DEFAULT '{}'
+);
+CREATE TABLE IF NOT EXISTS transactions (
+    _id TEXT PRIMARY KEY,
+    user_id TEXT,
+    created_date TEXT,
+    updated_date TEXT,
+    amount,
+    type,
+    category,
+    description,
+    data TEXT NOT NULL DEFAULT '{}'
+);
+CREATE INDEX IF NOT EXISTS transactions_user_created
+    ON transactions (user_id, created_date, _id, type, amount);
+CREATE TABLE IF NOT EXISTS importjobs (
+    _id TEXT PRIMARY KEY,
+    user_id TEXT,
+    created_date TEXT,
+    updated_date TEXT,
+    data TEXT NOT NULL DEFAULT '{}'
+);
+CREATE TABLE IF NOT EXISTS versions (
+    user_id TEXT PRIMARY KEY,
+    version INTEGER NOT NULL
+);
+"""
+
+columns = {
+    "users": ("_id", "username", "email", "created_date", "updated_date"),
+    "transactions": ("_id", "user_id", "created_date", "updated_date",
+                     "amount", "type", "category", "description"),
+    "importjobs": ("_id", "user_id", "created_date", "updated_date")
+}
+
+generic_columns = ("_id", "created_date", "updated_date")
+generic_table = """
+CREATE TABLE IF NOT EXISTS {} (
+    _id TEXT PRIMARY KEY,
+    created_date TEXT,
+    updated_date TEXT,
+    data TEXT NOT NULL DEFAULT '{{}}'
+)
+"""
+
+lean_columns = tuple(transaction_projection)
+transaction_order = "ORDER BY created_date DESC, _id DESC"
+numeric_amount = "CASE WHEN typeof(amount) IN ('integer', 'real') " \
+    "THEN amount ELSE 0 END"
+identifier = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+unique_failed = re.compile(r"UNIQUE constraint failed: \w+\.(\w+)")
+
+
+def table_columns(table):
+    """
+    Finds the columns of a table. The classes without a table in the
+    schema are stored in a table with only the generic columns.
+
+    Args:
+        table (str): The name of the table.
+
+    Returns:
+        tuple: The names of the columns, without the data column.
+    """
+    return columns.get(table, generic_columns)
+
+
+def date_text(value):
+    """
+    Writes a date the way it is stored in a date column.
+
+    Args:
+        value (datetime or str): The date.
+
+    Returns:
+        str: The date in the format of BaseModel.to_dict, in UTC, or None
+             if the value is not a date.
+    """
+    if isinstance(value, str):
+        try:
+            value = parse_time(value)
+        except ValueError:
+            return None
+    if isinstance(value, datetime):
+        return format_time(naive_utc(value))
+    return None
+
+
+def column_sql(table, field):
+    """
+    Builds the SQL expression reading a field of a table, from its column
+    or from the JSON data.
+
+    Args:
+        table (str): The name of the table.
+        field (str): The name of the field.
+
+    Returns:
+        str: The SQL expression.
+
+    Raises:
+        ValueError: If the field name is not a valid identifier.
+    """
+    if field in table_columns(table):
+        return field
+    if not identifier.match(field):
+        raise ValueError(f"Invalid field name: {field}")
+    return f"json_extract(data, '$.{field}')"
+
+
+def to_row(table, document):
+    """
+    Splits a document into the values of the columns of a table.
+
+    Args:
+        table (str): The name of the table.
+        document (dict): The document.
+
+    Returns:
+        tuple: The value of each column, then the JSON of the other
+               fields.
+    """
+    extras = dict(document)
+    values = []
+    for column in table_columns(table):
+        value = extras.pop(column, None)
+        if column in date_fields and value is not None:
+            text = date_text(value)
+            if text is None:
+                extras[column] = value
+            value = text
+        values.append(value)
+    values.append(json.dumps(extras, default=str))
+    return tuple(values)
+
+
+def from_row(table, row):
+    """
+    Builds the document stored in a row. Missing columns are NULL and are
+    left out, dates are read back as naive UTC datetimes like pymongo
+    returns them.
+
+    Args:
+        table (str): The name of the table.
+        row (tuple): The values of the columns, then the JSON data.
+
+    Returns:
+        dict: The document.
+    """
+    document = json.loads(row[-1])
+    for column, value in zip(table_columns(table), row):
+        if value is None:
+            continue
+        if column in date_fields:
+            value = parse_time(value)
+        document[column] = value
+    return document
+
+
+def lean(row):
+    """
+    Writes the lean columns of a transaction row the way
+    Transaction.to_dict() does. The dates are already stored in that
+    format.
+
+    Args:
+        row (tuple): The values of the lean columns.
+
+    Returns:
+        dict: The dictionary representation of the transaction.
+    """
+    output = {column: value for column, value in zip(lean_columns, row)
+              if value is not None}
+    output["__class__"] = Transaction.__name__
+    return output
+
+
+def select_fields(document, fields=None):
+    """
+    Keeps only some fields of a document.
+
+    Args:
+        document (dict): The document.
+        fields (iterable, optional): The names of the fields to keep, _id
+                                     is always kept. Defaults to every
+                                     field.
+
+    Returns:
+        dict: The document with the selected fields.
+    """
+    if fields is None:
+        return document
+    fields = set(fields) | {"_id"}
+    return {key: value for key, value in document.items() if key in fields}
+
+
+class SQLiteStorage(BaseStorage):
+    """
+    SQLiteStorage Class
+
+    Stores users, transactions and import jobs in the tables of one
+    SQLite file. Each thread gets its own connection, opened in WAL mode
+    so readers never block the writer. Statements are written with
+    placeholders, so the compiled statements are reused from the
+    statement cache of each connection.
+
+    Transaction pages, keyset cursors and summaries are read from the
+    (user_id, created_date, _id, type, amount) index; the summaries with a
+    GROUP BY that never reads the table itself.
+
+    Attributes:
+        path (str): The path of the database file.
+        __local (local): The connection of each thread.
+        __ready (set): The database files whose schema was created by this
+                       process.
+        __tables (set): The (path, name) of the tables created on first
+                        use for classes without a table in the schema.
+        __lock (Lock): Guards the creation of the schema.
+        embed_transaction_ids (bool): True when the ids of a user's
+                                      transactions are also kept in the
+                                      user document.
+    """
+
+    __ready = set()
+    __tables = set()
+    __lock = threading.Lock()
+
+    def __init__(self, path=None):
+        """
+        Initializes the storage. The database is opened on first use.
+
+        Args:
+            path (str, optional): The path of the database file, defaults
+                                  to SQLITE_PATH or wealthwise.db.
+        """
+        self.path = path or getenv('SQLITE_PATH', 'wealthwise.db')
+        self.embed_transaction_ids = \
+            getenv('EMBED_TRANSACTION_IDS', '1') != '0'
+        self.__local = threading.local()
+
+    def connection(self):
+        """
+        Returns the connection of the current thread, opening it on first
+        use. A connection inherited through fork() is never reused.
+
+        Returns:
+            Connection: The SQLite connection.
+        """
+        connection = getattr(self.__local, "connection", None)
+        if connection is not None and self.__local.pid == getpid():
+            return connection
+        connection = sqlite3.connect(self.path, isolation_level=None,
+                                     timeout=float(getenv(
+                                         'SQLITE_BUSY_TIMEOUT', 5)),
+                                     cached_statements=256)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        if self.path not in SQLiteStorage.__ready:
+            self.__create_schema(connection)
+        self.__local.connection = connection
+        self.__local.pid = getpid()
+        return connection
+
+    def ensure_indexes(self):
+        """
+        Creates the tables and indexes that are missing.
+        """
+        self.__create_schema(self.connection())
+
+    def __create_schema(self, connection):
+        """
+        Runs the schema, which only creates what is missing.
+
+        Args:
+            connection (Connection): The connection to use.
+        """
+        with SQLiteStorage.__lock:
+            connection.executescript(schema)
+            SQLiteStorage.__ready.add(self.path)
+
+    def close(self):
+        """
+        Closes the connection of the current thread.
+        """
+        connection = getattr(self.__local, "connection", None)
+        if connection is not None:
+            if self.__local.pid == getpid():
+                connection.close()
+            self.__local.connection = None
+
+    def shutdown(self):
+        """
+        Closes the connection of the current thread when the process
+        exits.
+        """
+        self.close()
+
+    def new(self, obj):
+        """
+        Inserts a new object into its table.
+
+        Args:
+            obj (BaseModel): The object to insert.
+
+        Raises:
+            DuplicateValueError: If the _id or a value of a unique column,
+                                 like the username, is already stored.
+        """
+        data = self.to_document(obj)
+        if obj.__class__.__name__ == "User" and self.embed_transaction_ids:
+            data["transactions"] = []
+        with self.__transaction() as connection:
+            self.__insert(connection, collection_name(obj.__class__), data)
+            if isinstance(obj, Transaction):
+                self.__add_to_owners([data])
+        obj.mark_clean()
+
+    def new_many(self, objs):
+        """
+        Inserts objects of the same class in a single SQL transaction. An
+        object that cannot be inserted does not stop the others.
+
+        Args:
+            objs (list): The objects to insert.
+
+        Returns:
+            list: For each object, None if it was inserted or the error
+            message.
+        """
+        if not objs:
+            return []
+        table = collection_name(objs[0].__class__)
+        errors = []
+        inserted = []
+        with self.__transaction() as connection:
+            for obj in objs:
+                data = self.to_document(obj)
+                try:
+                    self.__insert(connection, table, data)
+                except DuplicateValueError as error:
+                    errors.append(str(error))
+                else:
+                    obj.mark_clean()
+                    errors.append(None)
+                    if isinstance(obj, Transaction):
+                        inserted.append(data)
+            self.__add_to_owners(inserted)
+        return errors
+
+    def update(self, obj):
+        """
+        Writes the attributes of an object changed since it was loaded.
+        Nothing is written when no attribute changed.
+
+        Args:
+            obj (BaseModel): The object to write.
+
+        Raises:
+            DuplicateValueError: If a value of a unique column, like the
+                                 username, is already stored.
+        """
+        data = self.to_document(obj)
+        data.pop("_id", None)
+        changes = obj.changes()
+        removed = set()
+        if changes is not None:
+            changed, removed = changes
+            if not changed and not removed:
+                return
+            data = {key: data[key] for key in changed if key in data}
+
+        def change(document):
+            """Applies the changes of the object to its document."""
+            for key in removed:
+                document.pop(key, None)
+            document.update(data)
+
+        self.__modify(collection_name(obj.__class__), obj._id, change)
+        obj.mark_clean()
+
+    def update_array(self, obj, operator, field, values):
+        """
+        Runs an array update operator on one field of a stored object and
+        applies the same change to the object in memory.
+
+        Args:
+            obj (BaseModel): The object to update.
+            operator (str): One of $push, $pull and $addToSet.
+            field (str): The name of the array field.
+            values (tuple): The values of the operation.
+        """
+        if not values:
+            return
+
+        def change(document):
+            """Applies the operator to the field of the document."""
+            document[field] = apply_array(document.get(field), operator,
+                                          values)
+
+        self.__modify(collection_name(obj.__class__), obj._id, change)
+        setattr(obj, field,
+                apply_array(getattr(obj, field, None), operator, values))
+        obj.mark_clean(field)
+
+    def delete(self, obj=None):
+        """
+        Deletes an object. A deleted transaction is also removed from the
+        ids kept in its owner.
+
+        Args:
+            obj (BaseModel, optional): The object to delete.
+        """
+        if obj is None:
+            return
+        table = collection_name(obj.__class__)
+
+        def pull(document):
+            """Removes the transaction from the ids kept in its owner."""
+            if "transactions" in document:
+                document["transactions"] = apply_array(
+                    document["transactions"], "$pull", (obj._id,))
+
+        with self.__transaction() as connection:
+            self.__table(connection, table)
+            owner = None
+            if table == "transactions":
+                row = connection.execute(
+                    "SELECT user_id FROM transactions WHERE _id = ?",
+                    (obj._id,)).fetchone()
+                owner = row[0] if row else None
+            connection.execute(f"DELETE FROM {table} WHERE _id = ?",
+                               (obj._id,))
+            if owner and self.embed_transaction_ids:
+                self.__modify("users", owner, pull)
+            elif owner:
+                self.__touch(connection, table, {"user_id": owner})
+
+    def version(self, user_id):
+        """
+        Reads the version counter of a user, raised by every change to the
+        user or to their transactions, with one primary key lookup.
+
+        Args:
+            user_id (str): The ID of the user.
+
+        Returns:
+            int: The version of the user, 0 if the user is not found.
+        """
+        row = self.connection().execute(
+            "SELECT version FROM versions WHERE user_id = ?",
+            (user_id,)).fetchone()
+        return row[0] if row else 0
+
+    def get(self, cls, id, fields=None):
+        """
+        Retrieves an object by class and ID.
+
+        Args:
+            cls (BaseModel): The class of the object to retrieve.
+            id (str): The ID of the object to retrieve.
+            fields (list, optional): The only fields to load, the object
+                                     is then partial. _id is always
+                                     loaded. Defaults to every field.
+
+        Returns:
+            BaseModel: The retrieved object, or None if not found.
+        """
+        if cls not in classes.values():
+            return None
+        return self.__find_one(cls, "_id = ?", (id,), fields)
+
+    def get_owned(self, cls, id, owner, fields=None):
+        """
+        Retrieves an object by ID only if it belongs to the given user,
+        with one lookup on the primary key.
+
+        Args:
+            cls (BaseModel): The class of the object to retrieve.
+            id (str): The ID of the object to retrieve.
+            owner (str): The ID of the user who must own the object.
+            fields (list, optional): The only fields to load.
+
+        Returns:
+            BaseModel: The retrieved object, or None if it is not found
+            or belongs to another user.
+        """
+        if cls not in classes.values() or not id or not owner:
+            return None
+        return self.__find_one(cls, "_id = ? AND user_id = ?", (id, owner),
+                               fields)
+
+    def filter(self, cls, column_name, value, fields=None):
+        """
+        Retrieves an object by class and a specified column value.
+
+        Args:
+            cls (BaseModel): The class of the object to retrieve.
+            column_name (str): The column name to filter by.
+            value (str): The value to filter by.
+            fields (list, optional): The only fields to load.
+
+        Returns:
+            BaseModel: The retrieved object, or None if not found.
+        """
+        table = self.__table(self.connection(), collection_name(cls))
+        return self.__find_one(cls, f"{column_sql(table, column_name)} = ?",
+                               (value,), fields)
+
+    def taken(self, cls, exclude=None, **values):
+        """
+        Finds which of the given values are already stored, with a single
+        query.
+
+        Args:
+            cls (BaseModel): The class of the objects to look in.
+            exclude (str, optional): The id of an object to ignore, like
+                                     the one being updated.
+            **values: The values to look for, by field.
+
+        Returns:
+            str: The first field, in argument order, whose value is
+                 already stored, or None if none is.
+        """
+        if not values:
+            return None
+        table = self.__table(self.connection(), collection_name(cls))
+        expressions = [column_sql(table, key) for key in values]
+        where = " OR ".join(f"{expression} = ?" for expression in expressions)
+        parameters = list(values.values())
+        if exclude is not None:
+            where = f"({where}) AND _id != ?"
+            parameters.append(exclude)
+        row = self.connection().execute(
+            f"SELECT {', '.join(expressions)} FROM {table} WHERE {where} "
+            "LIMIT 1", parameters).fetchone()
+        if row is None:
+            return None
+        for (key, value), stored in zip(values.items(), row):
+            if stored == value:
+                return key
+        return None
+
+    def search(self, obj, year, month, page, page_size):
+        """
+        Searches for transactions based on year and month, with
+        pagination. The summary is a GROUP BY on the index, counting the
+        dated transactions like the monthly rollups of MongoDB.
+
+        Args:
+            obj (User): The user object to retrieve transactions for.
+            year (int): The year to filter transactions by.
+            month (int): The month to filter transactions by.
+            page (int): The page number for pagination.
+            page_size (int): The number of transactions per page.
+
+        Returns:
+            dict: A dictionary containing pagination details, summary,
+            and transactions.
+        """
+        where = "user_id = ?"
+        parameters = [obj._id]
+        if year:
+            dates = month_range(year, month)
+            where += " AND created_date >= ? AND created_date < ?"
+            parameters += [format_time(dates["$gte"]),
+                           format_time(dates["$lt"])]
+        connection = self.connection()
+        summery = {}
+        total_documents = 0
+        for type, total_amount, count in connection.execute(
+                f"SELECT type, SUM({numeric_amount}), COUNT(*) "
+                "FROM transactions "
+                f"WHERE {where} AND created_date IS NOT NULL GROUP BY type",
+                parameters):
+            summery[type] = total_amount
+            total_documents += count
+        if not total_documents:
+            return {}
+        transactions = self.__page(connection, where, parameters, page_size,
+                                   (page - 1) * page_size)
+        return {
+            "page": page,
+            "page_size": page_size,
+            "total_pages": math.ceil(total_documents / page_size),
+            "total_documents": total_documents,
+            "summery": summery,
+            "transactions": transactions
+        }
+
+    def filter_all(self, obj, page, page_size, cursor=None):
+        """
+        Retrieves all transactions for a user with pagination.
+
+        When a cursor is given, even an empty one, the page is read with
+        keyset pagination instead of page numbers: transactions are
+        ordered by (created_date, _id) descending and the page starts
+        after the cursor.
+
+        Args:
+            obj (User): The user object to retrieve transactions for.
+            page (int): The page number for pagination.
+            page_size (int): The number of transactions per page.
+            cursor (str, optional): The next_cursor of the previous page.
+
+        Returns:
+            dict: A dictionary containing pagination details and
+            transactions.
+
+        Raises:
+            ValueError: If the cursor is not valid.
+        """
+        if cursor is not None:
+            return self.filter_after(obj, cursor, page_size)
+        connection = self.connection()
+        total_documents = connection.execute(
+            "SELECT COUNT(*) FROM transactions WHERE user_id = ?",
+            (obj._id,)).fetchone()[0]
+        if not total_documents:
+            return {}
+        transactions = self.__page(connection, "user_id = ?", [obj._id],
+                                   page_size, (page - 1) * page_size)
+        return {
+            "page": page,
+            "page_size": page_size,
+            "total_pages": math.ceil(total_documents / page_size),
+            "total_documents": total_documents,
+            "transactions": transactions
+        }
+
+    def filter_after(self, obj, cursor, page_size):
+        """
+        Reads one page of a user's transactions with keyset pagination,
+        a range scan of the index starting after the cursor.
+
+        Args:
+            obj (User): The user object to retrieve transactions for.
+            cursor (str): The next_cursor of the previous page, empty for
+                          the first page.
+            page_size (int): The number of transactions per page.
+
+        Returns:
+            dict: A dictionary containing the page size, the cursor of
+            the next page and transactions.
+
+        Raises:
+            ValueError: If the cursor is not valid.
+        """
+        where = "user_id = ?"
+        parameters = [obj._id]
+        if cursor:
+            created_date, id = decode_cursor(cursor)
+            where += " AND (created_date, _id) < (?, ?)"
+            parameters += [date_text(created_date), id]
+        transactions = self.__page(self.connection(), where, parameters,
+                                   page_size + 1)
+        next_cursor = None
+        if len(transactions) > page_size:
+            transactions = transactions[:page_size]
+            next_cursor = encode_cursor(transactions[-1]["created_date"],
+                                        transactions[-1]["_id"])
+        return {
+            "page_size": page_size,
+            "next_cursor": next_cursor,
+            "transactions": transactions
+        }
+
+    def iter_transactions(self, obj, batch_size=500):
+        """
+        Reads all transactions of a user lazily, newest first, fetching
+        batch_size rows at a time.
+
+        Args:
+            obj (User): The user object to retrieve transactions for.
+            batch_size (int): The number of rows fetched at once.
+
+        Yields:
+            dict: The dictionary representation of each transaction.
+        """
+        cursor = self.connection().execute(
+            f"SELECT {', '.join(lean_columns)} FROM transactions "
+            f"WHERE user_id = ? {transaction_order}", (obj._id,))
+        try:
+            rows = cursor.fetchmany(batch_size)
+            while rows:
+                yield from (lean(row) for row in rows)
+                rows = cursor.fetchmany(batch_size)
+        finally:
+            cursor.close()
+
+    def load_transactions(self, obj, batch_size=500):
+        """
+        Loads all transactions of a user into a compact TransactionBatch.
+
+        Args:
+            obj (User): The user object to retrieve transactions for.
+            batch_size (int): The number of rows fetched at once.
+
+        Returns:
+            TransactionBatch: The transactions, newest first.
+        """
+        cursor = self.connection().execute(
+            f"SELECT {', '.join(columns['transactions'])}, data "
+            f"FROM transactions WHERE user_id = ? {transaction_order}",
+            (obj._id,))
+        batch = TransactionBatch()
+        try:
+            rows = cursor.fetchmany(batch_size)
+            while rows:
+                batch.extend(select_fields(from_row("transactions", row),
+                                           transaction_projection)
+                             for row in rows)
+                rows = cursor.fetchmany(batch_size)
+        finally:
+            cursor.close()
+        return batch
+
+    @contextmanager
+    def __transaction(self):
+        """
+        Runs the enclosed statements in one SQL transaction, taking the
+        write lock at the start so reads and writes see the same data.
+
+        Yields:
+            Connection: The connection of the current thread.
+        """
+        connection = self.connection()
+        if connection.in_transaction:
+            yield connection
+            return
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield connection
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    def __table(self, connection, table):
+        """
+        Creates the table of a class that has none in the schema, the way
+        MongoDB creates a collection on first use.
+
+        Args:
+            connection (Connection): The connection to use.
+            table (str): The name of the table.
+
+        Returns:
+            str: The name of the table.
+
+        Raises:
+            ValueError: If the name is not a valid identifier.
+        """
+        if table in columns or (self.path, table) in SQLiteStorage.__tables:
+            return table
+        if not identifier.match(table):
+            raise ValueError(f"Invalid table name: {table}")
+        connection.execute(generic_table.format(table))
+        SQLiteStorage.__tables.add((self.path, table))
+        return table
+
+    def __insert(self, connection, table, document):
+        """
+        Inserts a document into a table.
+
+        Args:
+            connection (Connection): The connection to use.
+            table (str): The name of the table.
+            document (dict): The document.
+
+        Raises:
+            DuplicateValueError: If the _id or a unique value is taken.
+        """
+        self.__table(connection, table)
+        names = table_columns(table) + ("data",)
+        try:
+            connection.execute(
+                f"INSERT INTO {table} ({', '.join(names)}) "
+                f"VALUES ({', '.join('?' * len(names))})",
+                to_row(table, document))
+        except sqlite3.IntegrityError as error:
+            raise self.duplicate(error) from error
+        self.__touch(connection, table, document)
+
+    def __add_to_owners(self, documents):
+        """
+        Adds inserted transactions to the ids kept in their owners, with
+        one update per owner.
+
+        Args:
+            documents (list): The inserted transactions.
+        """
+        if not self.embed_transaction_ids:
+            return
+        for owner, ids in owned_ids(documents).items():
+
+            def push(document, ids=ids):
+                """Appends the transactions to the ids of the owner."""
+                if "transactions" in document:
+                    document["transactions"] = apply_array(
+                        document["transactions"], "$push", ids)
+
+            self.__modify("users", owner, push)
+
+    def __modify(self, table, id, change):
+        """
+        Reads a stored document, changes it and writes it back in one SQL
+        transaction.
+
+        Args:
+            table (str): The name of the table.
+            id (str): The ID of the document.
+            change (callable): Function changing the document in place.
+
+        Raises:
+            DuplicateValueError: If the change takes a unique value of
+                                 another document.
+        """
+        names = table_columns(table) + ("data",)
+        with self.__transaction() as connection:
+            self.__table(connection, table)
+            row = connection.execute(
+                f"SELECT {', '.join(names)} FROM {table} WHERE _id = ?",
+                (id,)).fetchone()
+            if row is None:
+                return
+            document = from_row(table, row)
+            change(document)
+            document["_id"] = id
+            try:
+                connection.execute(
+                    f"UPDATE {table} SET "
+                    f"{', '.join(name + ' = ?' for name in names)} "
+                    "WHERE _id = ?", to_row(table, document) + (id,))
+            except sqlite3.IntegrityError as error:
+                raise self.duplicate(error) from error
+            self.__touch(connection, table, document)
+
+    @staticmethod
+    def __touch(connection, table, document):
+        """
+        Raises the version of the user a changed document belongs to.
+
+        Args:
+            connection (Connection): The connection to use.
+            table (str): The name of the table.
+            document (dict): The changed document.
+        """
+        if table == "users":
+            user_id = document.get("_id")
+        elif table == "transactions":
+            user_id = document.get("user_id")
+        else:
+            return
+        if user_id:
+            connection.execute(
+                "INSERT INTO versions (user_id, version) VALUES (?, 1) "
+                "ON CONFLICT(user_id) DO UPDATE SET version = version + 1",
+                (user_id,))
+
+    def __find_one(self, cls, where, parameters, fields=None):
+        """
+        Loads the first object of a class matching a condition.
+
+        Args:
+            cls (BaseModel): The class of the object.
+            where (str): The SQL condition.
+            parameters (tuple): The values of the placeholders.
+            fields (list, optional): The only fields to load.
+
+        Returns:
+            BaseModel: The object, or None if not found.
+        """
+        table = collection_name(cls)
+        row = self.connection().execute(
+            f"SELECT {', '.join(table_columns(table))}, data FROM {table} "
+            f"WHERE {where} LIMIT 1", parameters).fetchone()
+        if row is None:
+            return None
+        return cls.from_document(select_fields(from_row(table, row), fields))
+
+    def __page(self, connection, where, parameters, limit, offset=0):
+        """
+        Reads a page of transactions, newest first, as lean dictionaries.
+
+        Args:
+            connection (Connection): The connection to use.
+            where (str): The SQL condition.
+            parameters (list): The values of the placeholders.
+            limit (int): The maximum number of transactions.
+            offset (int, optional): The number of transactions to skip.
+
+        Returns:
+            list: The dictionary representation of the transactions.
+        """
+        rows = connection.execute(
+            f"SELECT {', '.join(lean_columns)} FROM transactions "
+            f"WHERE {where} {transaction_order} LIMIT ? OFFSET ?",
+            list(parameters) + [limit, max(offset, 0)])
+        return [lean(row) for row in rows]
+
+    @staticmethod
+    def duplicate(error):
+        """
+        Converts a unique constraint failure of SQLite to a
+        DuplicateValueError naming the column.
+
+        Args:
+            error (IntegrityError): The error raised by sqlite3.
+
+        Returns:
+            DuplicateValueError: The error to raise.
+        """
+        match = unique_failed.search(str(error))
+        return DuplicateValueError(match.group(1) if match else None)
@@ -0,0 +1,59 @@
+#!/usr/bin/python3
+"""
+Module export.py
+This module formats the transactions of a user as CSV or NDJSON lines,
+one transaction at a time, so exports can be streamed to the client.
+"""
+
+import csv
+import io
+import itertools
+import json
+
+export_fields = ("_id", "created_date", "updated_date", "amount", "type",
+                 "category", "description")
+export_types = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson"
+}
+
+
+def csv_lines(transactions):
+    """
+    Format transactions as CSV, starting with a header line.
+
+    Args:
+        transactions: Iterable of transaction dictionaries, read lazily.
+
+    Yields:
+        str: The next CSV line.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    rows = ([transaction.get(field, "") for field in export_fields]
+            for transaction in transactions)
+    for row in itertools.chain([export_fields], rows):
+        writer.writerow(row)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def ndjson_lines(transactions):
+    """
+    Format transactions as NDJSON, one JSON object per line.
+
+    Args:
+        transactions: Iterable of transaction dictionaries, read lazily.
+
+    Yields:
+        str: The next NDJSON line.
+    """
+    for transaction in transactions:
+        yield json.dumps(transaction) + "\n"
+
+
+formatters = {
+    "csv": csv_lines,
+    "ndjson": ndjson_lines
+}
@@ -0,0 +1,140 @@
+#!/usr/bin/python3
+"""
+Module hashing.py
+This module hashes and checks passwords with bcrypt on a bounded pool of
+worker threads. bcrypt releases the GIL while it works, so the pool limits
+how many CPU cores password hashing can take at once, and requests beyond
+the queue limit are refused right away instead of piling up behind it.
+
+A request thread waits for its password operation to finish, so every
+pending operation holds a request thread of the server. max_pending counts
+the running and the queued operations and defaults to 4 per pool thread,
+so a short burst of logins waits a few rounds instead of being refused.
+It should stay below the number of request threads of each API process,
+otherwise logins can hold every thread before any is refused.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import bcrypt
+import os
+import threading
+
+rounds = int(os.getenv("BCRYPT_ROUNDS", 12))
+workers = int(os.getenv("BCRYPT_WORKERS", os.cpu_count() or 2))
+max_pending = int(os.getenv("BCRYPT_MAX_PENDING", workers * 4))
+
+executor = None
+pending = threading.BoundedSemaphore(max_pending)
+executor_lock = threading.Lock()
+
+
+class PoolBusyError(RuntimeError):
+    """
+    Raised when too many passwords are waiting to be hashed or checked.
+    """
+
+
+def get_executor():
+    """
+    Return the worker pool hashing the passwords, created on first use.
+
+    Returns:
+        ThreadPoolExecutor: The worker pool.
+    """
+    global executor
+    with executor_lock:
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=workers,
+                                          thread_name_prefix="bcrypt")
+        return executor
+
+
+def after_fork():
+    """
+    Forget the worker pool and the queue of the parent process in a
+    forked child.
+    """
+    global executor, executor_lock, pending
+    executor = None
+    executor_lock = threading.Lock()
+    pending = threading.BoundedSemaphore(max_pending)
+
+
+def run(function, *args):
+    """
+    Run a bcrypt function on the worker pool and wait for its result.
+
+    Args:
+        function (callable): The function to run.
+        *args: The arguments of the function.
+
+    Returns:
+        The result of the function.
+
+    Raises:
+        PoolBusyError: If max_pending calls are already running or
+                       waiting.
+    """
+    slot = pending
+    if not slot.acquire(blocking=False):
+        raise PoolBusyError("Too many password operations in progress")
+    try:
+        future = get_executor().submit(function, *args)
+    except BaseException:
+        slot.release()
+        raise
+    future.add_done_callback(lambda future: slot.release())
+    return future.result()
+
+
+def hash_password(password):
+    """
+    Hash a password with the configured cost factor.
+
+    Args:
+        password (str): The password.
+
+    Returns:
+        str: The bcrypt hash.
+    """
+    salt = bcrypt.gensalt(rounds)
+    return run(bcrypt.hashpw, password.encode("utf-8"), salt).decode("utf-8")
+
+
+def check_password(password, stored_hash):
+    """
+    Check a password against a bcrypt hash.
+
+    Args:
+        password (str): The password.
+        stored_hash (str): The stored hash.
+
+    Returns:
+        bool: True if the password matches, False otherwise or if the
+              hash is not a bcrypt hash.
+    """
+    try:
+        return run(bcrypt.checkpw, password.encode("utf-8"),
+                   stored_hash.encode("utf-8"))
+    except ValueError:
+        return False
+
+
+def needs_rehash(stored_hash):
+    """
+    Check whether a hash was made with another cost factor than the
+    configured one.
+
+    Args:
+        stored_hash (str): The stored hash, like $2b$12$...
+
+    Returns:
+        bool: True if the password should be hashed again.
+    """
+    try:
+        return int(stored_hash.split("$")[2]) != rounds
+    except (IndexError, ValueError):
+        return True
+
+
+os.register_at_fork(after_in_child=after_fork)
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+ImportJob class definition module.
+
+This module contains the definition of the ImportJob class, which inherits
+from BaseModel. An ImportJob records the progress of a bank statement being
+imported in the background.
+"""
+
+from models.base_model import BaseModel
+
+
+class ImportJob(BaseModel):
+    """
+    ImportJob class that inherits from BaseModel.
+
+    Attributes:
+        user_id (str): The ID of the user the transactions are imported for.
+        filename (str): The name of the uploaded statement.
+        format (str): The format of the statement, csv or ofx.
+        status (str): pending, running, done or failed.
+        processed (int): The number of rows read so far.
+        created (int): The number of transactions created so far.
+        failed (int): The number of rows that could not be imported.
+        errors (list): The first row errors, with the row index.
+        error (str): The reason the whole import failed, if it did.
+    """
+
+    user_id: str = ""
+    filename: str = ""
+    format: str = "csv"
+    status: str = "pending"
+    processed: int = 0
+    created: int = 0
+    failed: int = 0
+    errors: list = []
+    error: str = ""
+
+    def __init__(self, *args, **kwargs) -> None:
+        """
+        Initialize a new ImportJob instance.
+
+        Args:
+            *args: Variable length argument list.
+            **kwargs: Arbitrary keyword arguments.
+        """
+        super().__init__(*args, **kwargs)
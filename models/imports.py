@@ -0,0 +1,383 @@
+#!/usr/bin/python3
+"""
+Module imports.py
+This module imports bank statements (CSV or OFX) in the background. The
+upload is copied to a temporary file, then a worker thread parses it one
+transaction at a time and writes the transactions in chunks, recording
+its progress in an ImportJob.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import csv
+import html
+from models import storage
+from models.import_job import ImportJob
+from models.ingest import ingest_transactions
+from models.user import User
+import os
+import shutil
+import tempfile
+import threading
+
+workers = int(os.getenv("IMPORT_WORKERS", 2))
+read_size = 64 * 1024
+max_errors = 100
+date_formats = ("%Y-%m-%d", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%d %H:%M:%S",
+                "%m/%d/%Y", "%d.%m.%Y", "%Y%m%d%H%M%S", "%Y%m%d")
+csv_columns = {
+    "created_date": ("date", "posted date", "transaction date",
+                     "booking date", "created_date"),
+    "amount": ("amount", "transaction amount"),
+    "debit": ("debit", "withdrawal"),
+    "credit": ("credit", "deposit"),
+    "type": ("type",),
+    "category": ("category",),
+    "description": ("description", "memo", "payee", "name", "details")
+}
+statement_types = {
+    "income": "income",
+    "credit": "income",
+    "deposit": "income",
+    "expense": "expense",
+    "debit": "expense",
+    "withdrawal": "expense"
+}
+extensions = {
+    ".csv": "csv",
+    ".ofx": "ofx",
+    ".qfx": "ofx"
+}
+mimetypes = {
+    "text/csv": "csv",
+    "application/x-ofx": "ofx",
+    "application/ofx": "ofx"
+}
+
+executor = None
+executor_lock = threading.Lock()
+
+
+def parse_amount(value):
+    """
+    Read an amount written the way banks do, like "1,234.50", "$12" or
+    "(12.00)" for a negative amount.
+
+    Args:
+        value (str): The amount as written in the statement.
+
+    Returns:
+        float: The amount, or the value unchanged if it is not a number.
+    """
+    text = (value or "").strip()
+    negative = text.startswith("(") and text.endswith(")")
+    text = text.strip("()").replace(",", "").replace(" ", "")
+    text = text.lstrip("$€£")
+    try:
+        amount = float(text)
+    except ValueError:
+        return value
+    return -amount if negative else amount
+
+
+def parse_date(value):
+    """
+    Read a statement date in one of the supported formats.
+
+    Args:
+        value (str): The date as written in the statement.
+
+    Returns:
+        datetime: The date, or the value unchanged if it is not a date.
+    """
+    text = (value or "").strip()
+    for date_format in date_formats:
+        try:
+            return datetime.strptime(text, date_format)
+        except ValueError:
+            continue
+    return value
+
+
+def statement_transaction(created_date, amount, description, category="",
+                          txn_type=""):
+    """
+    Build the transaction data of one statement line. Positive amounts
+    are income and negative ones expenses, unless the type is given. The
+    bank types of statement_types become income or expense, other types
+    are kept as written and checked by ingest_transactions() like the
+    types sent to the API.
+
+    Args:
+        created_date (str): The date of the line.
+        amount (str): The signed amount of the line.
+        description (str): The description of the line.
+        category (str, optional): The category of the line.
+        txn_type (str, optional): The type of the line.
+
+    Returns:
+        dict: The transaction data.
+    """
+    amount = parse_amount(amount)
+    txn_type = (txn_type or "").strip()
+    data = {"amount": amount, "description": description or "",
+            "category": category or "",
+            "type": statement_types.get(txn_type.lower(), txn_type)}
+    if isinstance(amount, float):
+        if not data["type"]:
+            data["type"] = "income" if amount >= 0 else "expense"
+        data["amount"] = abs(amount)
+    if created_date:
+        data["created_date"] = parse_date(created_date)
+    return data
+
+
+def csv_transactions(stream):
+    """
+    Parse a CSV statement one line at a time. The columns are matched by
+    name, without case, see csv_columns.
+
+    Args:
+        stream: The text stream of the statement.
+
+    Yields:
+        dict: The transaction data of each line.
+    """
+    reader = csv.reader(stream)
+    header = next(reader, None)
+    if not header:
+        return
+    names = [name.strip().lower() for name in header]
+    columns = {}
+    for field, aliases in csv_columns.items():
+        for alias in aliases:
+            if alias in names:
+                columns[field] = names.index(alias)
+                break
+    for row in reader:
+        if not any(cell.strip() for cell in row):
+            continue
+        values = {field: row[index].strip() if index < len(row) else ""
+                  for field, index in columns.items()}
+        amount = values.get("amount")
+        if not amount and ("debit" in values or "credit" in values):
+            credit = parse_amount(values.get("credit") or "0")
+            debit = parse_amount(values.get("debit") or "0")
+            if isinstance(credit, float) and isinstance(debit, float):
+                amount = str(credit - abs(debit))
+        yield statement_transaction(values.get("created_date"), amount,
+                                    values.get("description"),
+                                    values.get("category"),
+                                    values.get("type"))
+
+
+def ofx_tags(stream):
+    """
+    Split an OFX document into its tags, reading it in fixed-size blocks.
+    Both the SGML form, where values have no closing tag, and the XML
+    form are supported.
+
+    Args:
+        stream: The text stream of the statement.
+
+    Yields:
+        tuple: The upper-case tag name, with a leading / for closing tags,
+               and the text that follows it.
+    """
+    buffer = ""
+    while True:
+        block = stream.read(read_size)
+        if not block:
+            break
+        buffer += block
+        end = buffer.rfind("<")
+        if end <= 0:
+            continue
+        for token in buffer[:end].split("<")[1:]:
+            tag, _, value = token.partition(">")
+            yield tag.strip().upper(), value.strip()
+        buffer = buffer[end:]
+    for token in buffer.split("<")[1:]:
+        tag, _, value = token.partition(">")
+        yield tag.strip().upper(), value.strip()
+
+
+def ofx_transactions(stream):
+    """
+    Parse the STMTTRN records of an OFX statement one at a time.
+
+    Args:
+        stream: The text stream of the statement.
+
+    Yields:
+        dict: The transaction data of each record.
+    """
+    record = None
+    for tag, value in ofx_tags(stream):
+        if tag == "STMTTRN":
+            record = {}
+        elif tag == "/STMTTRN" and record is not None:
+            posted = record.get("DTPOSTED", "")
+            yield statement_transaction(
+                posted[:14] if len(posted) >= 14 else posted[:8],
+                record.get("TRNAMT"),
+                record.get("NAME") or record.get("MEMO"))
+            record = None
+        elif record is not None and not tag.startswith("/"):
+            record[tag] = html.unescape(value)
+
+
+parsers = {
+    "csv": csv_transactions,
+    "ofx": ofx_transactions
+}
+
+
+def statement_format(filename=None, mimetype=None, requested=None):
+    """
+    Find the format of a statement from the requested format, the file
+    extension or the content type, in that order.
+
+    Args:
+        filename (str, optional): The name of the uploaded file.
+        mimetype (str, optional): The content type of the upload.
+        requested (str, optional): The format asked by the client.
+
+    Returns:
+        str: csv or ofx, or None if the format is not supported.
+    """
+    if requested:
+        requested = requested.lower()
+        return requested if requested in parsers else None
+    extension = os.path.splitext(filename or "")[1].lower()
+    return extensions.get(extension) or mimetypes.get(mimetype)
+
+
+def get_executor():
+    """
+    Return the worker pool running the imports, created on first use.
+
+    Returns:
+        ThreadPoolExecutor: The worker pool.
+    """
+    global executor
+    with executor_lock:
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=workers,
+                                          thread_name_prefix="import")
+        return executor
+
+
+def after_fork():
+    """
+    Forget the worker pool of the parent process in a forked child, its
+    threads do not exist there.
+    """
+    global executor, executor_lock
+    executor = None
+    executor_lock = threading.Lock()
+
+
+def run_import(job_id, path):
+    """
+    Import a spooled statement and record the progress in its job. The
+    worker opens and closes the storage the way a request does, so with
+    MONGO_CONNECTION_MODE=request the client is not closed under it by
+    the end of a request.
+
+    Args:
+        job_id (str): The id of the ImportJob.
+        path (str): The path of the spooled statement.
+    """
+    storage.reload()
+    try:
+        import_statement(job_id, path)
+    finally:
+        if not storage.pooled:
+            storage.close()
+
+
+def import_statement(job_id, path):
+    """
+    Import a spooled statement and record the progress in its job. The
+    temporary file is removed at the end.
+
+    Args:
+        job_id (str): The id of the ImportJob.
+        path (str): The path of the spooled statement.
+    """
+    job = storage.get(ImportJob, job_id)
+    if not job:
+        os.remove(path)
+        return
+    errors = []
+
+    def progress(results):
+        """
+        Add the results of one chunk to the job.
+
+        Args:
+            results (list): The result of each line of the chunk.
+        """
+        for result in results:
+            if "error" in result:
+                job.failed += 1
+                if len(errors) < max_errors:
+                    errors.append(result)
+            else:
+                job.created += 1
+        job.processed += len(results)
+        job.errors = list(errors)
+        job.update()
+
+    try:
+        user = storage.get(User, job.user_id, [])
+        if not user:
+            raise ValueError("User not found")
+        job.status = "running"
+        job.update()
+        with open(path, encoding="utf-8-sig", errors="replace",
+                  newline="") as stream:
+            ingest_transactions(user, parsers[job.format](stream),
+                                on_chunk=progress)
+        job.status = "done"
+    except Exception as error:
+        job.status = "failed"
+        job.error = str(error)
+    finally:
+        os.remove(path)
+    job.update()
+
+
+def start_import(user, stream, statement_type, filename=""):
+    """
+    Copy an uploaded statement to a temporary file in fixed-size blocks
+    and queue its import.
+
+    Args:
+        user (User): The owner of the transactions.
+        stream: The binary stream of the upload.
+        statement_type (str): csv or ofx.
+        filename (str, optional): The name of the uploaded file.
+
+    Returns:
+        ImportJob: The job, still pending.
+    """
+    descriptor, path = tempfile.mkstemp(prefix="wealthwise-import-",
+                                        suffix="." + statement_type)
+    try:
+        with os.fdopen(descriptor, "wb") as spool:
+            shutil.copyfileobj(stream, spool, read_size)
+        job = ImportJob(user_id=user._id, filename=filename or "",
+                        format=statement_type, status="pending",
+                        processed=0, created=0, failed=0, errors=[],
+                        error="")
+        job.save()
+    except Exception:
+        os.remove(path)
+        raise
+    get_executor().submit(run_import, job._id, path)
+    return job
+
+
+os.register_at_fork(after_in_child=after_fork)
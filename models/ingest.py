@@ -0,0 +1,116 @@
+#!/usr/bin/python3
+"""
+Module ingest.py
+This module writes many transactions of one user at a time, validating
+them and inserting them in chunks with a single database call per chunk.
+"""
+
+from itertools import islice
+from models import storage
+from models.base_model import date_fields, parse_time
+from models.transaction import Transaction
+from models.utility import is_transaction_valid
+from os import getenv
+
+chunk_size = int(getenv("BULK_CHUNK_SIZE", 1000))
+reserved_fields = ("_id", "__class__", "updated_date", "user_id")
+
+
+def chunked(iterable, size):
+    """
+    Split an iterable into lists of at most size items without reading
+    more than one chunk ahead.
+
+    Args:
+        iterable: The items to split.
+        size (int): The maximum number of items per chunk.
+
+    Yields:
+        list: The next chunk.
+    """
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def client_values(data):
+    """
+    Keep the fields of client data that a client may set, with the dates
+    parsed so they are stored as dates.
+
+    Args:
+        data (dict): The transaction data, checked by
+                     is_transaction_valid.
+
+    Returns:
+        dict: The values to set on the transaction.
+    """
+    values = {}
+    for key, value in data.items():
+        if key in reserved_fields:
+            continue
+        if key in date_fields and isinstance(value, str):
+            value = parse_time(value)
+        values[key] = value
+    return values
+
+
+def new_transaction(user, data):
+    """
+    Build a new transaction owned by user from client data.
+
+    Args:
+        user (User): The owner of the transaction.
+        data (dict): The transaction data.
+
+    Returns:
+        Transaction: The transaction, not saved yet.
+    """
+    transaction = Transaction(**client_values(data))
+    transaction.user_id = user._id
+    return transaction
+
+
+def ingest_transactions(user, items, size=None, on_chunk=None):
+    """
+    Validate and insert transactions for a user, one insert_many per
+    chunk. The storage adds their ids to the user in the same write that
+    raises the version of the user.
+
+    Args:
+        user (User): The owner of the transactions.
+        items: Iterable of transaction data, read lazily.
+        size (int, optional): The number of items per chunk.
+        on_chunk (callable, optional): Called with the list of results of
+                                       each chunk, in item order.
+
+    Returns:
+        tuple: The number of created and of failed transactions.
+    """
+    created = 0
+    failed = 0
+    for chunk in chunked(enumerate(items), size or chunk_size):
+        results = {}
+        transactions = []
+        for index, data in chunk:
+            error = is_transaction_valid(data)
+            if error:
+                results[index] = {"index": index, "error": error}
+            else:
+                transactions.append((index, new_transaction(user, data)))
+        errors = storage.new_many([txn for index, txn in transactions])
+        for (index, transaction), error in zip(transactions, errors):
+            if error:
+                results[index] = {"index": index, "error": error}
+            else:
+                results[index] = {"index": index, "_id": transaction._id}
+        results = [results[index] for index in sorted(results)]
+        inserted = len([result for result in results if "_id" in result])
+        created += inserted
+        failed += len(results) - inserted
+        if on_chunk:
+            on_chunk(results)
+    return created, failed
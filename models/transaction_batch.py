@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+TransactionBatch class definition module.
+
+This module contains the definition of the TransactionBatch class, a compact
+container for many transactions. The fields of the transactions are kept in
+columns, amounts and dates in typed arrays, instead of one object and one
+__dict__ per transaction.
+"""
+
+from array import array
+from datetime import datetime, timedelta, timezone
+import models
+from models.base_model import date_fields, format_time, hidden_fields
+from models.transaction import Transaction
+import sys
+
+epoch = datetime(1970, 1, 1)
+microsecond = timedelta(microseconds=1)
+text_fields = ("_id", "user_id", "type", "category", "description")
+interned_fields = ("type", "category")
+missing = object()
+max_exact_int = 2 ** 53
+
+
+def to_micros(value):
+    """
+    Convert a date to microseconds since the epoch, in UTC.
+
+    Args:
+        value (datetime): The date, naive dates are taken as UTC.
+
+    Returns:
+        int: The number of microseconds.
+    """
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return (value - epoch) // microsecond
+
+
+def from_micros(value):
+    """
+    Convert microseconds since the epoch to a naive UTC date, the way
+    pymongo returns dates.
+
+    Args:
+        value (int): The number of microseconds.
+
+    Returns:
+        datetime: The date.
+    """
+    return epoch + timedelta(microseconds=value)
+
+
+class TransactionBatch:
+    """
+    TransactionBatch class that stores transactions by column.
+
+    Integer amounts share the amount column with a flag restoring their
+    type. Values that do not fit a column, like a missing field or a
+    field outside the Transaction schema, are kept per row in a sparse
+    dictionary, so every transaction reads back unchanged.
+
+    Attributes:
+        __text (dict): One list of strings per text field, None where
+                       the field is missing.
+        __amount (array): The amounts.
+        __is_int (array): 1 where the amount is an integer, 0 otherwise.
+        __dates (dict): One array of microseconds per date field.
+        __extras (dict): The values that do not fit the columns, by row.
+        __pending (dict): The transactions changed with set(), by row.
+    """
+
+    def __init__(self, documents=None):
+        """
+        Initialize a batch, optionally filled with documents.
+
+        Args:
+            documents: Iterable of documents or Transaction objects.
+        """
+        self.__text = {field: [] for field in text_fields}
+        self.__amount = array("d")
+        self.__is_int = array("b")
+        self.__dates = {field: array("q") for field in date_fields}
+        self.__extras = {}
+        self.__pending = {}
+        if documents is not None:
+            self.extend(documents)
+
+    @classmethod
+    def from_documents(cls, documents):
+        """
+        Build a batch from documents read from the database.
+
+        Args:
+            documents: Iterable of stored documents.
+
+        Returns:
+            TransactionBatch: The batch.
+        """
+        return cls(documents)
+
+    def append(self, document):
+        """
+        Add one transaction at the end of the batch.
+
+        Args:
+            document (dict or Transaction): The transaction to add.
+        """
+        texts, amount, is_int, dates, extras = self.__encode(document)
+        index = len(self.__amount)
+        for field in text_fields:
+            self.__text[field].append(texts[field])
+        self.__amount.append(amount)
+        self.__is_int.append(is_int)
+        for field in date_fields:
+            self.__dates[field].append(dates[field])
+        if extras:
+            self.__extras[index] = extras
+
+    def extend(self, documents):
+        """
+        Add transactions at the end of the batch.
+
+        Args:
+            documents: Iterable of documents or Transaction objects.
+        """
+        for document in documents:
+            self.append(document)
+
+    def document(self, index):
+        """
+        Read the stored values of one transaction.
+
+        Args:
+            index (int): The position of the transaction.
+
+        Returns:
+            dict: The fields of the transaction, dates as datetime.
+        """
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("TransactionBatch index out of range")
+        document = {}
+        for field in text_fields:
+            value = self.__text[field][index]
+            if value is not None:
+                document[field] = value
+        amount = self.__amount[index]
+        document["amount"] = int(amount) if self.__is_int[index] else amount
+        for field in date_fields:
+            document[field] = from_micros(self.__dates[field][index])
+        for key, value in self.__extras.get(index, {}).items():
+            if value is missing:
+                del document[key]
+            else:
+                document[key] = value
+        return document
+
+    def set(self, index, **values):
+        """
+        Change fields of one transaction. The change is written to the
+        database by update().
+
+        Args:
+            index (int): The position of the transaction.
+            **values: The fields to change.
+        """
+        if index < 0:
+            index += len(self)
+        transaction = self.__pending.get(index) or self[index]
+        for key, value in values.items():
+            setattr(transaction, key, value)
+        self.__replace(index, transaction)
+        self.__pending[index] = transaction
+
+    def to_dict(self):
+        """
+        Convert the transactions to dictionaries, like Transaction.to_dict
+        but without building the objects.
+
+        Returns:
+            list: The dictionary of every transaction, in order.
+        """
+        output = []
+        for index in range(len(self)):
+            to_dict = self.document(index)
+            to_dict["__class__"] = Transaction.__name__
+            for field in date_fields:
+                value = to_dict.get(field)
+                if isinstance(value, datetime):
+                    to_dict[field] = format_time(value)
+            output.append(to_dict)
+        return output
+
+    def save(self):
+        """
+        Insert every transaction of the batch into the database, with one
+        insert_many per chunk.
+
+        Returns:
+            list: For each transaction, None if it was inserted or the
+            error message of the database.
+        """
+        from models.ingest import chunk_size
+
+        errors = []
+        now = datetime.now(timezone.utc)
+        for start in range(0, len(self), chunk_size):
+            transactions = []
+            for index in range(start, min(start + chunk_size, len(self))):
+                self.__dates["updated_date"][index] = to_micros(now)
+                self.__extras.get(index, {}).pop("updated_date", None)
+                transactions.append(self[index])
+            errors.extend(models.storage.new_many(transactions))
+        self.__pending.clear()
+        return errors
+
+    def update(self):
+        """
+        Write the transactions changed with set() to the database.
+        """
+        for index, transaction in sorted(self.__pending.items()):
+            transaction.update()
+            self.__replace(index, transaction)
+        self.__pending.clear()
+
+    def __encode(self, document):
+        """
+        Split a transaction into the values of its columns.
+
+        Args:
+            document (dict or Transaction): The transaction.
+
+        Returns:
+            tuple: The text values, the amount, 1 if the amount is an
+            integer, the dates in microseconds and the values that do not
+            fit the columns.
+        """
+        if isinstance(document, Transaction):
+            document = {key: value for key, value in
+                        document.__dict__.items() if key not in hidden_fields}
+        texts = {}
+        extras = {}
+        for field in text_fields:
+            value = document.get(field, missing)
+            if isinstance(value, str):
+                if field in interned_fields:
+                    value = sys.intern(value)
+                texts[field] = value
+            elif value is missing:
+                texts[field] = None
+            else:
+                texts[field] = ""
+                extras[field] = value
+        amount = document.get("amount", missing)
+        is_int = 0
+        if type(amount) is int and abs(amount) <= max_exact_int:
+            amount, is_int = float(amount), 1
+        elif type(amount) is not float:
+            extras["amount"] = amount
+            amount = 0.0
+        dates = {}
+        for field in date_fields:
+            value = document.get(field, missing)
+            if isinstance(value, datetime):
+                dates[field] = to_micros(value)
+            else:
+                dates[field] = 0
+                extras[field] = value
+        for key, value in document.items():
+            if key not in text_fields and key not in date_fields and \
+                    key != "amount" and key != "__class__":
+                extras[key] = value
+        return texts, amount, is_int, dates, extras
+
+    def __replace(self, index, transaction):
+        """
+        Store the values of a transaction in place of a row.
+
+        Args:
+            index (int): The position of the row.
+            transaction (Transaction): The new values.
+        """
+        texts, amount, is_int, dates, extras = self.__encode(transaction)
+        for field in text_fields:
+            self.__text[field][index] = texts[field]
+        self.__amount[index] = amount
+        self.__is_int[index] = is_int
+        for field in date_fields:
+            self.__dates[field][index] = dates[field]
+        if extras:
+            self.__extras[index] = extras
+        else:
+            self.__extras.pop(index, None)
+
+    def __len__(self):
+        """
+        Return the number of transactions.
+        """
+        return len(self.__amount)
+
+    def __getitem__(self, index):
+        """
+        Build the Transaction object of one row.
+
+        Args:
+            index (int): The position of the transaction.
+
+        Returns:
+            Transaction: A clean transaction, changes to it are not stored
+            in the batch, use set() instead.
+        """
+        return Transaction.from_document(self.document(index))
+
+    def __iter__(self):
+        """
+        Iterate over the Transaction objects, one at a time.
+        """
+        for index in range(len(self)):
+            yield self[index]
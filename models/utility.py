@@ -6,8 +6,8 @@ This module contains utility functions used throughout the application.
 
 from datetime import datetime, timedelta
 from uuid import uuid4
-from models import storage
-import bcrypt
+from models.base_model import parse_time
+from models.hashing import check_password, hash_password
 import os
 
 not_found = {"error": "Data not found"}
@@ -16,23 +16,26 @@ internal_error = {"error": "Internal Error occurred"}
 
 def encrypt(value=None):
     """
-    Encrypt a given string value using bcrypt.
+    Encrypt a given string value using bcrypt, on the hashing worker pool.
     
     Args:
         value (str): The string to be encrypted.
     
     Returns:
         str: The encrypted string.
+
+    Raises:
+        PoolBusyError: If too many passwords are waiting to be hashed.
     """
     if value:
-        result = bcrypt.hashpw(value.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
-        return result
+        return hash_password(value)
     else:
-        return bcrypt.hashpw(b"None", bcrypt.gensalt()).decode("utf-8")
+        return hash_password("None")
 
 def decrypt(user_input=None, stored_hash=None):
     """
-    Check if the user input matches the stored hash.
+    Check if the user input matches the stored hash, on the hashing worker
+    pool.
     
     Args:
         user_input (str): The user-provided string.
@@ -40,40 +43,15 @@ def decrypt(user_input=None, stored_hash=None):
     
     Returns:
         bool: True if the user input matches the stored hash, False otherwise.
+
+    Raises:
+        PoolBusyError: If too many passwords are waiting to be checked.
     """
     if user_input and stored_hash:
-        return bcrypt.checkpw(user_input.encode("utf-8"), stored_hash.encode("utf-8"))
+        return check_password(user_input, stored_hash)
     else:
         return False
 
-def taken_value(cls, **kwargs):
-    """
-    Check if the provided values are already present in the stored objects.
-    
-    Args:
-        cls: The class to check the values against.
-        **kwargs: Arbitrary keyword arguments representing field names and values.
-    
-    Returns:
-        str: An error message if a value is already present, False otherwise.
-    """
-    obj = None
-    if kwargs.get("password"):
-        del kwargs["password"]
-    if kwargs:
-        for key, value in kwargs.items():
-            if key == "email":
-                obj = storage.filter(cls, key, value)
-                if obj:
-                    return f"{key} already present, change your {key}"
-            elif key == "username":
-                obj = storage.filter(cls, key, value)
-                if obj:
-                    return f"{key} already present, change your {key}"
-        return False
-    else:
-        return "No value passed"
-
 def is_user_valid(data: dict = None):
     """
     Check if the user data contains all required fields.
@@ -93,3 +71,32 @@ def is_user_valid(data: dict = None):
             return f"{md_field} is required"
     else:
         return False
+
+
+def is_transaction_valid(data=None, current=None):
+    """
+    Check if the transaction data has an amount and a type.
+
+    Args:
+        data (dict): The transaction data to validate.
+        current (dict, optional): The stored values the data updates, so
+                                  an update does not have to repeat them.
+
+    Returns:
+        str: An error message if the data is not valid, False otherwise.
+    """
+    if not isinstance(data, dict):
+        return "Transaction must be a JSON object"
+    data = {**(current or {}), **data}
+    amount = data.get("amount")
+    if isinstance(amount, bool) or not isinstance(amount, (int, float)):
+        return "Amount is required and must be a number"
+    if not data.get("type") or not isinstance(data["type"], str):
+        return "Type is required"
+    if "created_date" in data and \
+            not isinstance(data["created_date"], datetime):
+        try:
+            parse_time(data["created_date"])
+        except (TypeError, ValueError):
+            return "Created date must be like 2024-07-01T00:00:00.000000"
+    return False
@@ -0,0 +1,9 @@
+"""
+Tests of the WealthWise application. They run on the in-memory storage
+engine, so no database server is needed. Set WEALTHWISE_STORAGE=mongo
+or sqlite to run them on another engine.
+"""
+
+from os import environ
+
+environ.setdefault("WEALTHWISE_STORAGE", "memory")
@@ -1,14 +1,19 @@
 #!/usr/bin/python3
 """
-Contains the TestBaseModelDocs and TestBaseModel classes
+Contains the TestBaseModelDocs, TestBaseModel and TestBaseModelSQLite
+classes
 """
 
 from datetime import datetime, timezone
 import inspect
 import unittest
 import models
-from models.base_model import BaseModel
+from models.base_model import BaseModel, parse_time, time
+from models.engine.sqlite_storage import SQLiteStorage
+import os
 import pep8
+import shutil
+import tempfile
 from unittest import mock
 from uuid import UUID
 
@@ -128,9 +133,114 @@ class TestBaseModel(unittest.TestCase):
         self.assertEqual(base.updated_date.strftime("%Y-%m-%dT%H:%M:%S.%f"),
                          "2023-01-01T00:00:00.000000")
 
+    def test_parse_time_offset(self):
+        """Test that dates with an offset are read as naive UTC"""
+        self.assertEqual(parse_time("2024-07-31T23:30:00-02:00"),
+                         datetime(2024, 8, 1, 1, 30))
+        self.assertEqual(parse_time("2024-07-01T10:00:00+00:00"),
+                         datetime(2024, 7, 1, 10))
+        self.assertIsNone(parse_time("2024-07-01T10:00:00").tzinfo)
+
+    def test_datetime_kwargs_instantiation(self):
+        """Test that dates loaded as datetime objects are kept as they are"""
+        created = datetime(2023, 1, 1, 10, 30)
+        base = BaseModel(_id="1234", created_date=created,
+                         updated_date=created)
+        self.assertIs(base.created_date, created)
+        self.assertEqual(base.to_dict()["created_date"],
+                         "2023-01-01T10:30:00.000000")
+
+    def test_new_object_has_no_tracked_changes(self):
+        """Test that an object never stored is written whole"""
+        base = BaseModel()
+        self.assertIsNone(base.changes())
+        self.assertTrue(base.is_changed())
+
+    def test_loaded_object_tracks_changes(self):
+        """Test that a loaded object records set and deleted attributes"""
+        base = BaseModel(_id="1234", name="old", note="text")
+        self.assertEqual(base.changes(), (set(), set()))
+        self.assertFalse(base.is_changed())
+        base.name = "old"
+        self.assertFalse(base.is_changed())
+        base.name = "new"
+        del base.note
+        self.assertEqual(base.changes(), ({"name"}, {"note"}))
+        self.assertNotIn("_BaseModel__changed", base.to_dict())
+        base.mark_clean()
+        self.assertFalse(base.is_changed())
+
+    def test_from_document(self):
+        """Test that from_document loads a clean object"""
+        document = {"_id": "1234", "__class__": "BaseModel", "name": "a",
+                    "created_date": "2024-07-01T10:20:30.000001",
+                    "updated_date": datetime(2024, 7, 2)}
+        base = BaseModel.from_document(document)
+        self.assertEqual(base.created_date,
+                         datetime(2024, 7, 1, 10, 20, 30, 1))
+        self.assertEqual(base.updated_date, datetime(2024, 7, 2))
+        self.assertNotIn("__class__", base.__dict__)
+        self.assertFalse(base.is_changed())
+        base.name = "b"
+        self.assertEqual(base.changes(), ({"name"}, set()))
+        self.assertEqual(document["created_date"],
+                         "2024-07-01T10:20:30.000001")
+
+    def test_from_documents(self):
+        """Test that from_documents loads a batch in order"""
+        objs = BaseModel.from_documents(iter([{"_id": "1"}, {"_id": "2"}]))
+        self.assertEqual([obj._id for obj in objs], ["1", "2"])
+
+    def test_to_dict_date_format(self):
+        """Test that to_dict writes dates like strftime(time)"""
+        date = datetime(2024, 7, 1, 0, 0, 0, 0, tzinfo=timezone.utc)
+        base = BaseModel.from_document({"_id": "1", "created_date": date,
+                                        "updated_date": None})
+        self.assertEqual(base.to_dict()["created_date"],
+                         date.strftime(time))
+        self.assertIsNone(base.to_dict()["updated_date"])
+
+    def test_update_without_changes(self):
+        """Test that update does not call storage when nothing changed"""
+        base = BaseModel(_id="1234", name="old")
+        with mock.patch('models.storage.update') as mock_update:
+            base.update()
+            mock_update.assert_not_called()
+            base.name = "new"
+            base.update()
+            mock_update.assert_called_once_with(base)
+
     def test_delete(self):
         """Test that delete method calls storage.delete"""
         base = BaseModel()
         with mock.patch('models.storage.delete') as mock_delete:
             base.delete()
             mock_delete.assert_called_once_with(base)
+
+
+class TestBaseModelSQLite(TestBaseModel):
+    """Run the BaseModel tests on the SQLite storage engine"""
+
+    def setUp(self):
+        """Set up a new SQLite database as the storage"""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        storage = SQLiteStorage(os.path.join(directory, "test.db"))
+        self.addCleanup(storage.close)
+        patcher = mock.patch.object(models, "storage", storage)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_stored_without_table(self):
+        """Test that a class without a table is saved, updated and
+        deleted"""
+        base = BaseModel(name="old")
+        base.save()
+        models.storage.new(BaseModel())
+        base.name = "new"
+        base.update()
+        self.assertEqual(models.storage.filter(BaseModel, "name", "new")._id,
+                         base._id)
+        self.assertEqual(models.storage.taken(BaseModel, name="new"), "name")
+        base.delete()
+        self.assertIsNone(models.storage.filter(BaseModel, "name", "new"))
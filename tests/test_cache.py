@@ -0,0 +1,107 @@
+#!/usr/bin/python3
+"""
+Contains the TestLRUCacheDocs and TestLRUCache classes
+"""
+
+import inspect
+import pep8
+import unittest
+from unittest.mock import patch
+from models.engine.cache import LRUCache
+
+
+class TestLRUCacheDocs(unittest.TestCase):
+    """Tests to check the documentation and style of LRUCache class"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up for the doc tests"""
+        cls.cache_f = inspect.getmembers(LRUCache, inspect.isfunction)
+
+    def test_pep8_conformance_cache(self):
+        """Test that models/engine/cache.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/cache.py',
+                                    'tests/test_cache.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_cache_func_docstrings(self):
+        """Test for the presence of docstrings in LRUCache methods"""
+        for func in self.cache_f:
+            self.assertIsNot(func[1].__doc__, None,
+                             "{:s} method needs a docstring".format(func[0]))
+
+
+class TestLRUCache(unittest.TestCase):
+    """Test the LRUCache class"""
+
+    def test_hits_and_misses(self):
+        """Test that lookups are counted"""
+        cache = LRUCache(maxsize=2)
+        self.assertIsNone(cache.get("a"))
+        cache.set("a", 1)
+        self.assertEqual(cache.get("a"), 1)
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+
+    def test_least_recently_used_is_evicted(self):
+        """Test that the size stays bounded"""
+        cache = LRUCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_expiry(self):
+        """Test that entries expire after ttl seconds"""
+        cache = LRUCache(ttl=10)
+        with patch('models.engine.cache.monotonic', return_value=100):
+            cache.set("a", 1)
+        with patch('models.engine.cache.monotonic', return_value=109):
+            self.assertEqual(cache.get("a"), 1)
+        with patch('models.engine.cache.monotonic', return_value=110):
+            self.assertIsNone(cache.get("a"))
+        self.assertEqual(len(cache), 0)
+
+    def test_invalidate_tag(self):
+        """Test that every entry of a tag is dropped"""
+        cache = LRUCache()
+        cache.set(("user1", None), 1, tag="user1")
+        cache.set(("user1", ("email",)), 2, tag="user1")
+        cache.set(("user2", None), 3, tag="user2")
+        cache.invalidate("user1")
+        self.assertIsNone(cache.get(("user1", None)))
+        self.assertIsNone(cache.get(("user1", ("email",))))
+        self.assertEqual(cache.get(("user2", None)), 3)
+
+    def test_stale_fill_is_skipped(self):
+        """Test that a value read before an invalidation is not stored"""
+        cache = LRUCache(maxsize=2)
+        generation = cache.generation()
+        cache.invalidate("user1")
+        cache.set("a", "old", tag="user1", generation=generation)
+        self.assertIsNone(cache.get("a"))
+        cache.set("b", 2, tag="user2", generation=generation)
+        self.assertEqual(cache.get("b"), 2)
+        generation = cache.generation()
+        cache.set("a", "new", tag="user1", generation=generation)
+        self.assertEqual(cache.get("a"), "new")
+        for tag in ("user3", "user4", "user5"):
+            cache.invalidate(tag)
+        cache.set("c", 3, tag="user1", generation=generation)
+        self.assertIsNone(cache.get("c"))
+
+    def test_disabled(self):
+        """Test that a cache of size 0 stores nothing"""
+        cache = LRUCache(maxsize=0)
+        cache.set("a", 1)
+        self.assertIsNone(cache.get("a"))
+
+
+if __name__ == "__main__":
+    unittest.main()
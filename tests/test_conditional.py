@@ -0,0 +1,155 @@
+#!/usr/bin/python3
+"""
+Contains the TestConditionalDocs and TestConditional classes
+"""
+
+from api.v1 import conditional
+from api.v1.conditional import add_etag, check_etag, user_version
+from flask import Blueprint, Flask, jsonify
+from flask_jwt_extended import (JWTManager, create_access_token,
+                                jwt_required)
+import inspect
+import pep8
+import unittest
+from unittest.mock import MagicMock, patch
+
+
+class TestConditionalDocs(unittest.TestCase):
+    """Tests to check the documentation and style of conditional"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up for the doc tests"""
+        cls.conditional_f = inspect.getmembers(conditional,
+                                               inspect.isfunction)
+
+    def test_pep8_conformance_conditional(self):
+        """Test that api/v1/conditional.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['api/v1/conditional.py',
+                                    'tests/test_conditional.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_conditional_module_docstring(self):
+        """Test for the conditional.py module docstring"""
+        self.assertIsNot(conditional.__doc__, None,
+                         "conditional.py needs a docstring")
+
+    def test_conditional_func_docstrings(self):
+        """Test for the presence of docstrings in conditional functions"""
+        for func in self.conditional_f:
+            self.assertIsNot(func[1].__doc__, None,
+                             "{:s} function needs a docstring".format(func[0]))
+
+
+class TestConditional(unittest.TestCase):
+    """Test the ETag and If-None-Match handling"""
+
+    def setUp(self):
+        """Set up an application with a conditional endpoint"""
+        self.app = Flask(__name__)
+        self.app.config["JWT_SECRET_KEY"] = "s" * 32
+        JWTManager(self.app)
+        views = Blueprint("app_views", __name__)
+        self.calls = 0
+
+        @views.route("/user", methods=["GET", "PUT"])
+        @jwt_required()
+        def get_user():
+            """Return a profile and count the calls"""
+            self.calls += 1
+            return jsonify({"calls": self.calls})
+
+        @views.route("/other")
+        @jwt_required()
+        def other():
+            """Return a response without ETag"""
+            return jsonify({})
+
+        views.before_request(check_etag)
+        views.after_request(add_etag)
+        self.app.register_blueprint(views)
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            self.headers = {"Authorization": "Bearer " +
+                            create_access_token(identity="user1")}
+        self.storage = MagicMock()
+        self.storage.version.return_value = 3
+        patcher = patch.object(conditional, "storage", self.storage)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_etag_and_cache_control(self):
+        """Test that a conditional GET answers with an ETag"""
+        response = self.client.get("/user", headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        etag, weak = response.get_etag()
+        self.assertFalse(weak)
+        self.assertTrue(etag.startswith("3-"))
+        self.assertTrue(response.cache_control.private)
+        self.assertTrue(response.cache_control.no_cache)
+        self.assertIn("Authorization", response.headers["Vary"])
+        self.storage.version.assert_called_once_with("user1")
+
+    def test_not_modified(self):
+        """Test that a matching If-None-Match skips the view"""
+        etag = self.client.get("/user", headers=self.headers).get_etag()[0]
+        response = self.client.get(
+            "/user", headers={**self.headers, "If-None-Match": f'"{etag}"'})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b"")
+        self.assertEqual(response.get_etag()[0], etag)
+        self.assertEqual(self.calls, 1)
+
+    def test_changed_version(self):
+        """Test that a new version sends the response again"""
+        etag = self.client.get("/user", headers=self.headers).get_etag()[0]
+        self.storage.version.return_value = 4
+        response = self.client.get(
+            "/user", headers={**self.headers, "If-None-Match": f'"{etag}"'})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.get_etag()[0], etag)
+
+    def test_etag_depends_on_request(self):
+        """Test that the ETag changes with the URL, format and user"""
+        etag = self.client.get("/user", headers=self.headers).get_etag()[0]
+        response = self.client.get("/user?page=2", headers=self.headers)
+        self.assertNotEqual(response.get_etag()[0], etag)
+        with self.app.app_context():
+            headers = {"Authorization": "Bearer " +
+                       create_access_token(identity="user2")}
+        response = self.client.get(
+            "/user", headers={**headers, "If-None-Match": f'"{etag}"'})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.get_etag()[0], etag)
+
+    def test_not_conditional(self):
+        """Test that other methods, endpoints and anonymous calls have no
+        ETag, and do not read the version"""
+        response = self.client.put("/user", headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("ETag", response.headers)
+        response = self.client.get("/other", headers=self.headers)
+        self.assertNotIn("ETag", response.headers)
+        response = self.client.get("/user", headers={"If-None-Match": "*"})
+        self.assertEqual(response.status_code, 401)
+        response = self.client.get(
+            "/user", headers={"Authorization": "Bearer bad"})
+        self.assertEqual(response.status_code, 422)
+        self.storage.version.assert_not_called()
+
+    def test_user_version_read_once(self):
+        """Test that the version is read once per request"""
+        with self.app.test_request_context("/user"):
+            self.assertEqual(user_version("user1"), 3)
+            self.assertEqual(user_version("user1"), 3)
+            self.assertEqual(user_version("user2"), 3)
+        self.assertEqual(self.storage.version.call_count, 2)
+        with self.app.test_request_context("/user"):
+            user_version("user1")
+        self.assertEqual(self.storage.version.call_count, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,14 +3,22 @@
 Contains the TestDBStorageDocs and TestDBStorage classes
 """
 
+from datetime import datetime
 import inspect
+import os
 import pep8
 import unittest
 from unittest.mock import patch, MagicMock
 from models.base_model import BaseModel
 from models.user import User
 from models.transaction import Transaction
-from models.engine.db_storage import DBStorage
+from models.transaction_batch import TransactionBatch
+from models.engine.db_storage import DBStorage, pool_options, month_range
+from models.engine.db_storage import date_string, lean_projection
+from models.engine.errors import DuplicateValueError
+from models.engine.rollups import rollup_key
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
 
 
 class TestDBStorageDocs(unittest.TestCase):
@@ -87,6 +95,106 @@ class TestDBStorage(unittest.TestCase):
             self.storage.new(user)
             mock_collection.insert_one.assert_called_once()
 
+    def test_new_duplicate(self):
+        """Test that a unique index violation names the taken field"""
+        user = User(username="ann", email="ann@example.com")
+        collection = MagicMock()
+        collection.insert_one.side_effect = DuplicateKeyError(
+            "E11000", 11000, {"keyValue": {"email": "ann@example.com"}})
+        with patch.object(self.storage, 'get_collection',
+                          return_value=collection):
+            with self.assertRaises(DuplicateValueError) as context:
+                self.storage.new(user)
+        self.assertEqual(context.exception.field, "email")
+        self.assertEqual(str(context.exception),
+                         "email already present, change your email")
+        collection.find_one.assert_not_called()
+
+    def test_new_duplicate_without_details(self):
+        """Test that the taken field is looked up when the server does
+        not name it"""
+        user = User(username="ann", email="ann@example.com")
+        collection = MagicMock()
+        collection.insert_one.side_effect = DuplicateKeyError("E11000")
+        collection.find_one.return_value = {"_id": "other",
+                                            "username": "ann"}
+        with patch.object(self.storage, 'get_collection',
+                          return_value=collection):
+            with self.assertRaises(DuplicateValueError) as context:
+                self.storage.new(user)
+        self.assertEqual(context.exception.field, "username")
+        query = collection.find_one.call_args[0][0]
+        self.assertEqual(query["_id"], {"$ne": user._id})
+
+    def test_update_duplicate(self):
+        """Test that an update taking another user's username raises"""
+        user = User.from_document({"_id": "1", "username": "ann"})
+        user.username = "bob"
+        collection = MagicMock()
+        collection.update_one.side_effect = DuplicateKeyError(
+            "E11000 duplicate key error collection: wealthwise.users "
+            "index: username_unique dup key: { username: \"bob\" }")
+        with patch.object(self.storage, 'get_collection',
+                          return_value=collection):
+            with self.assertRaises(DuplicateValueError) as context:
+                self.storage.update(user)
+        self.assertEqual(context.exception.field, "username")
+
+    def test_taken(self):
+        """Test that taken looks every value up with one $or query"""
+        collection = MagicMock()
+        collection.find_one.return_value = {"_id": "1", "username": "ann",
+                                            "email": "ann@example.com"}
+        with patch.object(self.storage, 'get_collection',
+                          return_value=collection):
+            key = self.storage.taken(User, email="ann@example.com",
+                                     username="ann")
+            collection.find_one.return_value = None
+            none = self.storage.taken(User, username="bob")
+        self.assertEqual(key, "email")
+        self.assertIsNone(none)
+        self.assertEqual(collection.find_one.call_count, 2)
+        query, fields = collection.find_one.call_args_list[0][0]
+        self.assertEqual(query, {"$or": [{"email": "ann@example.com"},
+                                         {"username": "ann"}]})
+        self.assertEqual(fields, {"email": 1, "username": 1, "_id": 1})
+
+    def test_to_document_keeps_dates(self):
+        """Test that dates are stored as datetime objects"""
+        user = User(password="hash")
+        data = self.storage.to_document(user)
+        self.assertIsInstance(data["created_date"], datetime)
+        self.assertIsInstance(data["updated_date"], datetime)
+        self.assertEqual(data["password"], "hash")
+        self.assertNotIn("__class__", data)
+
+    def test_month_range(self):
+        """Test that year and month filters become date ranges"""
+        self.assertEqual(month_range(2024, 5),
+                         {"$gte": datetime(2024, 5, 1),
+                          "$lt": datetime(2024, 6, 1)})
+        self.assertEqual(month_range("2024", "12"),
+                         {"$gte": datetime(2024, 12, 1),
+                          "$lt": datetime(2025, 1, 1)})
+        self.assertEqual(month_range(2024),
+                         {"$gte": datetime(2024, 1, 1),
+                          "$lt": datetime(2025, 1, 1)})
+
+    def test_new_many(self):
+        """Test that new_many inserts every object with one call"""
+        txns = [Transaction(user_id="user1", amount=2, type="expense")
+                for _ in range(3)]
+        with patch.object(self.storage, 'get_collection') as\
+                mock_get_collection:
+            mock_collection = MagicMock()
+            mock_get_collection.return_value = mock_collection
+            self.assertEqual(self.storage.new_many(txns), [None] * 3)
+            mock_collection.insert_many.assert_called_once()
+            operations = mock_collection.bulk_write.call_args_list[0][0][0]
+            self.assertEqual(operations, [UpdateOne(
+                rollup_key(txns[0].to_dict()),
+                {"$inc": {"total_amount": 6, "count": 3}}, upsert=True)])
+
     @patch('models.engine.db_storage.MongoClient')
     def test_update(self, mock_mongo_client):
         """Test that update method modifies an existing object in
@@ -99,6 +207,49 @@ class TestDBStorage(unittest.TestCase):
             self.storage.update(user)
             mock_collection.update_one.assert_called_once()
 
+    def test_update_sends_changed_fields(self):
+        """Test that update only sends the changed attributes"""
+        user = User(_id="user1", first_name="John", last_name="Doe",
+                    password="hash")
+        user.first_name = "Jane"
+        del user.last_name
+        with patch.object(self.storage, 'get_collection') as\
+                mock_get_collection:
+            mock_collection = MagicMock()
+            mock_get_collection.return_value = mock_collection
+            self.storage.update(user)
+            mock_collection.update_one.assert_called_once_with(
+                {"_id": "user1"}, {"$inc": {"version": 1},
+                                   "$set": {"first_name": "Jane"},
+                                   "$unset": {"last_name": ""}})
+            self.storage.update(user)
+            mock_collection.update_one.assert_called_once()
+
+    def test_array_operations(self):
+        """Test that array fields are changed with atomic operators"""
+        user = User(transactions=["txn1"])
+        with patch.object(self.storage, 'get_collection') as\
+                mock_get_collection:
+            mock_collection = MagicMock()
+            mock_get_collection.return_value = mock_collection
+            self.storage.push(user, "transactions", "txn2")
+            mock_collection.update_one.assert_called_with(
+                {"_id": user._id},
+                {"$push": {"transactions": {"$each": ["txn2"]}},
+                 "$inc": {"version": 1}})
+            self.storage.add_to_set(user, "transactions", "txn2", "txn3")
+            mock_collection.update_one.assert_called_with(
+                {"_id": user._id},
+                {"$addToSet": {"transactions": {"$each": ["txn2", "txn3"]}},
+                 "$inc": {"version": 1}})
+            self.storage.pull(user, "transactions", "txn1")
+            mock_collection.update_one.assert_called_with(
+                {"_id": user._id},
+                {"$pull": {"transactions": {"$in": ["txn1"]}},
+                 "$inc": {"version": 1}})
+            self.assertEqual(user.transactions, ["txn2", "txn3"])
+            self.assertEqual(User.transactions, [])
+
     @patch('models.engine.db_storage.MongoClient')
     def test_delete(self, mock_mongo_client):
         """Test that delete method removes an object from the database"""
@@ -122,6 +273,157 @@ class TestDBStorage(unittest.TestCase):
             result = self.storage.get(User, user._id)
             self.assertIsInstance(result, User)
 
+    def test_get_with_fields(self):
+        """Test that get only loads the requested fields"""
+        with patch.object(self.storage, 'get_collection') as\
+                mock_get_collection:
+            mock_collection = MagicMock()
+            mock_get_collection.return_value = mock_collection
+            mock_collection.find_one.return_value = {"_id": "user1",
+                                                     "first_name": "John"}
+            result = self.storage.get(User, "user1", ["first_name"])
+            mock_collection.find_one.assert_called_once_with(
+                {"_id": "user1"}, {"first_name": 1, "_id": 1})
+            self.assertEqual(result.to_dict()["first_name"], "John")
+            self.assertNotIn("transactions", result.to_dict())
+            self.storage.filter(User, "username", "john", [])
+            mock_collection.find_one.assert_called_with(
+                {"username": "john"}, {"_id": 1})
+
+    def test_get_owned(self):
+        """Test that get_owned puts the owner in the query"""
+        with patch.object(self.storage, 'get_collection') as\
+                mock_get_collection:
+            mock_collection = MagicMock()
+            mock_get_collection.return_value = mock_collection
+            mock_collection.find_one.return_value = {"_id": "t1",
+                                                     "user_id": "user1",
+                                                     "amount": 5.0}
+            result = self.storage.get_owned(Transaction, "t1", "user1")
+            mock_collection.find_one.assert_called_once_with(
+                {"_id": "t1", "user_id": "user1"}, None)
+            self.assertIsInstance(result, Transaction)
+            self.assertEqual(result.amount, 5.0)
+            mock_collection.find_one.return_value = None
+            self.assertIsNone(self.storage.get_owned(Transaction, "t1",
+                                                     "user2", ["amount"]))
+            mock_collection.find_one.assert_called_with(
+                {"_id": "t1", "user_id": "user2"}, {"amount": 1, "_id": 1})
+            self.assertIsNone(self.storage.get_owned(Transaction, None,
+                                                     "user1"))
+            self.assertEqual(mock_collection.find_one.call_count, 2)
+
+    def test_get_user_is_cached(self):
+        """Test that users are read through the cache"""
+        self.storage.user_cache.clear()
+        with patch.object(self.storage, 'get_collection') as\
+                mock_get_collection:
+            mock_collection = MagicMock()
+            mock_get_collection.return_value = mock_collection
+            mock_collection.find_one.return_value = {"_id": "user1",
+                                                     "transactions": []}
+            first = self.storage.get(User, "user1", ["transactions"])
+            second = self.storage.get(User, "user1", ["transactions"])
+            mock_collection.find_one.assert_called_once()
+            self.assertIsNot(first.transactions, second.transactions)
+            self.storage.invalidate(second)
+            self.storage.get(User, "user1", ["transactions"])
+            self.assertEqual(mock_collection.find_one.call_count, 2)
+        self.storage.user_cache.clear()
+
+    def test_get_user_skips_stale_fill(self):
+        """Test that a user read before an invalidation is not cached"""
+        self.storage.user_cache.clear()
+        with patch.object(self.storage, 'get_collection') as\
+                mock_get_collection:
+            mock_collection = MagicMock()
+            mock_get_collection.return_value = mock_collection
+
+            def find_one(query, projection):
+                """Return the old user while another update runs"""
+                self.storage.user_cache.invalidate("user1")
+                return {"_id": "user1", "first_name": "Old"}
+
+            mock_collection.find_one.side_effect = find_one
+            self.storage.get(User, "user1", ["first_name"])
+            self.storage.get(User, "user1", ["first_name"])
+            self.assertEqual(mock_collection.find_one.call_count, 2)
+        self.storage.user_cache.clear()
+
+    def test_version(self):
+        """Test that version reads the counter and drops stale users"""
+        self.storage.user_cache.clear()
+        with patch.object(self.storage, 'get_collection') as\
+                mock_get_collection:
+            mock_collection = MagicMock()
+            mock_get_collection.return_value = mock_collection
+            mock_collection.find_one.return_value = {"_id": "user1",
+                                                     "version": 2}
+            self.storage.get(User, "user1", ["transactions"])
+            self.assertEqual(self.storage.version("user1"), 2)
+            mock_collection.find_one.assert_called_with(
+                {"_id": "user1"}, {"version": 1})
+            self.storage.get(User, "user1", ["transactions"])
+            self.assertEqual(mock_collection.find_one.call_count, 3)
+            self.assertEqual(self.storage.version("user1"), 2)
+            self.storage.get(User, "user1", ["transactions"])
+            self.assertEqual(mock_collection.find_one.call_count, 4)
+            mock_collection.find_one.return_value = None
+            self.assertEqual(self.storage.version("user2"), 0)
+            self.assertEqual(self.storage.version(None), 0)
+            self.assertEqual(mock_collection.find_one.call_count, 5)
+        self.storage.user_cache.clear()
+
+    def test_transactions_bump_version(self):
+        """Test that storing transactions pushes their ids onto the owners
+        and raises their versions in the same update"""
+        collections = {"users": MagicMock()}
+        users = collections["users"]
+        with patch.object(self.storage, 'get_collection',
+                          side_effect=lambda name: collections.setdefault(
+                              name, MagicMock())):
+            txn = Transaction(user_id="user1", amount=1)
+            self.storage.new(txn)
+            users.bulk_write.assert_called_once_with([UpdateOne(
+                {"_id": "user1"},
+                {"$push": {"transactions": {"$each": [txn._id]}},
+                 "$inc": {"version": 1}})], ordered=False)
+            users.bulk_write.reset_mock()
+            txns = [Transaction(user_id=user_id, amount=1)
+                    for user_id in ("user1", "user2", "user1")]
+            self.storage.new_many(txns)
+            users.bulk_write.assert_called_once()
+            self.assertEqual(users.bulk_write.call_args[0][0], [
+                UpdateOne({"_id": "user1"},
+                          {"$push": {"transactions": {
+                              "$each": [txns[0]._id, txns[2]._id]}},
+                           "$inc": {"version": 1}}),
+                UpdateOne({"_id": "user2"},
+                          {"$push": {"transactions": {
+                              "$each": [txns[1]._id]}},
+                           "$inc": {"version": 1}})])
+            users.update_one.assert_not_called()
+            users.update_many.assert_not_called()
+
+    def test_transactions_bump_version_not_embedded(self):
+        """Test that the versions are raised alone when the ids are not
+        embedded"""
+        self.storage.embed_transaction_ids = False
+        with patch.object(self.storage, 'get_collection') as\
+                mock_get_collection:
+            mock_collection = MagicMock()
+            mock_get_collection.return_value = mock_collection
+            self.storage.new(Transaction(user_id="user1", amount=1))
+            mock_collection.update_one.assert_called_once_with(
+                {"_id": "user1"}, {"$inc": {"version": 1}})
+            self.storage.new_many([Transaction(user_id=user_id, amount=1)
+                                   for user_id in ("user1", "user2",
+                                                   "user1")])
+            call = mock_collection.update_many.call_args[0]
+            self.assertEqual(sorted(call[0]["_id"]["$in"]),
+                             ["user1", "user2"])
+            self.assertEqual(call[1], {"$inc": {"version": 1}})
+
     @patch('models.engine.db_storage.MongoClient')
     def test_filter(self, mock_mongo_client):
         """Test that filter method retrieves an object by class
@@ -143,14 +445,57 @@ class TestDBStorage(unittest.TestCase):
                 mock_get_collection:
             mock_collection = MagicMock()
             mock_get_collection.return_value = mock_collection
-            mock_collection.aggregate.return_value = [{
-                "summery": [{"_id": "income", "total_amount": 1000}],
-                "transactions": [Transaction().to_dict()],
-                "total_count": [{"total_documents": 1}]
-            }]
+            mock_collection.find.return_value = [
+                {"type": "income", "total_amount": 1000, "count": 1},
+                {"type": "income", "total_amount": 500, "count": 2}
+            ]
+            mock_collection.aggregate.return_value = iter([
+                Transaction().to_dict()])
             result = self.storage.search(user, 2023, 8, 1, 10)
             self.assertIn("transactions", result)
             self.assertIn("summery", result)
+            self.assertEqual(result["summery"], {"income": 1500})
+            self.assertEqual(result["total_documents"], 3)
+            self.assertEqual(len(result["transactions"]), 1)
+            query = mock_collection.find.call_args_list[0][0][0]
+            self.assertEqual(query, {"user_id": user._id, "year": 2023,
+                                     "month": 8})
+            pipeline = mock_collection.aggregate.call_args[0][0]
+            self.assertEqual(pipeline[2:], [{"$limit": 10},
+                                            {"$project": lean_projection}])
+
+    def test_new_transaction_updates_rollup(self):
+        """Test that inserting a transaction increments its rollup"""
+        txn = Transaction(user_id="user1", amount=10.5, type="expense")
+        with patch.object(self.storage, 'get_collection') as\
+                mock_get_collection:
+            mock_collection = MagicMock()
+            mock_get_collection.return_value = mock_collection
+            self.storage.new(txn)
+            mock_get_collection.assert_any_call("monthly_rollups")
+            operations = mock_collection.bulk_write.call_args_list[0][0][0]
+            self.assertEqual(operations, [UpdateOne(
+                rollup_key(txn.to_dict()),
+                {"$inc": {"total_amount": 10.5, "count": 1}}, upsert=True)])
+
+    def test_update_transaction_moves_rollup(self):
+        """Test that updating a transaction moves its amount"""
+        txn = Transaction(user_id="user1", amount=20, type="expense")
+        with patch.object(self.storage, 'get_collection') as\
+                mock_get_collection:
+            mock_collection = MagicMock()
+            mock_get_collection.return_value = mock_collection
+            mock_collection.find_one_and_update.return_value = {
+                "user_id": "user1", "amount": 5, "type": "expense",
+                "created_date": txn.created_date}
+            self.storage.update(txn)
+            operations = mock_collection.bulk_write.call_args[0][0]
+            key = rollup_key(txn.to_dict())
+            self.assertEqual(operations, [
+                UpdateOne(key, {"$inc": {"total_amount": -5, "count": -1}},
+                          upsert=True),
+                UpdateOne(key, {"$inc": {"total_amount": 20, "count": 1}},
+                          upsert=True)])
 
     @patch('models.engine.db_storage.MongoClient')
     def test_filter_all(self, mock_mongo_client):
@@ -159,13 +504,88 @@ class TestDBStorage(unittest.TestCase):
         with patch.object(self.storage, 'get_collection') as mock_get_collection:
             mock_collection = MagicMock()
             mock_get_collection.return_value = mock_collection
-            mock_collection.aggregate.return_value = [{
-                "summery": [{"_id": "expense", "total_amount": 500}],
-                "transactions": [Transaction().to_dict()],
-                "total_count": [{"total_documents": 1}]
-            }]
-            result = self.storage.filter_all(user, 1, 10)
+            mock_collection.count_documents.return_value = 21
+            mock_collection.aggregate.return_value = [
+                Transaction().to_dict()]
+            result = self.storage.filter_all(user, 3, 10)
             self.assertIn("transactions", result)
+            self.assertEqual(result["total_pages"], 3)
+            mock_collection.count_documents.assert_called_once_with(
+                {"user_id": user._id})
+            pipeline = mock_collection.aggregate.call_args[0][0]
+            self.assertEqual(pipeline[:4], [
+                {"$match": {"user_id": user._id}},
+                {"$sort": {"created_date": -1, "_id": -1}},
+                {"$skip": 20}, {"$limit": 10}])
+            mock_collection.count_documents.return_value = 0
+            self.assertEqual(self.storage.filter_all(user, 1, 10), {})
+            mock_collection.aggregate.assert_called_once()
+
+    def test_filter_all_cursor(self):
+        """Test that a cursor switches filter_all to keyset pagination"""
+        user = User()
+        documents = [Transaction(user_id=user._id) for _ in range(3)]
+        with patch.object(self.storage, 'get_collection') as\
+                mock_get_collection:
+            mock_collection = MagicMock()
+            mock_get_collection.return_value = mock_collection
+            mock_collection.aggregate.return_value = [
+                txn.to_dict() for txn in documents]
+            result = self.storage.filter_all(user, 1, 2, "")
+            pipeline = mock_collection.aggregate.call_args[0][0]
+            self.assertIn({"$limit": 3}, pipeline)
+            self.assertEqual(len(result["transactions"]), 2)
+            self.assertIsNotNone(result["next_cursor"])
+            self.storage.filter_all(user, 1, 2, result["next_cursor"])
+            query = mock_collection.aggregate.call_args[0][0][0]["$match"]
+            self.assertEqual(query["user_id"], user._id)
+            self.assertIn("$or", query)
+
+    def test_iter_transactions(self):
+        """Test that iter_transactions reads lazily from a cursor"""
+        user = User()
+        documents = [Transaction(user_id=user._id).to_dict()
+                     for _ in range(3)]
+        with patch.object(self.storage, 'get_collection') as\
+                mock_get_collection:
+            mock_collection = MagicMock()
+            mock_get_collection.return_value = mock_collection
+            cursor = mock_collection.aggregate.return_value
+            cursor.__enter__.return_value = iter(documents)
+            rows = self.storage.iter_transactions(user, 2)
+            mock_collection.aggregate.assert_not_called()
+            self.assertEqual(list(rows), documents)
+            pipeline = mock_collection.aggregate.call_args[0][0]
+            self.assertEqual(pipeline[0], {"$match": {"user_id": user._id}})
+            self.assertEqual(pipeline[-1], {"$project": lean_projection})
+            self.assertEqual(mock_collection.aggregate.call_args[1],
+                             {"batchSize": 2})
+
+    def test_date_string(self):
+        """Test that lean pages write dates like to_dict"""
+        expression = date_string("created_date")
+        self.assertEqual(expression["$cond"][1]["$dateToString"], {
+            "format": "%Y-%m-%dT%H:%M:%S.%L000", "date": "$created_date"})
+        self.assertEqual(expression["$cond"][2], "$created_date")
+        self.assertEqual(lean_projection["__class__"],
+                         {"$literal": "Transaction"})
+
+    def test_load_transactions(self):
+        """Test that load_transactions fills a TransactionBatch"""
+        user = User()
+        documents = [{"_id": str(index), "amount": 1.0, "type": "expense"}
+                     for index in range(3)]
+        with patch.object(self.storage, 'get_collection') as\
+                mock_get_collection:
+            mock_collection = MagicMock()
+            mock_get_collection.return_value = mock_collection
+            batch = mock_collection.find.return_value.sort.return_value\
+                .batch_size
+            batch.return_value.__enter__.return_value = iter(documents)
+            transactions = self.storage.load_transactions(user)
+            self.assertIsInstance(transactions, TransactionBatch)
+            self.assertEqual([txn._id for txn in transactions],
+                             ["0", "1", "2"])
 
     @patch('models.engine.db_storage.MongoClient')
     def test_close(self, mock_mongo_client):
@@ -173,3 +593,60 @@ class TestDBStorage(unittest.TestCase):
         self.storage.close()
         mock_mongo_client().close.assert_called_once()
 
+    @patch.dict(os.environ, {"MONGO_MAX_POOL_SIZE": "50",
+                             "MONGO_WAIT_QUEUE_TIMEOUT_MS": "2000"})
+    def test_pool_options(self):
+        """Test that pool options are read from the environment"""
+        options = pool_options()
+        self.assertEqual(options["maxPoolSize"], 50)
+        self.assertEqual(options["waitQueueTimeoutMS"], 2000)
+        self.assertNotIn("minPoolSize", options)
+
+    def test_client_is_shared(self):
+        """Test that every DBStorage instance reuses the process client"""
+        with patch('models.engine.db_storage.MongoClient') as\
+                mock_mongo_client:
+            DBStorage().connect()
+            self.storage.reload()
+            mock_mongo_client.assert_not_called()
+
+    def test_request_mode_holds_client(self):
+        """Test that in request mode only the last close() closes the
+        client"""
+        client = DBStorage._DBStorage__client
+        database = DBStorage._DBStorage__db
+        pid = DBStorage._DBStorage__pid
+        mock_client = MagicMock()
+        try:
+            DBStorage._DBStorage__client = mock_client
+            DBStorage._DBStorage__pid = os.getpid()
+            self.storage.pooled = False
+            self.storage.reload()
+            self.storage.reload()
+            self.storage.close()
+            mock_client.close.assert_not_called()
+            self.storage.close()
+            mock_client.close.assert_called_once_with()
+            self.assertIsNone(DBStorage._DBStorage__client)
+        finally:
+            DBStorage._DBStorage__client = client
+            DBStorage._DBStorage__db = database
+            DBStorage._DBStorage__pid = pid
+            DBStorage._DBStorage__holders = 0
+
+    def test_after_fork(self):
+        """Test that a forked process creates its own client"""
+        client = DBStorage._DBStorage__client
+        database = DBStorage._DBStorage__db
+        pid = DBStorage._DBStorage__pid
+        try:
+            DBStorage.after_fork()
+            with patch('models.engine.db_storage.MongoClient') as\
+                    mock_mongo_client:
+                self.storage.get_collection('users')
+                self.storage.get_collection('transactions')
+                mock_mongo_client.assert_called_once()
+        finally:
+            DBStorage._DBStorage__client = client
+            DBStorage._DBStorage__db = database
+            DBStorage._DBStorage__pid = pid
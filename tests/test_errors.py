@@ -0,0 +1,76 @@
+#!/usr/bin/python3
+"""
+Contains the TestErrorsDocs and TestErrors classes
+"""
+
+import inspect
+from models.engine import errors
+from models.engine.errors import DuplicateValueError, duplicate_field
+import pep8
+from pymongo.errors import DuplicateKeyError
+import unittest
+
+fields = {"username_unique": "username", "email_unique": "email"}
+
+
+class TestErrorsDocs(unittest.TestCase):
+    """Tests to check the documentation and style of errors module"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up for the doc tests"""
+        cls.errors_f = inspect.getmembers(errors, inspect.isfunction)
+
+    def test_pep8_conformance_errors(self):
+        """Test that models/engine/errors.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/errors.py',
+                                    'tests/test_errors.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_errors_module_docstring(self):
+        """Test for the errors.py module docstring"""
+        self.assertIsNot(errors.__doc__, None,
+                         "errors.py needs a docstring")
+
+    def test_errors_func_docstrings(self):
+        """Test for the presence of docstrings in errors functions"""
+        for func in self.errors_f:
+            self.assertIsNot(func[1].__doc__, None,
+                             "{:s} function needs a docstring".format(func[0]))
+
+
+class TestErrors(unittest.TestCase):
+    """Test the storage errors"""
+
+    def test_duplicate_value_message(self):
+        """Test that the message names the taken field"""
+        error = DuplicateValueError("username")
+        self.assertIsInstance(error, ValueError)
+        self.assertEqual(error.field, "username")
+        self.assertEqual(str(error),
+                         "username already present, change your username")
+        self.assertIsNone(DuplicateValueError().field)
+
+    def test_duplicate_field_from_details(self):
+        """Test that the key in the error details is used first"""
+        error = DuplicateKeyError("E11000", 11000,
+                                  {"keyPattern": {"email": 1}})
+        self.assertEqual(duplicate_field(error, fields), "email")
+
+    def test_duplicate_field_from_index_name(self):
+        """Test that the index named in the message gives the field"""
+        error = DuplicateKeyError(
+            "E11000 duplicate key error collection: wealthwise.users "
+            "index: username_unique dup key: { username: \"ann\" }", 11000)
+        self.assertEqual(duplicate_field(error, fields), "username")
+
+    def test_duplicate_field_unknown(self):
+        """Test that None is returned when the error does not say"""
+        error = DuplicateKeyError("E11000 Duplicate Key Error", 11000)
+        self.assertIsNone(duplicate_field(error, fields))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+#!/usr/bin/python3
+"""
+Contains the TestExportDocs and TestExport classes
+"""
+
+import csv
+import inspect
+import io
+import json
+import pep8
+import unittest
+from models import export
+from models.transaction import Transaction
+
+
+class TestExportDocs(unittest.TestCase):
+    """Tests to check the documentation and style of export module"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up for the doc tests"""
+        cls.export_f = inspect.getmembers(export, inspect.isfunction)
+
+    def test_pep8_conformance_export(self):
+        """Test that models/export.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/export.py',
+                                    'tests/test_export.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_export_func_docstrings(self):
+        """Test for the presence of docstrings in export functions"""
+        for func in self.export_f:
+            self.assertIsNot(func[1].__doc__, None,
+                             "{:s} needs a docstring".format(func[0]))
+
+
+class TestExport(unittest.TestCase):
+    """Test the transaction export formats"""
+
+    def setUp(self):
+        """Set up transactions to export"""
+        self.transactions = [
+            Transaction(amount=1.5, type="expense", category="food",
+                        description='Dinner, "late"').to_dict(),
+            Transaction(amount=20, type="income").to_dict()
+        ]
+
+    def test_csv_lines(self):
+        """Test that CSV output has a header and one line per row"""
+        lines = list(export.csv_lines(iter(self.transactions)))
+        self.assertEqual(len(lines), 3)
+        rows = list(csv.reader(io.StringIO("".join(lines))))
+        self.assertEqual(tuple(rows[0]), export.export_fields)
+        self.assertEqual(rows[1][6], 'Dinner, "late"')
+        self.assertEqual(rows[2][5], "")
+
+    def test_csv_lines_is_lazy(self):
+        """Test that CSV lines are produced as rows are read"""
+        lines = export.csv_lines(iter(self.transactions))
+        next(lines)
+        self.assertIn(self.transactions[0]["_id"], next(lines))
+
+    def test_ndjson_lines(self):
+        """Test that NDJSON output has one object per line"""
+        lines = list(export.ndjson_lines(self.transactions))
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(all(line.endswith("\n") for line in lines))
+        self.assertEqual(json.loads(lines[1]), self.transactions[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+#!/usr/bin/python3
+"""
+Contains the TestHashingDocs and TestHashing classes
+"""
+
+import bcrypt
+import inspect
+from models import hashing
+from models.hashing import PoolBusyError
+import pep8
+import threading
+import unittest
+from unittest.mock import patch
+
+
+class TestHashingDocs(unittest.TestCase):
+    """Tests to check the documentation and style of hashing"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up for the doc tests"""
+        cls.hashing_f = inspect.getmembers(hashing, inspect.isfunction)
+
+    def test_pep8_conformance_hashing(self):
+        """Test that models/hashing.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/hashing.py',
+                                    'tests/test_hashing.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_hashing_module_docstring(self):
+        """Test for the hashing.py module docstring"""
+        self.assertIsNot(hashing.__doc__, None,
+                         "hashing.py needs a docstring")
+        self.assertTrue(len(hashing.__doc__) >= 1,
+                        "hashing.py needs a docstring")
+
+    def test_hashing_func_docstrings(self):
+        """Test for the presence of docstrings in hashing functions"""
+        for func in self.hashing_f:
+            self.assertIsNot(func[1].__doc__, None,
+                             "{:s} function needs a docstring".format(func[0]))
+
+
+@patch.object(hashing, "rounds", 4)
+class TestHashing(unittest.TestCase):
+    """Test the password hashing pool"""
+
+    def test_hash_and_check(self):
+        """Test that a hashed password is checked on the pool"""
+        stored_hash = hashing.hash_password("secret")
+        self.assertTrue(stored_hash.startswith("$2b$04$"))
+        self.assertTrue(hashing.check_password("secret", stored_hash))
+        self.assertFalse(hashing.check_password("wrong", stored_hash))
+
+    def test_check_invalid_hash(self):
+        """Test that a value which is not a bcrypt hash never matches"""
+        self.assertFalse(hashing.check_password("secret", "plain text"))
+
+    def test_needs_rehash(self):
+        """Test that hashes with another cost factor are upgraded"""
+        old_hash = bcrypt.hashpw(b"secret", bcrypt.gensalt(5)).decode()
+        self.assertTrue(hashing.needs_rehash(old_hash))
+        self.assertFalse(hashing.needs_rehash(hashing.hash_password("s")))
+        self.assertTrue(hashing.needs_rehash("plain text"))
+
+    def test_run_releases_slot(self):
+        """Test that every call gives its slot back when it finishes"""
+        pending = threading.BoundedSemaphore(1)
+        with patch.object(hashing, "pending", pending):
+            for _ in range(3):
+                self.assertEqual(hashing.run(len, "abc"), 3)
+        self.assertTrue(pending.acquire(blocking=False))
+
+    def test_run_busy(self):
+        """Test that calls beyond max_pending are refused at once"""
+        pending = threading.BoundedSemaphore(1)
+        pending.acquire()
+        with patch.object(hashing, "pending", pending):
+            with self.assertRaises(PoolBusyError):
+                hashing.hash_password("secret")
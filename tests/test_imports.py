@@ -0,0 +1,177 @@
+#!/usr/bin/python3
+"""
+Contains the TestImportsDocs and TestImports classes
+"""
+
+from datetime import datetime
+import inspect
+import io
+import os
+import pep8
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+from models import imports
+from models.import_job import ImportJob
+from models.user import User
+
+
+class TestImportsDocs(unittest.TestCase):
+    """Tests to check the documentation and style of imports module"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up for the doc tests"""
+        cls.imports_f = inspect.getmembers(imports, inspect.isfunction)
+
+    def test_pep8_conformance_imports(self):
+        """Test that models/imports.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/imports.py',
+                                    'tests/test_imports.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_imports_func_docstrings(self):
+        """Test for the presence of docstrings in imports functions"""
+        for func in self.imports_f:
+            self.assertIsNot(func[1].__doc__, None,
+                             "{:s} needs a docstring".format(func[0]))
+
+
+class TestImports(unittest.TestCase):
+    """Test the statement parsers and the import worker"""
+
+    def test_parse_amount(self):
+        """Test that bank amounts are read"""
+        self.assertEqual(imports.parse_amount("1,234.50"), 1234.5)
+        self.assertEqual(imports.parse_amount("(12.00)"), -12.0)
+        self.assertEqual(imports.parse_amount("$3"), 3.0)
+        self.assertEqual(imports.parse_amount("abc"), "abc")
+
+    def test_parse_date(self):
+        """Test that the supported date formats are read"""
+        self.assertEqual(imports.parse_date("07/02/2024"),
+                         datetime(2024, 7, 2))
+        self.assertEqual(imports.parse_date("20240703120000"),
+                         datetime(2024, 7, 3, 12))
+        self.assertEqual(imports.parse_date("soon"), "soon")
+
+    def test_csv_transactions(self):
+        """Test that CSV columns are matched by name"""
+        stream = io.StringIO("Date,Memo,Debit,Credit\n"
+                             "2024-07-01,Coffee,3.50,\n\n"
+                             "2024-07-02,Salary,,100\n")
+        rows = list(imports.csv_transactions(stream))
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[0], {"amount": 3.5, "type": "expense",
+                                   "description": "Coffee", "category": "",
+                                   "created_date": datetime(2024, 7, 1)})
+        self.assertEqual(rows[1]["type"], "income")
+        self.assertEqual(rows[1]["amount"], 100.0)
+
+    def test_statement_types(self):
+        """Test that bank types are mapped and others kept as written"""
+        stream = io.StringIO("Date,Amount,Type\n"
+                             "2024-07-01,3.50,DEBIT\n"
+                             "2024-07-02,-10,Deposit\n"
+                             "2024-07-03,5,Savings\n")
+        rows = list(imports.csv_transactions(stream))
+        self.assertEqual([row["type"] for row in rows],
+                         ["expense", "income", "Savings"])
+        self.assertEqual(rows[1]["amount"], 10.0)
+
+    def test_ofx_transactions(self):
+        """Test that OFX records are read across block boundaries"""
+        statement = "OFXHEADER:100\n\n<OFX><BANKTRANLIST>" + \
+            "<STMTTRN>\n<DTPOSTED>20240703120000[-5:EST]\n" \
+            "<TRNAMT>-42.10\n<NAME>A &amp; B\n</STMTTRN>" * 3 + \
+            "</BANKTRANLIST></OFX>"
+        with patch('models.imports.read_size', 7):
+            rows = list(imports.ofx_transactions(io.StringIO(statement)))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[2], {"amount": 42.1, "type": "expense",
+                                   "description": "A & B", "category": "",
+                                   "created_date": datetime(2024, 7, 3, 12)})
+
+    def test_statement_format(self):
+        """Test that the format is found from the request"""
+        self.assertEqual(imports.statement_format("bank.QFX"), "ofx")
+        self.assertEqual(imports.statement_format("", "text/csv"), "csv")
+        self.assertEqual(imports.statement_format("a.csv", None, "OFX"),
+                         "ofx")
+        self.assertIsNone(imports.statement_format("a.pdf"))
+
+    @patch('models.imports.get_executor')
+    @patch('models.base_model.models.storage')
+    def test_start_import(self, mock_storage, mock_get_executor):
+        """Test that the upload is spooled and the import queued"""
+        user = User()
+        job = imports.start_import(user, io.BytesIO(b"Date,Amount\n"), "csv",
+                                   "bank.csv")
+        mock_storage.new.assert_called_once_with(job)
+        submit = mock_get_executor.return_value.submit
+        path = submit.call_args[0][2]
+        with open(path, "rb") as spool:
+            self.assertEqual(spool.read(), b"Date,Amount\n")
+        os.remove(path)
+        self.assertEqual(job.status, "pending")
+        self.assertEqual(job.user_id, user._id)
+
+    @patch('models.imports.ingest_transactions')
+    @patch('models.imports.storage')
+    def test_run_import(self, mock_storage, mock_ingest):
+        """Test that the job records the progress of every chunk"""
+        job = ImportJob(_id="job", user_id="user", format="csv", processed=0,
+                        created=0, failed=0, errors=[])
+        job.update = MagicMock()
+        mock_storage.get.side_effect = [job, User()]
+
+        def ingest(user, items, on_chunk):
+            """Report one chunk with one failed line"""
+            self.assertEqual(len(list(items)), 2)
+            on_chunk([{"index": 0, "_id": "a"},
+                      {"index": 1, "error": "bad"}])
+            return 1, 1
+
+        mock_ingest.side_effect = ingest
+        descriptor, path = tempfile.mkstemp()
+        with os.fdopen(descriptor, "w") as spool:
+            spool.write("Date,Amount\n2024-07-01,1\n2024-07-02,x\n")
+        imports.run_import("job", path)
+        self.assertFalse(os.path.exists(path))
+        self.assertEqual(job.status, "done")
+        self.assertEqual((job.processed, job.created, job.failed), (2, 1, 1))
+        self.assertEqual(job.errors, [{"index": 1, "error": "bad"}])
+        mock_storage.reload.assert_called_once_with()
+        mock_storage.close.assert_not_called()
+
+    @patch('models.imports.storage')
+    def test_run_import_failure(self, mock_storage):
+        """Test that a failed import is recorded in its job"""
+        job = ImportJob(_id="job", user_id="user", format="csv")
+        job.update = MagicMock()
+        mock_storage.get.side_effect = [job, None]
+        descriptor, path = tempfile.mkstemp()
+        os.close(descriptor)
+        imports.run_import("job", path)
+        self.assertEqual(job.status, "failed")
+        self.assertEqual(job.error, "User not found")
+        self.assertFalse(os.path.exists(path))
+
+    @patch('models.imports.storage')
+    def test_run_import_request_mode(self, mock_storage):
+        """Test that the worker releases the storage it held when it is
+        closed after each request"""
+        mock_storage.pooled = False
+        mock_storage.get.return_value = None
+        descriptor, path = tempfile.mkstemp()
+        os.close(descriptor)
+        imports.run_import("job", path)
+        mock_storage.reload.assert_called_once_with()
+        mock_storage.close.assert_called_once_with()
+        self.assertFalse(os.path.exists(path))
+
+
+if __name__ == "__main__":
+    unittest.main()
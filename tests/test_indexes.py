@@ -0,0 +1,116 @@
+#!/usr/bin/python3
+"""
+Contains the TestIndexesDocs and TestIndexes classes
+"""
+
+import inspect
+import pep8
+import unittest
+from unittest.mock import MagicMock
+from models.engine import indexes
+
+
+class TestIndexesDocs(unittest.TestCase):
+    """Tests to check the documentation and style of indexes module"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up for the doc tests"""
+        cls.indexes_f = inspect.getmembers(indexes, inspect.isfunction)
+
+    def test_pep8_conformance_indexes(self):
+        """Test that models/engine/indexes.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/indexes.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pep8_conformance_test_indexes(self):
+        """Test that tests/test_indexes.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_indexes.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_indexes_module_docstring(self):
+        """Test for the indexes.py module docstring"""
+        self.assertIsNot(indexes.__doc__, None,
+                         "indexes.py needs a docstring")
+
+    def test_indexes_func_docstrings(self):
+        """Test for the presence of docstrings in indexes functions"""
+        for func in self.indexes_f:
+            self.assertIsNot(func[1].__doc__, None,
+                             "{:s} needs a docstring".format(func[0]))
+
+
+class TestIndexes(unittest.TestCase):
+    """Test the index management helpers"""
+
+    def setUp(self):
+        """Set up a storage whose collections are mocks"""
+        self.collections = {}
+        self.storage = MagicMock()
+        self.storage.get_collection.side_effect = self.collection
+
+    def collection(self, name):
+        """Return the mock collection for name"""
+        if name not in self.collections:
+            mock_collection = MagicMock()
+            mock_collection.index_information.return_value = {
+                "_id_": {"key": [("_id", 1)]}
+            }
+            self.collections[name] = mock_collection
+        return self.collections[name]
+
+    def test_declared_indexes(self):
+        """Test that login and registration lookups are indexed"""
+        users = {index["name"]: index for index in indexes.INDEXES["users"]}
+        self.assertTrue(users["username_unique"]["unique"])
+        self.assertTrue(users["email_unique"]["unique"])
+        self.assertEqual(indexes.INDEXES["transactions"][0]["keys"][0],
+                         ("user_id", 1))
+
+    def test_verify_reports_missing(self):
+        """Test that verify reports indexes absent from the database"""
+        report = indexes.verify_indexes(self.storage)
+        self.assertIn("username_unique", report["users"]["missing"])
+        self.assertEqual(report["users"]["undeclared"], [])
+
+    def test_verify_reports_changed(self):
+        """Test that verify reports indexes whose options differ"""
+        self.collection("users").index_information.return_value = {
+            "username_unique": {"key": [("username", 1)]}
+        }
+        report = indexes.verify_indexes(self.storage)
+        self.assertEqual(report["users"]["changed"], ["username_unique"])
+
+    def test_ensure_creates_indexes(self):
+        """Test that ensure creates the declared indexes"""
+        indexes.ensure_indexes(self.storage)
+        self.collection("users").create_indexes.assert_called_once()
+        self.collection("transactions").create_indexes.assert_called_once()
+
+    def test_sync_drops_undeclared(self):
+        """Test that sync only drops undeclared indexes with prune"""
+        self.collection("users").index_information.return_value = {
+            "_id_": {"key": [("_id", 1)]},
+            "old_index": {"key": [("first_name", 1)]}
+        }
+        indexes.sync_indexes(self.storage)
+        self.collection("users").drop_index.assert_not_called()
+        self.collection("users").create_indexes.assert_called_once()
+        indexes.sync_indexes(self.storage, prune=True)
+        self.collection("users").drop_index.assert_called_once_with(
+            "old_index")
+
+    def test_unique_fields(self):
+        """Test that unique_fields maps unique indexes to their field"""
+        self.assertEqual(indexes.unique_fields("users"),
+                         {"username_unique": "username",
+                          "email_unique": "email"})
+        self.assertEqual(indexes.unique_fields("transactions"), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+#!/usr/bin/python3
+"""
+Contains the TestIngestDocs and TestIngest classes
+"""
+
+from datetime import datetime
+import inspect
+import pep8
+import unittest
+from unittest.mock import patch
+from models import ingest
+from models.user import User
+from models.utility import is_transaction_valid
+
+
+class TestIngestDocs(unittest.TestCase):
+    """Tests to check the documentation and style of ingest module"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up for the doc tests"""
+        cls.ingest_f = inspect.getmembers(ingest, inspect.isfunction)
+
+    def test_pep8_conformance_ingest(self):
+        """Test that models/ingest.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/ingest.py',
+                                    'tests/test_ingest.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_ingest_func_docstrings(self):
+        """Test for the presence of docstrings in ingest functions"""
+        for func in self.ingest_f:
+            self.assertIsNot(func[1].__doc__, None,
+                             "{:s} needs a docstring".format(func[0]))
+
+
+class TestIngest(unittest.TestCase):
+    """Test the bulk transaction ingestion"""
+
+    def test_chunked(self):
+        """Test that items are split in bounded chunks"""
+        self.assertEqual(list(ingest.chunked(range(5), 2)),
+                         [[0, 1], [2, 3], [4]])
+
+    def test_new_transaction(self):
+        """Test that client data cannot choose the id or the owner"""
+        user = User()
+        txn = ingest.new_transaction(user, {"_id": "mine", "amount": 1,
+                                            "user_id": "other"})
+        self.assertNotEqual(txn._id, "mine")
+        self.assertEqual(txn.user_id, user._id)
+        self.assertIsNone(txn.changes())
+
+    def test_client_values(self):
+        """Test that reserved fields are dropped and dates parsed"""
+        values = ingest.client_values({
+            "_id": "mine", "user_id": "other", "amount": 2,
+            "created_date": "2024-01-31T23:00:00.000000"})
+        self.assertEqual(values, {
+            "amount": 2, "created_date": datetime(2024, 1, 31, 23)})
+
+    def test_transaction_validation(self):
+        """Test that updates are checked with the stored values"""
+        current = {"amount": 1, "type": "expense"}
+        self.assertFalse(is_transaction_valid({"amount": 2}, current))
+        self.assertTrue(is_transaction_valid({"amount": "2"}, current))
+        self.assertTrue(is_transaction_valid({"amount": 2}))
+        for date in ("July 2024", 20240701, None):
+            self.assertTrue(is_transaction_valid({"created_date": date},
+                                                 current))
+        self.assertFalse(is_transaction_valid(
+            {"created_date": "2024-07-01T00:00:00.000000"}, current))
+        self.assertFalse(is_transaction_valid(
+            {"created_date": datetime(2024, 7, 1)}, current))
+
+    @patch('models.ingest.storage')
+    def test_ingest_transactions(self, mock_storage):
+        """Test that each chunk is written with one call"""
+        user = User()
+        mock_storage.new_many.side_effect = lambda txns: [None] * len(txns)
+        chunks = []
+        items = [{"amount": 1, "type": "expense"}, {"type": "income"},
+                 None, {"amount": 2.5, "type": "income"}]
+        created, failed = ingest.ingest_transactions(user, items, 2,
+                                                     chunks.append)
+        self.assertEqual((created, failed), (2, 2))
+        self.assertEqual(mock_storage.new_many.call_count, 2)
+        self.assertEqual([result["index"] for result in chunks[0]], [0, 1])
+        self.assertIn("error", chunks[0][1])
+        mock_storage.push.assert_not_called()
+
+    @patch('models.ingest.storage')
+    def test_ingest_reports_write_errors(self, mock_storage):
+        """Test that database errors are reported per item"""
+        mock_storage.new_many.return_value = [None, "duplicate key"]
+        results = []
+        created, failed = ingest.ingest_transactions(
+            User(), [{"amount": 1, "type": "a"}, {"amount": 2, "type": "b"}],
+            on_chunk=results.extend)
+        self.assertEqual((created, failed), (1, 1))
+        self.assertEqual(results[1], {"index": 1, "error": "duplicate key"})
+
+
+if __name__ == "__main__":
+    unittest.main()
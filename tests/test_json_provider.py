@@ -0,0 +1,99 @@
+#!/usr/bin/python3
+"""
+Contains the TestJSONProviderDocs and TestJSONProvider classes
+"""
+
+from api.v1 import json_provider
+from api.v1.json_provider import FastJSONProvider
+from datetime import date, datetime
+from decimal import Decimal
+from flask import Flask, jsonify
+import inspect
+import pep8
+import unittest
+from unittest.mock import patch
+from uuid import UUID
+
+
+class TestJSONProviderDocs(unittest.TestCase):
+    """Tests to check the documentation and style of json_provider"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up for the doc tests"""
+        cls.provider_f = [func for func in inspect.getmembers(
+            FastJSONProvider, inspect.isfunction)
+            if func[0] in FastJSONProvider.__dict__]
+        cls.provider_f += inspect.getmembers(json_provider,
+                                             inspect.isfunction)
+
+    def test_pep8_conformance_json_provider(self):
+        """Test that api/v1/json_provider.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['api/v1/json_provider.py',
+                                    'tests/test_json_provider.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_json_provider_func_docstrings(self):
+        """Test for the presence of docstrings in FastJSONProvider methods"""
+        for func in self.provider_f:
+            self.assertIsNot(func[1].__doc__, None,
+                             "{:s} method needs a docstring".format(func[0]))
+
+
+class TestJSONProvider(unittest.TestCase):
+    """Test the FastJSONProvider class"""
+
+    def setUp(self):
+        """Set up an application using the provider"""
+        self.app = Flask(__name__)
+        self.app.json = FastJSONProvider(self.app)
+        self.data = {
+            "b": datetime(2024, 7, 1, 10, 30),
+            "a": UUID("12345678-1234-5678-1234-567812345678"),
+            "c": Decimal("12.50"),
+            "d": date(2024, 7, 1),
+            "e": "café"
+        }
+        self.expected = '{"a":"12345678-1234-5678-1234-567812345678",' \
+            '"b":"2024-07-01T10:30:00.000000","c":12.5,' \
+            '"d":"2024-07-01","e":"café"}'
+
+    def test_compact_response(self):
+        """Test that responses are compact with sorted keys"""
+        with self.app.test_request_context("/"):
+            response = jsonify(self.data)
+        self.assertEqual(response.mimetype, "application/json")
+        self.assertEqual(response.get_data(as_text=True),
+                         self.expected + "\n")
+
+    def test_pretty_response(self):
+        """Test that ?pretty=1 indents the response"""
+        with self.app.test_request_context("/?pretty=1"):
+            response = jsonify(self.data)
+        self.assertIn('\n  "a": ', response.get_data(as_text=True))
+
+    def test_standard_json_fallback(self):
+        """Test that the json module gives the same output"""
+        with patch.object(json_provider, 'orjson', None):
+            with self.app.test_request_context("/"):
+                response = jsonify(self.data)
+            self.assertEqual(response.get_data(as_text=True),
+                             self.expected + "\n")
+            self.assertEqual(self.app.json.loads('{"a": [1]}'), {"a": [1]})
+
+    def test_unsupported_type(self):
+        """Test that unsupported values raise TypeError"""
+        with self.assertRaises(TypeError):
+            self.app.json.dumps({"a": object()})
+
+    def test_loads(self):
+        """Test that JSON documents are parsed"""
+        self.assertEqual(self.app.json.loads(b'{"a": 1.5}'), {"a": 1.5})
+        with self.assertRaises(ValueError):
+            self.app.json.loads("{bad")
+
+
+if __name__ == "__main__":
+    unittest.main()
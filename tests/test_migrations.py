@@ -0,0 +1,124 @@
+#!/usr/bin/python3
+"""
+Contains the TestMigrationsDocs and TestMigrations classes
+"""
+
+from datetime import datetime
+import inspect
+import pep8
+import unittest
+from unittest.mock import MagicMock
+from models.engine import migrations
+from pymongo import UpdateOne
+
+
+class TestMigrationsDocs(unittest.TestCase):
+    """Tests to check the documentation and style of migrations module"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up for the doc tests"""
+        cls.migrations_f = inspect.getmembers(migrations, inspect.isfunction)
+
+    def test_pep8_conformance_migrations(self):
+        """Test that models/engine/migrations.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/migrations.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pep8_conformance_test_migrations(self):
+        """Test that tests/test_migrations.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_migrations.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_migrations_func_docstrings(self):
+        """Test for the presence of docstrings in migrations functions"""
+        for func in self.migrations_f:
+            self.assertIsNot(func[1].__doc__, None,
+                             "{:s} needs a docstring".format(func[0]))
+
+
+class TestMigrations(unittest.TestCase):
+    """Test the data migrations"""
+
+    def setUp(self):
+        """Set up a storage whose collections are mocks"""
+        self.collections = {}
+        self.storage = MagicMock()
+        self.storage.get_collection.side_effect = self.collection
+
+    def collection(self, name):
+        """Return the mock collection for name"""
+        if name not in self.collections:
+            self.collections[name] = MagicMock()
+        return self.collections[name]
+
+    def test_backfill_owner(self):
+        """Test that transactions get the id of the user listing them"""
+        find = self.collection("transactions").find.return_value
+        find.sort.return_value.limit.side_effect = [
+            [{"_id": "txn1"}, {"_id": "txn2"}], [{"_id": "txn3"}], []]
+        self.collection("users").find.side_effect = [
+            [{"_id": "user1", "transactions": ["txn1", "txn3", "txn9"]}],
+            [{"_id": "user1", "transactions": ["txn1", "txn3", "txn9"]}]]
+        update_many = self.collection("transactions").update_many
+        update_many.return_value.modified_count = 1
+        updated = migrations.backfill_owner(self.storage, batch_size=2)
+        self.assertEqual(updated, 2)
+        query, change = update_many.call_args_list[0][0]
+        self.assertEqual(query, {"_id": {"$in": ["txn1"]},
+                                 "user_id": {"$in": [None, ""]}})
+        self.assertEqual(change, {"$set": {"user_id": "user1"}})
+        self.assertEqual(update_many.call_args_list[1][0][0]["_id"],
+                         {"$in": ["txn3"]})
+
+    def test_backfill_owner_reads_unowned(self):
+        """Test that every run reads the transactions still without an
+        owner, so a rerun catches the ones inserted meanwhile"""
+        find = self.collection("transactions").find
+        find.return_value.sort.return_value.limit.side_effect = [[], []]
+        migrations.backfill_owner(self.storage)
+        migrations.backfill_owner(self.storage)
+        self.assertEqual(find.call_count, 2)
+        for call in find.call_args_list:
+            self.assertEqual(call[0][0], {"user_id": {"$in": [None, ""]}})
+        self.collection("users").find.assert_not_called()
+
+    def test_convert_dates(self):
+        """Test that date strings are converted to datetime objects"""
+        for name, documents in (("users", []), ("transactions", [
+                {"_id": "txn1",
+                 "created_date": "2024-05-03T10:00:00.000000",
+                 "updated_date": datetime(2024, 5, 3)},
+                {"_id": "txn2", "created_date": "not a date"}])):
+            find = self.collection(name).find.return_value
+            find.sort.return_value.limit.side_effect = [documents, []]
+        bulk_write = self.collection("transactions").bulk_write
+        bulk_write.return_value.modified_count = 1
+        self.assertEqual(migrations.convert_dates(self.storage), 1)
+        requests = bulk_write.call_args[0][0]
+        self.assertEqual(requests, [UpdateOne(
+            {"_id": "txn1"},
+            {"$set": {"created_date": datetime(2024, 5, 3, 10)}})])
+        query = self.collection("transactions").find.call_args_list[1][0][0]
+        self.assertEqual(query["_id"], {"$gt": "txn2"})
+
+    def test_convert_dates_reads_strings(self):
+        """Test that every run reads the documents still holding a date
+        string, so a rerun catches the ones written meanwhile"""
+        for name in ("users", "transactions"):
+            find = self.collection(name).find.return_value
+            find.sort.return_value.limit.return_value = []
+        migrations.convert_dates(self.storage)
+        migrations.convert_dates(self.storage)
+        for call in self.collection("transactions").find.call_args_list:
+            self.assertNotIn("_id", call[0][0])
+            self.assertIn({"created_date": {"$type": "string"}},
+                          call[0][0]["$or"])
+
+
+if __name__ == "__main__":
+    unittest.main()
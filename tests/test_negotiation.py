@@ -0,0 +1,104 @@
+#!/usr/bin/python3
+"""
+Contains the TestNegotiationDocs and TestNegotiation classes
+"""
+
+from api.v1 import negotiation
+from api.v1.negotiation import APIRequest, NegotiatingJSONProvider, msgpack
+from datetime import datetime
+from flask import Flask, jsonify, request
+import inspect
+import pep8
+import unittest
+from unittest.mock import patch
+
+
+class TestNegotiationDocs(unittest.TestCase):
+    """Tests to check the documentation and style of negotiation"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up for the doc tests"""
+        cls.negotiation_f = [
+            func for cls_ in (APIRequest, NegotiatingJSONProvider)
+            for func in inspect.getmembers(cls_, inspect.isfunction)
+            if func[0] in cls_.__dict__]
+
+    def test_pep8_conformance_negotiation(self):
+        """Test that api/v1/negotiation.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['api/v1/negotiation.py',
+                                    'tests/test_negotiation.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_negotiation_func_docstrings(self):
+        """Test for the presence of docstrings in negotiation methods"""
+        for func in self.negotiation_f:
+            self.assertIsNot(func[1].__doc__, None,
+                             "{:s} method needs a docstring".format(func[0]))
+
+
+@unittest.skipIf(msgpack is None, "msgpack is not installed")
+class TestNegotiation(unittest.TestCase):
+    """Test the MessagePack content negotiation"""
+
+    def setUp(self):
+        """Set up an application echoing the request body"""
+        self.app = Flask(__name__)
+        self.app.request_class = APIRequest
+        self.app.json = NegotiatingJSONProvider(self.app)
+
+        @self.app.route("/echo", methods=["POST"])
+        def echo():
+            """Return the parsed body"""
+            return jsonify(request.get_json())
+
+        self.client = self.app.test_client()
+        self.data = {"amount": 1.5, "type": "expense", "tags": ["a"]}
+
+    def test_msgpack_request_and_response(self):
+        """Test that MessagePack is read and written"""
+        response = self.client.post(
+            "/echo", data=msgpack.packb(self.data),
+            headers={"Content-Type": "application/msgpack",
+                     "Accept": "application/msgpack"})
+        self.assertEqual(response.mimetype, "application/msgpack")
+        self.assertEqual(msgpack.unpackb(response.data), self.data)
+        self.assertIn("Accept", response.headers["Vary"])
+
+    def test_json_is_default(self):
+        """Test that JSON is used unless MessagePack is preferred"""
+        for accept in ("*/*", "application/json, application/msgpack;q=0.5"):
+            response = self.client.post("/echo", json=self.data,
+                                        headers={"Accept": accept})
+            self.assertEqual(response.mimetype, "application/json")
+            self.assertEqual(response.get_json(), self.data)
+            self.assertIn("Accept", response.headers["Vary"])
+
+    def test_dates_match_json(self):
+        """Test that MessagePack writes dates like JSON"""
+        with self.app.test_request_context(
+                headers={"Accept": "application/x-msgpack"}):
+            response = jsonify({"date": datetime(2024, 7, 1)})
+        self.assertEqual(msgpack.unpackb(response.data),
+                         {"date": "2024-07-01T00:00:00.000000"})
+
+    def test_invalid_msgpack(self):
+        """Test that a bad MessagePack body is a bad request"""
+        response = self.client.post(
+            "/echo", data=b"\xc1",
+            headers={"Content-Type": "application/msgpack"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_without_msgpack(self):
+        """Test that JSON is sent when msgpack is not installed"""
+        with patch.object(negotiation, 'msgpack', None):
+            response = self.client.post(
+                "/echo", json=self.data,
+                headers={"Accept": "application/msgpack"})
+        self.assertEqual(response.mimetype, "application/json")
+
+
+if __name__ == "__main__":
+    unittest.main()
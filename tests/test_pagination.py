@@ -0,0 +1,63 @@
+#!/usr/bin/python3
+"""
+Contains the TestPaginationDocs and TestPagination classes
+"""
+
+from datetime import datetime
+import inspect
+import pep8
+import unittest
+from models.engine import pagination
+
+
+class TestPaginationDocs(unittest.TestCase):
+    """Tests to check the documentation and style of pagination module"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up for the doc tests"""
+        cls.pagination_f = inspect.getmembers(pagination, inspect.isfunction)
+
+    def test_pep8_conformance_pagination(self):
+        """Test that models/engine/pagination.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/pagination.py',
+                                    'tests/test_pagination.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pagination_func_docstrings(self):
+        """Test for the presence of docstrings in pagination functions"""
+        for func in self.pagination_f:
+            self.assertIsNot(func[1].__doc__, None,
+                             "{:s} needs a docstring".format(func[0]))
+
+
+class TestPagination(unittest.TestCase):
+    """Test the keyset pagination cursors"""
+
+    def test_round_trip(self):
+        """Test that a cursor gives back its date and id"""
+        created = datetime(2024, 5, 3, 10, 30, 0, 123000)
+        cursor = pagination.encode_cursor(created, "txn1")
+        self.assertIsInstance(cursor, str)
+        self.assertEqual(pagination.decode_cursor(cursor), (created, "txn1"))
+
+    def test_invalid_cursor(self):
+        """Test that invalid cursors raise ValueError"""
+        for cursor in ("abc", "bm90IGpzb24=", "WzFd"):
+            with self.assertRaises(ValueError):
+                pagination.decode_cursor(cursor)
+
+    def test_after_cursor(self):
+        """Test the query of the transactions after a cursor"""
+        created = datetime(2024, 5, 3)
+        query = pagination.after_cursor(
+            pagination.encode_cursor(created, "txn1"))
+        self.assertEqual(query, {"$or": [
+            {"created_date": {"$lt": created}},
+            {"created_date": created, "_id": {"$lt": "txn1"}}]})
+
+
+if __name__ == "__main__":
+    unittest.main()
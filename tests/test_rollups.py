@@ -0,0 +1,104 @@
+#!/usr/bin/python3
+"""
+Contains the TestRollupsDocs and TestRollups classes
+"""
+
+from datetime import datetime
+import inspect
+import pep8
+import unittest
+from unittest.mock import MagicMock
+from models.engine import rollups
+from pymongo import UpdateOne
+
+
+class TestRollupsDocs(unittest.TestCase):
+    """Tests to check the documentation and style of rollups module"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up for the doc tests"""
+        cls.rollups_f = inspect.getmembers(rollups, inspect.isfunction)
+
+    def test_pep8_conformance_rollups(self):
+        """Test that models/engine/rollups.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/rollups.py',
+                                    'tests/test_rollups.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_rollups_func_docstrings(self):
+        """Test for the presence of docstrings in rollups functions"""
+        for func in self.rollups_f:
+            self.assertIsNot(func[1].__doc__, None,
+                             "{:s} needs a docstring".format(func[0]))
+
+
+class TestRollups(unittest.TestCase):
+    """Test the monthly rollups"""
+
+    def setUp(self):
+        """Set up a transaction document"""
+        self.txn = {"user_id": "user1", "amount": 12.5, "type": "expense",
+                    "category": "food", "created_date": datetime(2024, 5, 3)}
+
+    def test_rollup_key(self):
+        """Test that a transaction belongs to its month bucket"""
+        self.assertEqual(rollups.rollup_key(self.txn), {
+            "user_id": "user1", "year": 2024, "month": 5,
+            "type": "expense", "category": "food"})
+        self.txn["created_date"] = "2024-06-01T00:00:00.000000"
+        self.assertEqual(rollups.rollup_key(self.txn)["month"], 6)
+        del self.txn["user_id"]
+        self.assertIsNone(rollups.rollup_key(self.txn))
+
+    def test_changes_insert_and_delete(self):
+        """Test the increments of an insert and of a delete"""
+        key = rollups.rollup_key(self.txn)
+        self.assertEqual(rollups.increments(after=self.txn), [
+            (key, {"total_amount": 12.5, "count": 1})])
+        self.assertEqual(rollups.increments(before=self.txn), [
+            (key, {"total_amount": -12.5, "count": -1})])
+        self.assertEqual(rollups.changes(after=self.txn), [UpdateOne(
+            key, {"$inc": {"total_amount": 12.5, "count": 1}},
+            upsert=True)])
+
+    def test_changes_without_effect(self):
+        """Test that a change outside the bucket fields writes nothing"""
+        after = dict(self.txn, description="Lunch")
+        self.assertEqual(rollups.increments(self.txn, after), [])
+        self.assertEqual(rollups.changes(self.txn, after), [])
+
+    def test_changes_move_bucket(self):
+        """Test that a new category moves the amount between buckets"""
+        after = dict(self.txn, category="rent")
+        self.assertEqual(rollups.increments(self.txn, after), [
+            (rollups.rollup_key(self.txn),
+             {"total_amount": -12.5, "count": -1}),
+            (rollups.rollup_key(after), {"total_amount": 12.5, "count": 1})])
+
+    def test_non_numeric_amount(self):
+        """Test that amounts that are not numbers count as zero"""
+        self.txn["amount"] = "12"
+        self.assertEqual(rollups.increments(after=self.txn)[0][1],
+                         {"total_amount": 0, "count": 1})
+
+    def test_rebuild(self):
+        """Test that rebuild writes every bucket and removes stale ones"""
+        storage = MagicMock()
+        collection = storage.get_collection.return_value
+        collection.aggregate.return_value = [{
+            "_id": {"user_id": "user1", "year": 2024, "month": 5,
+                    "type": "expense", "category": "food"},
+            "total_amount": 30, "count": 2}]
+        collection.find.return_value = [
+            {"_id": "stale", "user_id": "user1", "year": 1999, "month": 1,
+             "type": "expense", "category": "food"}]
+        self.assertEqual(rollups.rebuild(storage, "user1"), 1)
+        collection.bulk_write.assert_called_once()
+        collection.delete_one.assert_called_once_with({"_id": "stale"})
+
+
+if __name__ == "__main__":
+    unittest.main()
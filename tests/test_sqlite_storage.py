@@ -0,0 +1,244 @@
+#!/usr/bin/python3
+"""
+Contains the TestSQLiteStorageDocs and TestSQLiteStorage classes
+"""
+
+from datetime import datetime, timezone
+import inspect
+import os
+from models.engine import sqlite_storage
+from models.engine.base_storage import BaseStorage
+from models.engine.errors import DuplicateValueError
+from models.engine.sqlite_storage import SQLiteStorage
+from models.import_job import ImportJob
+from models.transaction import Transaction
+from models.user import User
+import pep8
+import shutil
+import tempfile
+import unittest
+
+
+class TestSQLiteStorageDocs(unittest.TestCase):
+    """Tests to check the documentation and style of SQLiteStorage"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up for the doc tests"""
+        cls.sqlite_storage_f = inspect.getmembers(SQLiteStorage,
+                                                  inspect.isfunction)
+        cls.sqlite_storage_f += inspect.getmembers(sqlite_storage,
+                                                   inspect.isfunction)
+
+    def test_pep8_conformance_sqlite_storage(self):
+        """Test that sqlite_storage.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/sqlite_storage.py',
+                                    'tests/test_sqlite_storage.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_sqlite_storage_module_docstring(self):
+        """Test for the sqlite_storage.py module docstring"""
+        self.assertIsNot(sqlite_storage.__doc__, None,
+                         "sqlite_storage.py needs a docstring")
+
+    def test_sqlite_storage_func_docstrings(self):
+        """Test for the presence of docstrings in SQLiteStorage methods"""
+        for func in self.sqlite_storage_f:
+            self.assertIsNot(func[1].__doc__, None,
+                             "{:s} method needs a docstring".format(func[0]))
+
+    def test_implements_interface(self):
+        """Test that SQLiteStorage implements every abstract method"""
+        self.assertTrue(issubclass(SQLiteStorage, BaseStorage))
+        self.assertFalse(SQLiteStorage.__abstractmethods__)
+
+
+class TestSQLiteStorage(unittest.TestCase):
+    """Test the SQLiteStorage class"""
+
+    def setUp(self):
+        """Set up a new database file with one user"""
+        self.directory = tempfile.mkdtemp()
+        self.storage = SQLiteStorage(os.path.join(self.directory, "test.db"))
+        self.user = User(first_name="Ann", last_name="Lee", username="ann",
+                         email="ann@example.com", password="hash")
+        self.storage.new(self.user)
+
+    def tearDown(self):
+        """Close the connection and remove the database file"""
+        self.storage.close()
+        shutil.rmtree(self.directory)
+
+    def add(self, day, amount=1.0, type="expense", user=None):
+        """Store a transaction of a day of January 2024"""
+        transaction = Transaction(
+            amount=amount, type=type, category="food",
+            user_id=(user or self.user)._id,
+            created_date=datetime(2024, 1, day, tzinfo=timezone.utc))
+        self.storage.new(transaction)
+        return transaction
+
+    def test_wal_mode(self):
+        """Test that the database is opened in WAL mode"""
+        self.assertEqual(self.storage.connection().execute(
+            "PRAGMA journal_mode").fetchone()[0], "wal")
+
+    def test_get_and_filter(self):
+        """Test that objects are read back by id and by field"""
+        user = self.storage.get(User, self.user._id)
+        self.assertEqual(user.username, "ann")
+        self.assertEqual(user.password, "hash")
+        self.assertEqual(user.transactions, [])
+        self.assertEqual(user.created_date,
+                         self.user.created_date.replace(tzinfo=None))
+        user = self.storage.filter(User, "first_name", "Ann", ["email"])
+        self.assertEqual(user.to_dict()["email"], "ann@example.com")
+        self.assertNotIn("username", user.to_dict())
+        self.assertIsNone(self.storage.filter(User, "username", "bob"))
+        with self.assertRaises(ValueError):
+            self.storage.filter(User, "name') OR 1=1 --", "x")
+
+    def test_unique_columns(self):
+        """Test that taken usernames and emails are rejected"""
+        with self.assertRaises(DuplicateValueError) as context:
+            self.storage.new(User(username="bob", email="ann@example.com"))
+        self.assertEqual(context.exception.field, "email")
+        bob = User(username="bob", email="bob@example.com")
+        self.storage.new(bob)
+        self.assertEqual(self.storage.taken(User, email="x",
+                                            username="bob"), "username")
+        self.assertIsNone(self.storage.taken(User, bob._id, username="bob"))
+        bob = self.storage.get(User, bob._id)
+        bob.username = "ann"
+        with self.assertRaises(DuplicateValueError):
+            self.storage.update(bob)
+        self.assertEqual(self.storage.get(User, bob._id).username, "bob")
+
+    def test_new_many(self):
+        """Test that new_many reports the objects it could not store"""
+        first = Transaction(amount=1.0, type="expense")
+        errors = self.storage.new_many([first, first])
+        self.assertEqual(errors, [None, "_id already present, change "
+                                        "your _id"])
+
+    def test_update_and_array(self):
+        """Test that updates keep the fields they do not change"""
+        job = ImportJob(user_id=self.user._id, filename="a.csv", errors=[])
+        self.storage.new(job)
+        job = self.storage.get(ImportJob, job._id, ["status"])
+        job.status = "done"
+        self.storage.update(job)
+        self.storage.push(job, "errors", {"row": 1})
+        job = self.storage.get(ImportJob, job._id)
+        self.assertEqual(job.status, "done")
+        self.assertEqual(job.filename, "a.csv")
+        self.assertEqual(job.errors, [{"row": 1}])
+
+    def test_get_owned(self):
+        """Test that transactions of other users are not found"""
+        transaction = self.add(1)
+        self.assertEqual(self.storage.get_owned(
+            Transaction, transaction._id, self.user._id).amount, 1.0)
+        self.assertIsNone(self.storage.get_owned(
+            Transaction, transaction._id, "someone"))
+
+    def test_filter_all(self):
+        """Test that pages are read newest first"""
+        for day in range(1, 6):
+            self.add(day, float(day))
+        result = self.storage.filter_all(self.user, 2, 2)
+        self.assertEqual(result["total_documents"], 5)
+        self.assertEqual(result["total_pages"], 3)
+        self.assertEqual([t["amount"] for t in result["transactions"]],
+                         [3.0, 2.0])
+        self.assertEqual(result["transactions"][0]["created_date"],
+                         "2024-01-03T00:00:00.000000")
+        self.assertEqual(self.storage.filter_all(User(), 1, 2), {})
+
+    def test_filter_all_cursor(self):
+        """Test that keyset pages follow each other without gaps"""
+        for day in (1, 2, 2, 3, 4):
+            self.add(day, float(day))
+        amounts = []
+        cursor = ""
+        while cursor is not None:
+            result = self.storage.filter_all(self.user, 1, 2, cursor)
+            amounts += [t["amount"] for t in result["transactions"]]
+            cursor = result["next_cursor"]
+        self.assertEqual(amounts, [4.0, 3.0, 2.0, 2.0, 1.0])
+        with self.assertRaises(ValueError):
+            self.storage.filter_all(self.user, 1, 2, "bad")
+
+    def test_search(self):
+        """Test that search summarizes one month by type"""
+        self.add(1, 10, "income")
+        self.add(2, 4.0)
+        self.add(3, 2.5)
+        result = self.storage.search(self.user, 2024, 1, 1, 2)
+        self.assertEqual(result["summery"], {"income": 10,
+                                             "expense": 6.5})
+        self.assertEqual(result["total_documents"], 3)
+        self.assertEqual(result["total_pages"], 2)
+        self.assertEqual([t["amount"] for t in result["transactions"]],
+                         [2.5, 4.0])
+        self.assertEqual(self.storage.search(self.user, 2024, 2, 1, 2), {})
+
+    def test_summary_uses_index(self):
+        """Test that the summary query only reads the covering index"""
+        plan = self.storage.connection().execute(
+            "EXPLAIN QUERY PLAN SELECT type, SUM(amount), COUNT(*) "
+            "FROM transactions WHERE user_id = ? AND created_date >= ? "
+            "AND created_date < ? GROUP BY type", ("a", "b", "c")).fetchall()
+        self.assertIn("COVERING INDEX transactions_user_created",
+                      plan[0][-1])
+
+    def test_delete(self):
+        """Test that deleted transactions leave their owner"""
+        transaction = self.add(1)
+        self.assertEqual(self.storage.get(User, self.user._id).transactions,
+                         [transaction._id])
+        self.storage.delete(transaction)
+        self.assertIsNone(self.storage.get(Transaction, transaction._id))
+        self.assertEqual(self.storage.get(User, self.user._id).transactions,
+                         [])
+
+    def test_version(self):
+        """Test that every change of a user or their transactions raises
+        the user's version"""
+        versions = [self.storage.version(self.user._id)]
+        transaction = self.add(1)
+        versions.append(self.storage.version(self.user._id))
+        self.storage.push(self.user, "transactions", transaction._id)
+        versions.append(self.storage.version(self.user._id))
+        transaction.amount = 2.0
+        self.storage.update(transaction)
+        versions.append(self.storage.version(self.user._id))
+        self.user.first_name = "Anna"
+        self.storage.update(self.user)
+        versions.append(self.storage.version(self.user._id))
+        self.storage.delete(transaction)
+        versions.append(self.storage.version(self.user._id))
+        self.assertEqual(versions, sorted(set(versions)))
+        self.assertGreater(versions[0], 0)
+        other = User()
+        self.add(2, user=other)
+        self.assertEqual(self.storage.version(self.user._id), versions[-1])
+        self.assertGreater(self.storage.version(other._id), 0)
+        self.assertEqual(self.storage.version("unknown"), 0)
+
+    def test_iter_and_load_transactions(self):
+        """Test that the whole history is read newest first"""
+        for day in range(1, 4):
+            self.add(day, float(day))
+        self.add(1, 9.0, user=User())
+        documents = list(self.storage.iter_transactions(self.user, 2))
+        self.assertEqual([t["amount"] for t in documents], [3.0, 2.0, 1.0])
+        batch = self.storage.load_transactions(self.user, 2)
+        self.assertEqual([t.amount for t in batch], [3.0, 2.0, 1.0])
+        self.assertEqual(batch[0].created_date, datetime(2024, 1, 3))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+#!/usr/bin/python3
+"""
+Contains the TestTransactionBatchDocs and TestTransactionBatch classes
+"""
+
+from datetime import datetime, timezone
+import inspect
+import pep8
+import unittest
+from unittest.mock import patch
+from models.transaction import Transaction
+from models.transaction_batch import TransactionBatch
+
+
+class TestTransactionBatchDocs(unittest.TestCase):
+    """Tests to check the documentation and style of TransactionBatch"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up for the doc tests"""
+        cls.batch_f = inspect.getmembers(TransactionBatch, inspect.isfunction)
+
+    def test_pep8_conformance_transaction_batch(self):
+        """Test that models/transaction_batch.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/transaction_batch.py',
+                                    'tests/test_transaction_batch.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_transaction_batch_func_docstrings(self):
+        """Test for the presence of docstrings in TransactionBatch methods"""
+        for func in self.batch_f:
+            self.assertIsNot(func[1].__doc__, None,
+                             "{:s} method needs a docstring".format(func[0]))
+
+
+class TestTransactionBatch(unittest.TestCase):
+    """Test the TransactionBatch class"""
+
+    def setUp(self):
+        """Set up documents shaped like the stored transactions"""
+        date = datetime(2024, 7, 1, 10, 30, 0, 123456)
+        self.documents = [
+            {"_id": "1", "user_id": "user", "created_date": date,
+             "updated_date": date, "amount": 12.5, "type": "expense",
+             "category": "food", "description": "Lunch"},
+            {"_id": "2", "created_date": date, "updated_date": None,
+             "amount": 3, "type": "income", "note": "extra field"}
+        ]
+        self.batch = TransactionBatch.from_documents(self.documents)
+
+    def test_to_dict(self):
+        """Test that to_dict matches Transaction.to_dict"""
+        expected = [Transaction.from_document(document).to_dict()
+                    for document in self.documents]
+        self.assertEqual(self.batch.to_dict(), expected)
+
+    def test_document(self):
+        """Test that every value reads back unchanged"""
+        self.assertEqual(len(self.batch), 2)
+        self.assertEqual(self.batch.document(0), self.documents[0])
+        self.assertEqual(self.batch.document(-1), self.documents[1])
+        self.assertNotIn("user_id", self.batch.document(1))
+        with self.assertRaises(IndexError):
+            self.batch.document(2)
+
+    def test_amount_types(self):
+        """Test that integer amounts read back as integers"""
+        self.assertIs(type(self.batch.document(1)["amount"]), int)
+        self.assertIs(type(self.batch.document(0)["amount"]), float)
+        for amount in (2 ** 60, True, "5", None):
+            self.batch.append({"_id": "x", "amount": amount})
+            self.assertIs(self.batch.document(-1)["amount"], amount)
+
+    def test_append_transaction(self):
+        """Test that Transaction objects can be added"""
+        transaction = Transaction(amount=1.0, type="expense")
+        self.batch.append(transaction)
+        self.assertEqual(self.batch[2].to_dict(), transaction.to_dict())
+        self.assertEqual(self.batch[2].created_date,
+                         transaction.created_date.replace(tzinfo=None))
+        self.assertEqual([txn._id for txn in self.batch],
+                         ["1", "2", transaction._id])
+
+    @patch('models.storage')
+    def test_save(self, mock_storage):
+        """Test that save inserts the batch with new_many"""
+        mock_storage.new_many.return_value = [None, None]
+        self.assertEqual(self.batch.save(), [None, None])
+        transactions = mock_storage.new_many.call_args[0][0]
+        self.assertEqual([txn._id for txn in transactions], ["1", "2"])
+        self.assertIsInstance(transactions[1].updated_date, datetime)
+
+    @patch('models.storage')
+    def test_set_and_update(self, mock_storage):
+        """Test that update writes only the changed rows"""
+        self.batch.set(0, amount=20.0, category="rent")
+        self.assertEqual(self.batch.document(0)["amount"], 20.0)
+        self.batch.update()
+        mock_storage.update.assert_called_once()
+        transaction = mock_storage.update.call_args[0][0]
+        self.assertEqual(transaction._id, "1")
+        self.assertEqual(transaction.changes()[0],
+                         {"amount", "category", "updated_date"})
+        self.assertNotEqual(self.batch.document(0)["updated_date"],
+                            self.documents[0]["updated_date"])
+        self.batch.update()
+        mock_storage.update.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()